@@ -0,0 +1,306 @@
+import argparse  # Import argparse for the conversion commands
+import mmap  # Import mmap for zero-copy reads and in-place updates
+import os  # Import os for atomic file replacement
+import struct  # Import struct for the fixed-width binary layout
+import Instrumentation  # Import the byte counters
+import Storage_Backend  # Import the columnar store's name and name checks
+import Tenant_Storage  # Import the owner of the pre-login top-level keys
+import Transaction_Log  # Import the JSON snapshot reader and writer
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Binary inventory snapshots
+#
+# A compact alternative to the indented JSON snapshot. The file has four parts:
+#   - a header: magic, version, tenant count and the offset of the string table
+#   - a tenant table: per tenant its name, the offset of its records and of its
+#     sorted index, its item count and its total sales
+#   - per tenant, fixed-width item records (name reference, price, count,
+#     sales_count, sales_price, reorder_point) in their original order, followed by the record
+#     numbers sorted by name, so a lookup is a binary search in the file
+#   - a string table holding every tenant and item name as UTF-8
+#
+# BinarySnapshot opens the file with mmap: reading one item or updating a
+# count touches just that record, and nothing else is decoded. With numpy
+# installed, records() exposes a tenant's records as a structured array that
+# shares memory with the file. The columnar layout (MAIN.py) is stored as the
+# tenant Storage_Backend.COLUMNAR_STORE. Period rollups aren't part of the
+# format; they can be rebuilt from the sales ledger. Version 1 files (without
+# reorder points) are still read, with every reorder point 0. The format is
+# for exports and offline tools: the programs themselves store their data
+# through Storage_Backend, whose whole-store saves it wouldn't speed up.
+#
+#   python Binary_Snapshot.py to-binary inventory.json inventory.bin
+#   python Binary_Snapshot.py to-json inventory.bin inventory.json
+
+MAGIC = b'INVSNAP\x00'  # First bytes of every binary snapshot
+VERSION = 2  # Format version written by this module
+
+HEADER = struct.Struct('<8sIIQ')  # magic, version, tenant count, string table offset
+TENANT = struct.Struct('<IIQQQd')  # name offset, name length, records offset, index offset, items, total sales
+RECORDS = {  # Item record layout per format version
+    1: struct.Struct('<IIdqqd'),  # name offset, name length, price, count, sales_count, sales_price
+    2: struct.Struct('<IIdqqdq'),  # ... plus reorder_point
+}
+RECORD = RECORDS[VERSION]  # Layout written by this module
+INDEX = struct.Struct('<I')  # Record number in the sorted-by-name index
+
+PRICE_OFFSET, COUNT_OFFSET, SALES_COUNT_OFFSET, SALES_PRICE_OFFSET, REORDER_OFFSET = 8, 16, 24, 32, 40  # Field offsets
+TOTAL_OFFSET = 32  # Offset of total sales in a tenant entry
+
+if numpy is not None:
+    RECORD_DTYPES = {version: numpy.dtype({  # numpy view of an item record per format version
+        'names': ['name_offset', 'name_length', 'price', 'count', 'sales_count', 'sales_price', 'reorder_point'][:fields],
+        'formats': ['<u4', '<u4', '<f8', '<i8', '<i8', '<f8', '<i8'][:fields],
+        'offsets': [0, 4, 8, 16, 24, 32, 40][:fields],
+        'itemsize': RECORDS[version].size,
+    }) for version, fields in ((1, 6), (2, 7))}
+
+
+# Write tenants ({tenant: {'inventory': {name: item}, 'total_sales'}}) as a binary snapshot, atomically
+def write_snapshot(tenants, path):
+    strings = bytearray()  # String table
+    string_refs = {}  # Name -> (offset, length) in the string table
+
+    def reference(name):
+        if name not in string_refs:
+            encoded = name.encode('utf-8')
+            string_refs[name] = (len(strings), len(encoded))
+            strings.extend(encoded)
+        return string_refs[name]
+
+    body = bytearray()  # Records and sorted indexes of every tenant
+    entries = []
+    position = HEADER.size + TENANT.size * len(tenants)  # Where the body starts
+    for tenant, tenant_data in tenants.items():
+        items = tenant_data['inventory']
+        records_offset = position + len(body)
+        for name, item in items.items():
+            body.extend(RECORD.pack(*reference(name), item['price'], item['count'], item.get('sales_count', 0),
+                                    item.get('sales_price', 0.0), item.get('reorder_point', 0)))
+        index_offset = position + len(body)
+        encoded = [name.encode('utf-8') for name in items]
+        for number in sorted(range(len(encoded)), key=encoded.__getitem__):  # Byte order, as find() compares
+            body.extend(INDEX.pack(number))
+        entries.append(TENANT.pack(*reference(tenant), records_offset, index_offset, len(items),
+                                   tenant_data.get('total_sales', 0.0)))
+
+    temp_path = path + '.tmp'  # Temporary file next to the snapshot
+    with open(temp_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(tenants), position + len(body)))
+        file.write(b''.join(entries))
+        file.write(body)
+        file.write(strings)
+        Instrumentation.count_bytes('written', 'binary', file.tell())
+        file.flush()
+        os.fsync(file.fileno())  # Make sure the bytes hit the disk before the swap
+    os.replace(temp_path, path)  # Atomically swap the new snapshot into place
+
+
+# Memory-mapped view of a binary snapshot
+class BinarySnapshot:
+    def __init__(self, path, writable=False):
+        self.path = path
+        with open(path, 'r+b' if writable else 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        magic, version, tenant_count, self.strings_offset = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version not in RECORDS:
+            self.map.close()
+            raise ValueError(f"{path} is not a binary inventory snapshot this version can read.")
+        self.version = version
+        self.record = RECORDS[version]  # Item record layout of this file
+        self.padding = (0,) * (len(RECORD.format) - len(self.record.format))  # Missing trailing fields read as 0
+        self.tenant_entries = {}  # Tenant name -> offset of its entry in the tenant table
+        for number in range(tenant_count):
+            entry_offset = HEADER.size + number * TENANT.size
+            name_offset, name_length = TENANT.unpack_from(self.map, entry_offset)[:2]
+            self.tenant_entries[self._string(name_offset, name_length)] = entry_offset
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Write in-place changes back to the file and unmap it
+    def close(self):
+        if not self.map.closed:
+            self.map.flush()
+            self.map.close()
+
+    # Decode one string from the string table
+    def _string(self, offset, length):
+        start = self.strings_offset + offset
+        return self.map[start:start + length].decode('utf-8')
+
+    # (records offset, index offset, item count, total sales) of a tenant
+    def _tenant(self, tenant):
+        try:
+            return TENANT.unpack_from(self.map, self.tenant_entries[tenant])[2:]
+        except KeyError:
+            raise KeyError(f"Tenant '{tenant}' is not in {self.path}.") from None
+
+    # Names of the stored tenants
+    def tenants(self):
+        return list(self.tenant_entries)
+
+    # Number of items a tenant has
+    def item_count(self, tenant):
+        return self._tenant(tenant)[2]
+
+    # A tenant's total sales
+    def total_sales(self, tenant):
+        return self._tenant(tenant)[3]
+
+    # (name, price, count, sales_count, sales_price, reorder_point) of a tenant's item by position
+    def item(self, tenant, position):
+        records_offset, _, items, _ = self._tenant(tenant)
+        if not 0 <= position < items:
+            raise IndexError(f"Item {position} is out of range for tenant '{tenant}'.")
+        name_offset, name_length, *values = self.record.unpack_from(self.map, records_offset + position * self.record.size)
+        return (self._string(name_offset, name_length), *values, *self.padding)
+
+    # Stream a tenant's items in their original order
+    def iter_items(self, tenant):
+        records_offset, _, items, _ = self._tenant(tenant)
+        with memoryview(self.map) as view, view[records_offset:records_offset + items * self.record.size] as section:
+            for name_offset, name_length, *values in self.record.iter_unpack(section):
+                yield (self._string(name_offset, name_length), *values, *self.padding)
+
+    # Position of an item by name (binary search over the sorted index), or None
+    def find(self, tenant, name):
+        records_offset, index_offset, items, _ = self._tenant(tenant)
+        target = name.encode('utf-8')
+        low, high = 0, items
+        while low < high:
+            middle = (low + high) // 2
+            position = INDEX.unpack_from(self.map, index_offset + middle * INDEX.size)[0]
+            name_offset, name_length = self.record.unpack_from(self.map, records_offset + position * self.record.size)[:2]
+            start = self.strings_offset + name_offset
+            candidate = self.map[start:start + name_length]
+            if candidate == target:
+                return position
+            if candidate < target:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    # Offset of a field of one record
+    def _field(self, tenant, position, field_offset):
+        records_offset, _, items, _ = self._tenant(tenant)
+        if not 0 <= position < items:
+            raise IndexError(f"Item {position} is out of range for tenant '{tenant}'.")
+        return records_offset + position * self.record.size + field_offset
+
+    # Overwrite an item's count in place
+    def set_count(self, tenant, position, count):
+        struct.pack_into('<q', self.map, self._field(tenant, position, COUNT_OFFSET), count)
+
+    # Overwrite an item's price in place
+    def set_price(self, tenant, position, price):
+        struct.pack_into('<d', self.map, self._field(tenant, position, PRICE_OFFSET), price)
+
+    # Overwrite an item's reorder point in place
+    def set_reorder_point(self, tenant, position, reorder_point):
+        if self.version < 2:
+            raise ValueError(f"{self.path} predates reorder points; convert it again to add them.")
+        struct.pack_into('<q', self.map, self._field(tenant, position, REORDER_OFFSET), reorder_point)
+
+    # Record a purchase in place: stock, the item's sales and the tenant's total sales
+    def record_sale(self, tenant, position, quantity, amount):
+        offset = self._field(tenant, position, COUNT_OFFSET)
+        count, sales_count, sales_price = struct.unpack_from('<qqd', self.map, offset)
+        struct.pack_into('<qqd', self.map, offset, count - quantity, sales_count + quantity, sales_price + amount)
+        total_offset = self.tenant_entries[tenant] + TOTAL_OFFSET
+        struct.pack_into('<d', self.map, total_offset, struct.unpack_from('<d', self.map, total_offset)[0] + amount)
+
+    # A tenant's records as a numpy structured array sharing memory with the file
+    # (delete the array before close(), since it keeps the map exported)
+    def records(self, tenant):
+        if numpy is None:
+            raise RuntimeError("numpy is required for record arrays.")
+        records_offset, _, items, _ = self._tenant(tenant)
+        return numpy.frombuffer(self.map, dtype=RECORD_DTYPES[self.version], count=items, offset=records_offset)
+
+    # A tenant's data as {'inventory': {name: item}, 'total_sales'}
+    def load_tenant(self, tenant):
+        inventory = {name: {'price': price, 'count': count, 'sales_count': sales_count, 'sales_price': sales_price}
+                     for name, price, count, sales_count, sales_price, _ in self.iter_items(tenant)}
+        return {'inventory': inventory, 'total_sales': self.total_sales(tenant)}
+
+    # A tenant's data in the columnar layout, decoded in bulk
+    def load_columns(self, tenant=Storage_Backend.COLUMNAR_STORE):
+        records_offset, _, items, total_sales = self._tenant(tenant)
+        columns = {'Name': [], 'Price': [], 'Count': [], 'Reorder': [], 'Total Sales': total_sales}
+        if not items:
+            return columns
+        with memoryview(self.map) as view, view[records_offset:records_offset + items * self.record.size] as section:
+            name_offsets, name_lengths, prices, counts, _, _, *reorder = zip(*self.record.iter_unpack(section))
+        strings = self.map[self.strings_offset:]
+        if strings.isascii():  # Byte offsets are character offsets: decode the table once
+            strings = strings.decode('ascii')
+            columns['Name'] = [strings[offset:offset + length] for offset, length in zip(name_offsets, name_lengths)]
+        else:
+            columns['Name'] = [strings[offset:offset + length].decode('utf-8')
+                               for offset, length in zip(name_offsets, name_lengths)]
+        columns['Price'], columns['Count'] = list(prices), list(counts)
+        columns['Reorder'] = list(reorder[0]) if reorder else [0] * items
+        return columns
+
+
+# Columnar layout as a binary snapshot tenant (raises ValueError if an item name repeats)
+def columns_to_tenant(columns):
+    Storage_Backend.check_names(columns['Name'])
+    reorder = columns.get('Reorder') or [0] * len(columns['Name'])  # Older files have no reorder points
+    inventory = {name: {'price': price, 'count': count, 'reorder_point': reorder_point} for name, price, count, reorder_point
+                 in zip(columns['Name'], columns['Price'], columns['Count'], reorder)}
+    return {'inventory': inventory, 'total_sales': columns.get('Total Sales', 0.0)}
+
+
+# Convert a JSON snapshot (either layout) into a binary snapshot; returns the tenants written
+def json_to_binary(json_path, binary_path):
+    data = Transaction_Log.read_snapshot(json_path)
+    if 'Name' in data:  # Columnar layout
+        tenants = {Storage_Backend.COLUMNAR_STORE: columns_to_tenant(data)}
+    else:  # Per-user layout; rollups are dropped
+        legacy = {key: data.pop(key) for key in ('inventory', 'total_sales') if key in data}
+        if legacy:  # Stray top-level keys from the pre-login version, kept the way every importer keeps them
+            data[Tenant_Storage.LEGACY_TENANT] = legacy
+        tenants = {}
+        for user, user_data in data.items():
+            if not isinstance(user_data, dict):
+                raise ValueError(f"{json_path}: the entry for '{user}' is not a user's data.")
+            tenants[user] = {'inventory': user_data.get('inventory', {}), 'total_sales': user_data.get('total_sales', 0)}
+    write_snapshot(tenants, binary_path)
+    return list(tenants)
+
+
+# Convert a binary snapshot back into a JSON snapshot; returns the tenants written
+def binary_to_json(binary_path, json_path):
+    with BinarySnapshot(binary_path) as snapshot:
+        tenants = snapshot.tenants()
+        if tenants == [Storage_Backend.COLUMNAR_STORE]:  # Columnar layout
+            data = snapshot.load_columns()
+        else:
+            data = {tenant: snapshot.load_tenant(tenant) for tenant in tenants}
+    Transaction_Log.write_snapshot(data, json_path)
+    return tenants
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert inventory snapshots between JSON and binary.")
+    parser.add_argument('command', choices=['to-binary', 'to-json'], help="Conversion direction")
+    parser.add_argument('source', help="File to read")
+    parser.add_argument('target', help="File to write")
+    args = parser.parse_args()
+    convert = json_to_binary if args.command == 'to-binary' else binary_to_json
+    tenants = convert(args.source, args.target)
+    print(f"✅ Wrote {len(tenants)} store(s) to {args.target}: {', '.join(tenants)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+import argparse  # Import argparse for command-line options
+import csv  # Import the CSV module for CSV catalogs
+import json  # Import the JSON module for NDJSON catalogs and the progress file
+import os  # Import os for file sizes and atomic replacement
+import sys  # Import sys for stdout and stderr
+import time  # Import time to measure throughput
+import Command_Script  # Import the scripted sessions that validate and add items
+import Main_Menu  # Import the per-user inventory program
+import Transaction_Log  # Import atomic file replacement for the progress file
+
+# Bulk catalog import and export
+#
+# Moves whole catalogs in and out of the system as CSV or NDJSON, one row at
+# a time, so memory stays bounded by the inventory itself rather than the
+# file. A CSV starts with a header row naming its columns. An NDJSON file
+# holds one object per line. The fields are:
+#   - columnar inventory (MAIN.py): name, price, count, reorder_point
+#   - a user's inventory (--user, Main_Menu.py): name, price, count, sales_count, sales_price
+# Imports add every row through the same sessions as Command_Script.py, so a
+# row is validated exactly like MAIN.add_item: a name, a non-negative price
+# and count, and no item of that name yet. An invalid row is reported and
+# skipped. Sales fields are written by exports but ignored by imports, which
+# only onboard stock.
+# Rows are committed in chunks of --chunk-size. For a user, a chunk is one
+# transaction-log record; for the columnar inventory it is one save. After
+# each commit, "<file>.progress" records how far into the file the import
+# got. If the import fails, running it again resumes after the last
+# committed chunk; the progress file is removed once the import completes.
+#
+#   python Catalog_Transfer.py import catalog.csv [--user NAME] [--chunk-size N] [--restart] [--errors FILE]
+#   python Catalog_Transfer.py export catalog.ndjson [--user NAME] [--format csv|ndjson]
+
+CHUNK_SIZE = 50_000  # Rows committed together (a columnar commit rewrites the whole inventory)
+PROGRESS_SUFFIX = '.progress'  # Appended to the source path to name its progress file
+COLUMNAR_FIELDS = ('name', 'price', 'count', 'reorder_point')  # Exported fields of the columnar inventory
+USER_FIELDS = ('name', 'price', 'count', 'sales_count', 'sales_price')  # Exported fields of a user's inventory
+
+
+# 'ndjson' for .ndjson and .jsonl files, otherwise 'csv'
+def file_format(path, explicit=None):
+    if explicit:
+        return explicit
+    return 'ndjson' if path.lower().endswith(('.ndjson', '.jsonl')) else 'csv'
+
+
+# Decode the lines of a binary file from `offset`, keeping the file position
+# and line number of the last line handed out in `position`
+def _lines(file, offset, line_number, position):
+    file.seek(offset)
+    for line in file:
+        offset += len(line)
+        line_number += 1
+        position[0], position[1] = offset, line_number
+        yield line.decode('utf-8-sig' if line_number == 1 else 'utf-8')
+
+
+# Yield (line number, offset after the row, row) for every row of a catalog, starting
+# at `offset` (the row is a dict, or the ValueError that made it invalid)
+def read_rows(file, fmt, offset=0, line_number=0):
+    position = [offset, line_number]
+    if fmt == 'csv':
+        file.seek(0)
+        header = next(csv.reader([file.readline().decode('utf-8-sig')]), [])
+        fields = [field.strip().lower() for field in header]
+        if 'name' not in fields:
+            raise ValueError("The CSV header must name a 'name' column.")
+        if offset == 0:
+            position = [file.tell(), 1]
+        for row in csv.reader(_lines(file, *position, position)):
+            if not row:
+                continue
+            yield position[1], position[0], {field: value.strip() for field, value in zip(fields, row) if value.strip()}
+        return
+    for line in _lines(file, offset, line_number, position):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            yield position[1], position[0], ValueError(f"Invalid JSON: {error}")
+            continue
+        if not isinstance(row, dict):
+            row = ValueError("Each line must be a JSON object.")
+        yield position[1], position[0], row
+
+
+# Saved progress of an import, or None if there is none for this source
+def load_progress(source):
+    try:
+        with open(source + PROGRESS_SUFFIX, 'r') as file:
+            progress = json.load(file)
+    except FileNotFoundError:
+        return None
+    return progress if progress.get('source') == os.path.abspath(source) else None
+
+
+# Record how far an import got (written atomically, so a crash leaves the old progress)
+def save_progress(source, progress):
+    Transaction_Log.replace_file(source + PROGRESS_SUFFIX, json.dumps(progress))
+
+
+# Import a catalog into a session, committing every `chunk_size` rows; returns the summary
+# (`progress(summary, fraction)` is called after every commit; rejected rows are
+# written to `errors` as JSON lines)
+def import_catalog(session, source, fmt=None, chunk_size=CHUNK_SIZE, restart=False, progress=None, errors=None):
+    fmt = file_format(source, fmt)
+    saved = None if restart else load_progress(source)
+    summary = {'source': os.path.abspath(source), 'offset': 0, 'line': 0, 'imported': 0, 'rejected': 0}
+    if saved:
+        summary.update((key, saved[key]) for key in ('offset', 'line', 'imported', 'rejected'))
+    resumed_at = summary['line']
+    size = os.path.getsize(source)
+    started = time.perf_counter()
+    uncommitted = 0  # Rows added since the last commit
+    read = 0  # Rows read by this run
+    with open(source, 'rb') as file:
+        for line_number, offset, row in read_rows(file, fmt, summary['offset'], summary['line']):
+            try:
+                if isinstance(row, Exception):
+                    raise row
+                session.add(row)
+                uncommitted += 1
+                summary['imported'] += 1
+            except ValueError as error:
+                summary['rejected'] += 1
+                if errors is not None:
+                    errors.write(json.dumps({'line': line_number, 'error': str(error)}) + '\n')
+            summary['offset'], summary['line'] = offset, line_number
+            read += 1
+            if uncommitted >= chunk_size:
+                session.checkpoint()
+                save_progress(source, summary)
+                uncommitted = 0
+                if progress is not None:
+                    progress(summary, offset / size if size else 1.0)
+    session.save()  # The last chunk, and a snapshot that no longer needs the chunks' log records
+    try:
+        os.remove(source + PROGRESS_SUFFIX)
+    except FileNotFoundError:
+        pass
+    seconds = time.perf_counter() - started
+    summary.update(resumed_at_line=resumed_at, seconds=round(seconds, 3),
+                   rows_per_sec=round(read / seconds, 1) if seconds else None)
+    if progress is not None:
+        progress(summary, 1.0)
+    return summary
+
+
+# Yield the columnar inventory's rows as dicts of COLUMNAR_FIELDS
+def columnar_rows(inventory):
+    for row in zip(inventory['Name'], inventory['Price'], inventory['Count'], inventory['Reorder']):
+        yield dict(zip(COLUMNAR_FIELDS, row))
+
+
+# Yield the current user's rows as dicts of USER_FIELDS
+def user_rows():
+    for name, item in Main_Menu.inventory.items():
+        yield {'name': name, 'price': item.price, 'count': item.count,
+               'sales_count': item.sales_count, 'sales_price': item.sales_price}
+
+
+# Write rows to an open text file as CSV or NDJSON; returns the number of rows
+def write_rows(rows, file, fmt, fields):
+    written = 0
+    if fmt == 'csv':
+        writer = csv.DictWriter(file, fields, lineterminator='\n')
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            written += 1
+    else:
+        for row in rows:
+            file.write(json.dumps(row) + '\n')
+            written += 1
+    return written
+
+
+# Export rows to a file, replacing it only once the export is complete ('-' writes to stdout)
+def export_catalog(rows, path, fmt=None, fields=COLUMNAR_FIELDS):
+    if path == '-':
+        return write_rows(rows, sys.stdout, fmt or 'ndjson', fields)
+    temp_path = f"{path}.{os.getpid()}.tmp"  # Readers never see a half-written export
+    try:
+        with open(temp_path, 'w', encoding='utf-8', newline='') as file:
+            written = write_rows(rows, file, file_format(path, fmt), fields)
+            file.flush()
+            os.fsync(file.fileno())
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    os.replace(temp_path, path)
+    return written
+
+
+# Print an import's progress
+def show_progress(summary, fraction):
+    print(f"⏳ {fraction:6.1%}  line {summary['line']}: {summary['imported']} imported, "
+          f"{summary['rejected']} rejected", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import or export a whole catalog as CSV or NDJSON.")
+    parser.add_argument('action', choices=['import', 'export'], help="Direction of the transfer")
+    parser.add_argument('path', help="Catalog file ('-' exports to stdout)")
+    parser.add_argument('--user', help="Use this user's inventory instead of the columnar one")
+    parser.add_argument('--format', choices=['csv', 'ndjson'], help="File format (default: from the file name)")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Rows committed together by an import")
+    parser.add_argument('--restart', action='store_true', help="Ignore the progress of an earlier failed import")
+    parser.add_argument('--errors', help="File for the rejected rows of an import (default: stderr)")
+    parser.add_argument('--quiet', action='store_true', help="Don't report progress")
+    args = parser.parse_args()
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1.")
+    try:
+        session = Command_Script.UserSession(args.user) if args.user else Command_Script.ColumnarSession()
+    except ValueError as error:
+        parser.error(str(error))
+
+    if args.action == 'export':
+        rows = user_rows() if args.user else columnar_rows(session.inventory)
+        written = export_catalog(rows, args.path, args.format, USER_FIELDS if args.user else COLUMNAR_FIELDS)
+        print(f"✅ Exported {written} item(s).", file=sys.stderr)
+        return
+
+    errors = open(args.errors, 'a', encoding='utf-8') if args.errors else sys.stderr
+    try:
+        summary = import_catalog(session, args.path, args.format, args.chunk_size, args.restart,
+                                 None if args.quiet else show_progress, errors)
+    except (OSError, ValueError) as error:
+        print(f"❌ Import stopped: {error}\nRun the same command again to resume after the last committed chunk.",
+              file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if errors is not sys.stderr:
+            errors.close()
+    resumed = f" (resumed at line {summary['resumed_at_line']})" if summary['resumed_at_line'] else ""
+    print(f"✅ Imported {summary['imported']} item(s), rejected {summary['rejected']}{resumed} "
+          f"in {summary['seconds']:.3f} s ({summary['rows_per_sec']} rows/sec)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
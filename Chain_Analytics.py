@@ -0,0 +1,140 @@
+import argparse  # Import argparse for command-line options
+import heapq  # Import heapq for bounded top-K selection
+import json  # Import the JSON module for machine-readable reports
+import os  # Import os to size the worker pool
+from concurrent.futures import ProcessPoolExecutor  # Import the process pool for parallel scans
+from itertools import repeat  # Import repeat to pass settings to every worker
+import Storage_Backend  # Import the pluggable storage backends
+
+# Chain-wide analytics
+#
+# Reports across every store (tenant): total revenue and units sold, the best
+# sellers across the chain, and per store its revenue, its own best sellers and
+# its stock-outs. Tenants are split into groups that are scanned by a pool of
+# worker processes. Each worker opens its own storage backend and loads one
+# tenant at a time, so no process ever holds more than one store's inventory.
+# The workers return partial aggregates that the parent merges:
+#   - sums of revenue, units and item counts
+#   - a bounded top-K heap per store, which is exact because a store lives in
+#     only one group
+#   - per-item sales sums for the chain-wide ranking. Partial top-K lists can't
+#     be merged exactly when one item sells in several groups, so the ranking
+#     heap runs after the merge.
+#
+#   python Chain_Analytics.py [--top 10] [--workers N] [--json]
+
+TOP_K = 10  # Best sellers reported chain-wide and per store
+GROUPS_PER_WORKER = 4  # Smaller groups even out stores of very different sizes
+
+
+# Empty partial aggregate
+def new_partial():
+    return {'revenue': 0.0, 'units': 0, 'items': 0, 'stock_outs': 0, 'item_sales': {}, 'stores': {}}
+
+
+# Add one store's inventory to a partial aggregate
+def add_store(partial, user, user_data, top_k):
+    inventory = user_data['inventory']
+    item_sales = partial['item_sales']
+    best = []  # Min-heap of the store's top_k (sales count, name)
+    units = 0
+    stock_outs = []
+    for name, item in inventory.items():
+        if item.count <= 0:
+            stock_outs.append(name)
+        if not item.sales_count:
+            continue
+        units += item.sales_count
+        totals = item_sales.setdefault(name, [0, 0.0])  # [units, revenue] across the group's stores
+        totals[0] += item.sales_count
+        totals[1] += item.sales_price
+        if len(best) < top_k:
+            heapq.heappush(best, (item.sales_count, name))
+        elif item.sales_count > best[0][0]:
+            heapq.heapreplace(best, (item.sales_count, name))
+    partial['stores'][user] = {
+        'revenue': user_data['total_sales'],
+        'units': units,
+        'items': len(inventory),
+        'stock_outs': sorted(stock_outs),
+        'best_sellers': [[name, count] for count, name in sorted(best, reverse=True)],
+    }
+    partial['revenue'] += user_data['total_sales']
+    partial['units'] += units
+    partial['items'] += len(inventory)
+    partial['stock_outs'] += len(stock_outs)
+
+
+# Partial aggregate of one group of stores (runs inside a worker process)
+def scan_stores(users, top_k):
+    backend = Storage_Backend.open_backend()  # Never share a parent's database connection
+    partial = new_partial()
+    for user in users:
+        add_store(partial, user, backend.load_tenant(user), top_k)  # Only this store is in memory
+    return partial
+
+
+# Fold a partial aggregate into the running total
+def merge(total, partial):
+    for key in ('revenue', 'units', 'items', 'stock_outs'):
+        total[key] += partial[key]
+    item_sales = total['item_sales']
+    for name, (units, revenue) in partial['item_sales'].items():
+        totals = item_sales.setdefault(name, [0, 0.0])
+        totals[0] += units
+        totals[1] += revenue
+    total['stores'].update(partial['stores'])
+
+
+# Split stores into round-robin groups, dropping empty ones
+def partition(users, groups):
+    return [group for group in (users[start::groups] for start in range(groups)) if group]
+
+
+# Chain-wide report over every store (or the given ones)
+def chain_report(top_k=TOP_K, workers=None, users=None):
+    if users is None:
+        users = Storage_Backend.get_backend().tenants()
+    workers = workers or os.cpu_count() or 1
+    groups = partition(list(users), workers * GROUPS_PER_WORKER)
+    report = new_partial()
+    if workers == 1 or len(groups) <= 1:  # Not worth starting processes
+        for partial in map(scan_stores, groups, repeat(top_k)):
+            merge(report, partial)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(groups))) as pool:
+            for partial in pool.map(scan_stores, groups, repeat(top_k)):
+                merge(report, partial)
+    item_sales = report.pop('item_sales')
+    report['best_sellers'] = [[name, units, revenue] for name, (units, revenue)
+                              in heapq.nlargest(top_k, item_sales.items(), key=lambda pair: pair[1][0])]
+    report['stores'] = dict(sorted(report['stores'].items()))
+    return report
+
+
+# Human-readable report
+def format_report(report):
+    lines = [f"🏬 Stores: {len(report['stores'])}, items: {report['items']}, units sold: {report['units']}, "
+             f"revenue: {report['revenue']:.2f}, stock-outs: {report['stock_outs']}",
+             "🏆 Best sellers across the chain:"]
+    for rank, (name, units, revenue) in enumerate(report['best_sellers'], start=1):
+        lines.append(f"  {rank}. {name}: {units} sold, {revenue:.2f}")
+    for user, store in report['stores'].items():
+        lines.append(f"\n📦 {user}: revenue {store['revenue']:.2f}, units {store['units']}, items {store['items']}")
+        lines.append(f"  Best sellers: {', '.join(f'{name} ({count})' for name, count in store['best_sellers']) or 'none'}")
+        lines.append(f"  Stock-outs ({len(store['stock_outs'])}): {', '.join(store['stock_outs']) or 'none'}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Revenue, best sellers and stock-outs across every store.")
+    parser.add_argument('--top', type=int, default=TOP_K, help="Best sellers to report")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: one per CPU)")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    args = parser.parse_args()
+    report = chain_report(args.top, args.workers)
+    print(json.dumps(report) if args.json else format_report(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import hashlib  # Import hashlib to fingerprint chart data for the cache
+import heapq  # Import heapq to pick the top-N items without sorting everything
+import json  # Import the JSON module for canonical cache keys
+import os  # Import os for output paths
+from concurrent.futures import ProcessPoolExecutor  # Import the process pool for parallel rendering
+
+# Headless chart export
+#
+# Renders every chart type from generate_graph to image files with the
+# non-interactive Agg backend, one chart per worker process. Each file name
+# carries a hash of the data it was drawn from, so charts whose data hasn't
+# changed are reused instead of re-rendered. Bar and pie charts keep the TOP_N
+# largest items and fold the rest into an "Other (n items)" bucket, whose
+# label can't be mistaken for (or merged with) an item called "Other".
+
+OUTPUT_DIR = 'charts'  # Default directory for exported charts
+TOP_N = 20  # Items drawn individually before the rest become "Other"
+CHART_TYPES = ('sales_bar', 'sales_pie', 'sales_histogram', 'stock_bar')  # Every exported chart
+
+
+# Keep the n largest (name, value) pairs and sum the rest into "Other (n items)"
+def top_n_with_other(pairs, n):
+    top = heapq.nlargest(n, pairs, key=lambda pair: pair[1])
+    if len(pairs) <= n:
+        return top
+    other = sum(value for _, value in pairs) - sum(value for _, value in top)
+    return top + [(f"Other ({len(pairs) - n} items)", other)]
+
+
+# Build the data each chart needs from a user's inventory
+def chart_series(inventory, top_n=TOP_N):
+    sales = [(name, item.sales_count) for name, item in inventory.items()]
+    stock = [(name, item.count) for name, item in inventory.items()]
+    return {
+        'sales_bar': top_n_with_other(sales, top_n),
+        'sales_pie': [pair for pair in top_n_with_other(sales, top_n) if pair[1] > 0],  # Pie slices must be positive
+        'sales_histogram': [value for _, value in sales],
+        'stock_bar': top_n_with_other(stock, top_n),
+    }
+
+
+# Fingerprint of one chart's data and format
+def chart_hash(chart, data, fmt):
+    payload = json.dumps([chart, fmt, data], separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+# Render one chart to a file (runs inside a worker process)
+def render_chart(chart, data, path):
+    import matplotlib  # Import matplotlib inside the worker
+    matplotlib.use('Agg')  # Headless backend: no display needed
+    import matplotlib.pyplot as plt  # Import pyplot after selecting the backend
+
+    figure = plt.figure(figsize=(10, 5) if chart != 'sales_pie' else (8, 8))
+    if chart == 'sales_histogram':
+        plt.hist(data, bins=10)  # Plot histogram of sales count
+        plt.xlabel('Sales (Count)')
+        plt.ylabel('Frequency')
+        plt.title('Histogram: Sales (Count) Distribution')
+    elif chart == 'sales_pie':
+        plt.pie([value for _, value in data], labels=[name for name, _ in data], autopct='%1.1f%%')
+        plt.title('Pie Chart: Sales (Count) Distribution')
+    else:
+        label = 'Sales (Count)' if chart == 'sales_bar' else 'Stocks'
+        plt.bar([name for name, _ in data], [value for _, value in data], label=label)
+        plt.xlabel('Items')
+        plt.ylabel(label)
+        plt.title(f'Bar Graph: {label} of all items')
+        plt.xticks(rotation=45)
+        plt.legend()
+    plt.tight_layout()
+    figure.savefig(path)
+    plt.close(figure)
+    return path
+
+
+# Export every chart for an inventory; returns {chart: path}, re-rendering only changed data
+def export_charts(inventory, output_dir=OUTPUT_DIR, fmt='png', top_n=TOP_N, workers=None):
+    os.makedirs(output_dir, exist_ok=True)
+    series = chart_series(inventory, top_n)
+    paths = {}  # Chart -> output file
+    jobs = []  # Charts whose file doesn't exist yet
+    for chart in CHART_TYPES:
+        path = os.path.join(output_dir, f"{chart}-{chart_hash(chart, series[chart], fmt)}.{fmt}")
+        paths[chart] = path
+        if not os.path.exists(path):  # Unchanged data means the cached file is still valid
+            jobs.append((chart, series[chart], path))
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers or min(len(jobs), os.cpu_count() or 1)) as pool:
+            futures = [pool.submit(render_chart, *job) for job in jobs]
+            for future in futures:
+                future.result()  # Re-raise any rendering error
+        remove_stale(output_dir, paths.values(), fmt)
+    return paths
+
+
+# Delete older renders of the charts that were just replaced
+def remove_stale(output_dir, current, fmt):
+    current = {os.path.basename(path) for path in current}
+    for file_name in os.listdir(output_dir):
+        chart = file_name.rsplit('-', 1)[0]
+        if chart in CHART_TYPES and file_name.endswith('.' + fmt) and file_name not in current:
+            os.remove(os.path.join(output_dir, file_name))
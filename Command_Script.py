@@ -0,0 +1,298 @@
+import argparse  # Import argparse for command-line options
+import contextlib  # Import contextlib to capture the menu functions' messages
+import io  # Import io for the captured output buffer
+import json  # Import the JSON module for commands and results
+import sys  # Import sys for stdin, stdout and stderr
+import time  # Import time to measure throughput
+import Credential_Store  # Import the credential store to check the user exists
+import MAIN  # Import the columnar inventory program
+import Main_Menu  # Import the per-user inventory program
+
+# Scripted command mode
+#
+# Runs a script of commands against one inventory without any prompts, so a
+# day's register tape can be replayed or a load test driven at full speed.
+# The script is NDJSON, one command per line (blank lines and lines starting
+# with '#' are skipped):
+#   {"op": "add", "name": "apple", "price": 0.5, "count": 100}
+#   {"op": "buy", "name": "apple", "quantity": 3}
+#   {"op": "reprice", "name": "apple", "price": 0.55}   or {"op": "reprice", "percent": 10} for every item
+#   {"op": "restock", "name": "apple", "quantity": 50}  or {"op": "restock", "quantity": 5} for every item
+#   {"op": "delete", "name": "apple"}
+#   {"op": "report"}                                    or {"op": "report", "name": "apple"}
+# With --user the commands run against that user's inventory (Main_Menu.py);
+# without it, against the columnar inventory (MAIN.py). Everything happens in
+# memory: the inventory is loaded once and saved once at the end, or also
+# every --checkpoint successful changes. For a user a checkpoint appends one
+# transaction-log record, and the final save rewrites the snapshot. Every
+# command produces one JSON result line, and a summary with the throughput
+# ends the output.
+#
+#   python Command_Script.py [--user NAME] [--checkpoint N] [--errors-only] [--output FILE] [script.ndjson | -]
+
+CHECKPOINT = 0  # Successful changes between saves (0 saves only at the end)
+
+
+# A command's item name
+def command_name(command):
+    name = command.get('name')
+    if not isinstance(name, str) or not name:
+        raise ValueError("Missing item name.")
+    return name
+
+
+# A command's quantity, which must be a positive whole number
+def command_quantity(command):
+    quantity = MAIN.parse_count(command.get('quantity'))
+    if quantity == 0:
+        raise ValueError("Invalid quantity: 0.")
+    return quantity
+
+
+# Price multiplier for a percentage change
+def percent_factor(percent):
+    try:
+        factor = 1 + float(percent) / 100
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid percentage: {percent!r}.") from None
+    if not factor >= 0:
+        raise ValueError(f"Invalid percentage: {percent!r}.")
+    return factor
+
+
+# One user's inventory, sales and rollups (per-user layout)
+class UserSession:
+    def __init__(self, user):
+        if not Credential_Store.user_exists(user):
+            raise ValueError(f"Unknown user '{user}'.")
+        Main_Menu.current_user = user
+        Main_Menu.WRITE_BEHIND_INTERVAL = None  # Checkpoints decide when to write
+        Main_Menu.load_inventory()
+
+    # Run a menu function with its message captured; a failure becomes a ValueError
+    def _call(self, function, *args):
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            succeeded = function(*args)
+        message = output.getvalue().strip()
+        if not succeeded:
+            raise ValueError(message)
+        return message
+
+    def add(self, command):
+        return self._call(Main_Menu.add_item, command_name(command),
+                          MAIN.parse_price(command.get('price')), MAIN.parse_count(command.get('count')))
+
+    def buy(self, command):
+        return self._call(Main_Menu.buy_item, command_name(command), command_quantity(command))
+
+    def reprice(self, command):
+        if 'name' in command:
+            return self._call(Main_Menu.change_price, command_name(command), MAIN.parse_price(command.get('price')))
+        factor = percent_factor(command.get('percent'))
+        for item in Main_Menu.inventory.values():
+            item.price *= factor
+        Main_Menu.log_changes(list(Main_Menu.inventory), fields=('price',))  # Queued as one change
+        return f"Repriced {len(Main_Menu.inventory)} item(s) by {command['percent']}%."
+
+    def restock(self, command):
+        quantity = command_quantity(command)
+        if 'name' in command:
+            name = command_name(command)
+            item = Main_Menu.inventory.get(name)
+            return self._call(Main_Menu.update_inventory, name, (item.count if item else 0) + quantity)
+        for item in Main_Menu.inventory.values():
+            item.count += quantity
+        Main_Menu.log_changes(list(Main_Menu.inventory), fields=('count',))  # Queued as one change
+        return f"Restocked {len(Main_Menu.inventory)} item(s) with {quantity} each."
+
+    def delete(self, command):
+        return self._call(Main_Menu.delete_item, command_name(command))
+
+    def report(self, command):
+        if 'name' in command:
+            name = command_name(command)
+            if name not in Main_Menu.inventory:
+                raise ValueError(f"Item '{name}' not found in inventory.")
+            return Main_Menu.inventory[name].to_dict()
+        items = Main_Menu.inventory.values()
+        return {
+            'items': len(items),
+            'units': sum(item.count for item in items),
+            'stock_value': sum(item.price * item.count for item in items),
+            'total_sales': Main_Menu.total_sales,
+        }
+
+    # Append the changes since the last checkpoint to the transaction log
+    def checkpoint(self):
+        Main_Menu.sync_changes()
+
+    # Write the whole inventory
+    def save(self):
+        Main_Menu.save_inventory()
+
+
+# The columnar inventory (MAIN.py)
+class ColumnarSession:
+    def __init__(self):
+        self.inventory = MAIN.load_inventory()
+
+    # Row of an item, or a ValueError with suggestions
+    def _row(self, name):
+        row = MAIN.find_item(self.inventory, name)
+        if row is None:
+            raise ValueError(MAIN.not_found_message(self.inventory, name))
+        return row
+
+    def add(self, command):
+        name = command_name(command)
+        MAIN.add_item(self.inventory, name, command.get('price'), command.get('count'), command.get('reorder_point', 0))
+        return f"Item '{name}' added to inventory."
+
+    def buy(self, command):
+        name, quantity = command_name(command), command_quantity(command)
+        amount = MAIN.sell_item(self.inventory, name, quantity)
+        return f"Bought {quantity} {name}(s) for {amount:.2f}."
+
+    def reprice(self, command):
+        if 'name' in command:
+            name = command_name(command)
+            price = MAIN.parse_price(command.get('price'))
+            MAIN.set_price(self.inventory, self._row(name), price)
+            return f"Price of '{name}' updated to {price}."
+        percent_factor(command.get('percent'))  # Same validation as the per-user layout
+        MAIN.reprice_all(self.inventory, command['percent'])
+        return f"Repriced {len(self.inventory['Name'])} item(s) by {command['percent']}%."
+
+    def restock(self, command):
+        quantity = command_quantity(command)
+        if 'name' in command:
+            name = command_name(command)
+            row = self._row(name)
+            MAIN.set_count(self.inventory, row, self.inventory['Count'][row] + quantity)
+            return f"Count of '{name}' updated to {self.inventory['Count'][row]}."
+        MAIN.restock_all(self.inventory, quantity)
+        return f"Restocked {len(self.inventory['Name'])} item(s) with {quantity} each."
+
+    def delete(self, command):
+        name = command_name(command)
+        if not MAIN.delete_item(self.inventory, name):
+            raise ValueError(MAIN.not_found_message(self.inventory, name))
+        return f"Item '{name}' deleted from inventory."
+
+    def report(self, command):
+        if 'name' in command:
+            row = self._row(command_name(command))
+            return {'price': self.inventory['Price'][row], 'count': self.inventory['Count'][row],
+                    'reorder_point': self.inventory['Reorder'][row]}
+        return {
+            'items': len(self.inventory['Name']),
+            'units': sum(self.inventory['Count']),
+            'stock_value': MAIN.total_stock_value(self.inventory),
+            'total_sales': self.inventory['Total Sales'],
+            'below_reorder_point': len(MAIN.reorder_index(self.inventory).below_reorder_point()),
+        }
+
+    # The columnar layout has no log: a checkpoint is a full save
+    def checkpoint(self):
+        self.save()
+
+    def save(self):
+        MAIN.save_inventory(self.inventory)
+
+
+OPERATIONS = ('add', 'buy', 'reprice', 'restock', 'delete', 'report')  # Commands a script may use
+
+
+# Yield (line number, command) for every command in a script; malformed lines yield the error instead
+def read_commands(file):
+    for line_number, line in enumerate(file, start=1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            command = json.loads(line)
+        except ValueError as error:
+            yield line_number, ValueError(f"Invalid JSON: {error}")
+            continue
+        if not isinstance(command, dict) or command.get('op') not in OPERATIONS:
+            yield line_number, ValueError(f"Unknown command: {line}")
+            continue
+        yield line_number, command
+
+
+# Run a script against a session, writing one JSON result per command; returns the summary
+def run_script(session, commands, output, checkpoint=CHECKPOINT, errors_only=False):
+    summary = {'commands': 0, 'succeeded': 0, 'failed': 0, 'checkpoints': 0}
+    changed = unsaved = 0  # Successful changes in total and since the last checkpoint
+    persist_seconds = 0.0
+    started = time.perf_counter()
+    try:
+        for line_number, command in commands:
+            summary['commands'] += 1
+            result = {'line': line_number}
+            try:
+                if isinstance(command, Exception):
+                    raise command
+                result['op'] = command['op']
+                value = getattr(session, command['op'])(command)
+            except ValueError as error:
+                summary['failed'] += 1
+                result.update(ok=False, error=str(error))
+                output.write(json.dumps(result) + '\n')
+                continue
+            summary['succeeded'] += 1
+            if command['op'] == 'report':
+                result.update(ok=True, report=value)
+            else:
+                result.update(ok=True, message=value)
+                changed += 1
+                unsaved += 1
+            if not errors_only or command['op'] == 'report':
+                output.write(json.dumps(result) + '\n')
+            if checkpoint and unsaved >= checkpoint:
+                persist_started = time.perf_counter()
+                session.checkpoint()
+                persist_seconds += time.perf_counter() - persist_started
+                summary['checkpoints'] += 1
+                unsaved = 0
+    finally:  # Keep what was done even if the run is interrupted
+        if changed:
+            persist_started = time.perf_counter()
+            session.save()
+            persist_seconds += time.perf_counter() - persist_started
+    seconds = time.perf_counter() - started
+    summary.update(seconds=round(seconds, 6), persist_seconds=round(persist_seconds, 6),
+                   ops_per_sec=round(summary['commands'] / seconds, 1) if seconds else None)
+    output.write(json.dumps({'summary': summary}) + '\n')
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a script of inventory commands without prompts.")
+    parser.add_argument('script', nargs='?', default='-', help="NDJSON command file ('-' for stdin)")
+    parser.add_argument('--user', help="Run against this user's inventory instead of the columnar one")
+    parser.add_argument('--checkpoint', type=int, default=CHECKPOINT,
+                        help="Also save after every N successful changes (default: only at the end)")
+    parser.add_argument('--errors-only', action='store_true', help="Only write results for failures and reports")
+    parser.add_argument('--output', help="File for the JSON results (default: stdout)")
+    args = parser.parse_args()
+    try:
+        session = UserSession(args.user) if args.user else ColumnarSession()
+    except ValueError as error:
+        parser.error(str(error))
+    script = sys.stdin if args.script == '-' else open(args.script, 'r', encoding='utf-8')
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        summary = run_script(session, read_commands(script), output, args.checkpoint, args.errors_only)
+    finally:
+        if script is not sys.stdin:
+            script.close()
+        if output is not sys.stdout:
+            output.close()
+    print(f"✅ {summary['commands']} command(s), {summary['succeeded']} succeeded, {summary['failed']} failed "
+          f"in {summary['seconds']:.3f} s ({summary['ops_per_sec']} ops/sec, {summary['checkpoints']} checkpoint(s))",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
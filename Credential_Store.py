@@ -0,0 +1,132 @@
+import hashlib  # Import hashlib for PBKDF2 password hashing
+import hmac  # Import hmac for constant-time comparisons and session keys
+import json  # Import the JSON module for credential records
+import os  # Import os for file metadata and random salts
+import threading  # Import threading so the server can verify from worker threads
+import File_Lock  # Import cross-process file locks
+import Transaction_Log  # Import atomic file replacement for the migration
+
+# Credential store
+#
+# Credentials are kept in an append-only NDJSON file, one record per line:
+# {"user": ..., "salt": ..., "hash": ..., "iterations": ...}. Passwords are
+# hashed with salted PBKDF2-HMAC-SHA256, and a later line for the same user
+# replaces an earlier one. The file is indexed in memory. Since it only ever
+# grows, a reload reads just the bytes added since the last read, and only
+# when the file's size or mtime has changed. Successful logins are remembered
+# in a per-process session cache, so logging out and back in skips PBKDF2.
+# The old plaintext login.json is migrated the first time the store is used:
+# every password is hashed first, and the finished file is then swapped into
+# place under the store's lock, so an interrupted migration leaves no file
+# and simply runs again, and no process ever reads a half-written one.
+# Registration checks for the name and appends under that same lock, so two
+# processes can never both register one name.
+
+CREDENTIALS_FILE = 'credentials.ndjson'  # Append-only credential records
+LEGACY_FILE = 'login.json'  # Plaintext {user: password} store used before hashing
+ITERATIONS = 200_000  # PBKDF2 work factor for new hashes
+
+_index = {}  # User name -> latest credential record
+_offset = 0  # Bytes of the credentials file already indexed
+_stat = None  # (size, mtime) of the file when it was last indexed
+_sessions = {}  # User name -> (stored hash, session digest of the verified password)
+_session_key = os.urandom(32)  # Per-process key for session digests
+_lock = threading.Lock()  # Serializes index updates and appends
+
+
+# Hash a password with a salt
+def hash_password(password, salt, iterations=ITERATIONS):
+    return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations).hex()
+
+
+# Build a credential record for a user and password
+def make_record(user, password):
+    salt = os.urandom(16)
+    return {'user': user, 'salt': salt.hex(), 'hash': hash_password(password, salt), 'iterations': ITERATIONS}
+
+
+# Encode credential records as NDJSON lines
+def _encode(records):
+    return ''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in records)
+
+
+# Append credential records to the file (caller holds the file's File_Lock)
+def _append(records):
+    with open(CREDENTIALS_FILE, 'a') as file:
+        file.write(_encode(records))
+
+
+# Hash every password in the plaintext login file into the credentials file
+def migrate_legacy():
+    try:
+        with open(LEGACY_FILE, 'r') as file:
+            users = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        users = {}
+    text = _encode([make_record(user, password) for user, password in users.items()])  # Hash everything first
+    with File_Lock.locked(CREDENTIALS_FILE):
+        if not os.path.exists(CREDENTIALS_FILE):  # Another process may have finished the migration meanwhile
+            Transaction_Log.replace_file(CREDENTIALS_FILE, text)
+
+
+# Bring the in-memory index up to date with the file
+def _refresh():
+    global _offset, _stat
+    if not os.path.exists(CREDENTIALS_FILE):
+        migrate_legacy()
+    stat = os.stat(CREDENTIALS_FILE)
+    current = (stat.st_size, stat.st_mtime_ns)
+    if current == _stat:  # Nothing changed since the last read
+        return
+    if stat.st_size < _offset:  # File was replaced or truncated: index it from scratch
+        _index.clear()
+        _offset = 0
+    with open(CREDENTIALS_FILE, 'rb') as file:
+        file.seek(_offset)  # Only read what was appended since last time
+        for line in file:
+            if not line.endswith(b'\n'):  # Ignore a line that is still being written
+                break
+            _offset += len(line)
+            if line.strip():
+                record = json.loads(line)
+                _index[record['user']] = record
+    _stat = current
+
+
+# Check whether a user is registered
+def user_exists(user):
+    with _lock:
+        _refresh()
+        return user in _index
+
+
+# Register a new user; returns False if the name is taken
+def register(user, password):
+    record = make_record(user, password)  # Hash outside the lock
+    with _lock:
+        _refresh()  # Migrates the legacy logins first if needed, which takes the file lock itself
+        with File_Lock.locked(CREDENTIALS_FILE):  # No other process registers between the check and the append
+            _refresh()
+            if user in _index:
+                return False
+            _append([record])
+        _refresh()
+    return True
+
+
+# Verify a user's password, using the session cache when possible
+def verify(user, password):
+    with _lock:
+        _refresh()
+        record = _index.get(user)
+    if record is None:
+        return False
+    digest = hmac.new(_session_key, password.encode('utf-8'), 'sha256').digest()
+    cached = _sessions.get(user)
+    if cached and cached[0] == record['hash'] and hmac.compare_digest(cached[1], digest):
+        return True  # Verified earlier in this process with the same stored hash
+    computed = hash_password(password, bytes.fromhex(record['salt']), record['iterations'])
+    if not hmac.compare_digest(computed, record['hash']):
+        return False
+    _sessions[user] = (record['hash'], digest)
+    return True
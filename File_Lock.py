@@ -0,0 +1,77 @@
+import os  # Import os for the lock files
+from contextlib import contextmanager  # Import contextmanager for the lock helpers
+
+try:
+    import fcntl  # Advisory file locks (POSIX only)
+except ImportError:
+    fcntl = None
+
+# Cross-process file locks and version counters
+#
+# Several processes can share the same data files: two cashiers, the server
+# and the command-line tools. Every data file has a sidecar "<file>.lock" that
+# does two jobs:
+#   - an advisory fcntl lock. Readers take it shared and writers take it
+#     exclusive, so a write (an atomic rename or a log append) never
+#     interleaves with another process reading or writing the same file.
+#   - the file's version counter, which every write increments. A session
+#     remembers the version it loaded and passes it to its next write. If
+#     another process wrote in between, the write raises VersionConflict
+#     instead of overwriting. The session then merges the latest data and
+#     tries again (compare-and-swap).
+# The counter is incremented before the data is written, so a failed write
+# only causes a needless retry, never a missed conflict. The lock has to be
+# a separate file because data files are replaced by rename. Without fcntl
+# (Windows) the versions are still checked, but nothing is locked.
+
+LOCK_SUFFIX = '.lock'  # Appended to a data file's path to name its lock file
+VERSION_WIDTH = 20  # Bytes reserved for the counter, so updates never need a truncate
+
+
+# Raised when a file changed since the version a writer expected
+class VersionConflict(Exception):
+    def __init__(self, path, expected, current):
+        super().__init__(f"{path} is at version {current}, not {expected}: another process saved it first.")
+        self.path = path
+        self.expected = expected
+        self.current = current
+
+
+# Lock a file without touching its version; yields the lock file's descriptor
+@contextmanager
+def locked(path, exclusive=True):
+    descriptor = os.open(path + LOCK_SUFFIX, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(descriptor, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield descriptor
+    finally:
+        os.close(descriptor)  # Closing releases the lock
+
+
+# Version stored in an open lock file (0 for a new file)
+def _read_version(descriptor):
+    os.lseek(descriptor, 0, os.SEEK_SET)
+    text = os.read(descriptor, VERSION_WIDTH).strip()
+    return int(text) if text else 0
+
+
+# Hold a shared lock while reading a file; yields the version being read
+@contextmanager
+def reading(path):
+    with locked(path, exclusive=False) as descriptor:
+        yield _read_version(descriptor)
+
+
+# Hold an exclusive lock while writing a file; yields the version being written
+# (raises VersionConflict if `expected` is given and the file moved past it)
+@contextmanager
+def writing(path, expected=None):
+    with locked(path) as descriptor:
+        current = _read_version(descriptor)
+        if expected is not None and current != expected:
+            raise VersionConflict(path, expected, current)
+        os.lseek(descriptor, 0, os.SEEK_SET)
+        os.write(descriptor, str(current + 1).encode('ascii').ljust(VERSION_WIDTH))
+        os.fsync(descriptor)  # The new version must survive a crash that the data write might not
+        yield current + 1
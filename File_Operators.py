@@ -1,19 +1,12 @@
-import json
-import os
+import Instrumentation
+import Storage_Backend
 
-INVENTORY_FILE = 'inventory.json'
+INVENTORY_FILE = Storage_Backend.COLUMNAR_FILE  # Where the JSON backend keeps the inventory (kept for importers)
 
+@Instrumentation.instrument('File_Operators.load_inventory')
 def load_inventory():
-    if os.path.exists(INVENTORY_FILE):
-        with open(INVENTORY_FILE, 'r') as f:
-            return json.load(f)
-    else:
-        return {
-            'Name': [],
-            'Price': [],
-            'Count': []
-        }
+    return Storage_Backend.get_backend().load_columns()
 
+@Instrumentation.instrument('File_Operators.save_inventory')
 def save_inventory(inventory):
-    with open(INVENTORY_FILE, 'w') as f:
-        json.dump(inventory, f)
+    Storage_Backend.get_backend().save_columns(inventory)
@@ -0,0 +1,185 @@
+import functools  # Import functools to keep wrapped function metadata
+import json  # Import the JSON module for timed encoding and decoding
+import os  # Import os to read the configuration from the environment
+import threading  # Import threading for the lock and the exporter thread
+import time  # Import time for latency measurements
+
+# Operation instrumentation
+#
+# Set INVENTORY_METRICS=1 before starting the program to record per-operation
+# latency histograms and call counts, bytes read and written, and JSON
+# parse/serialize time. While enabled, the metrics are also written every
+# INVENTORY_METRICS_INTERVAL seconds to INVENTORY_METRICS_FILE in the
+# Prometheus text exposition format, for a local scraper to pick up.
+#
+# When disabled, @instrument returns the function unchanged, and the JSON
+# helpers only add one flag check before calling json.
+
+ENABLED = os.environ.get('INVENTORY_METRICS') == '1'  # Decided once, at import time
+METRICS_FILE = os.environ.get('INVENTORY_METRICS_FILE', 'metrics.prom')  # Exposition file
+EXPORT_INTERVAL = float(os.environ.get('INVENTORY_METRICS_INTERVAL', '10'))  # Seconds between exports
+BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)  # Latency bucket upper bounds (s)
+
+_lock = threading.Lock()  # Guards every metric below
+_latency = {}  # Operation -> [bucket counts..., +Inf count, total seconds]
+_bytes = {'read': {}, 'written': {}}  # Direction -> source -> bytes
+_json_seconds = {'parse': {}, 'serialize': {}}  # Phase -> source -> seconds
+
+
+# Record one latency observation for an operation
+def observe(operation, seconds):
+    with _lock:
+        histogram = _latency.get(operation)
+        if histogram is None:
+            histogram = _latency[operation] = [0] * (len(BUCKETS) + 1) + [0.0]
+        for position, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                histogram[position] += 1
+                break
+        else:
+            histogram[len(BUCKETS)] += 1  # Slower than the largest bucket
+        histogram[-1] += seconds
+
+
+# Add to a bytes counter ('read' or 'written') for a source
+def count_bytes(direction, source, amount):
+    with _lock:
+        counters = _bytes[direction]
+        counters[source] = counters.get(source, 0) + amount
+
+
+# Add JSON parse or serialize time for a source
+def _add_json_time(phase, source, seconds):
+    with _lock:
+        timers = _json_seconds[phase]
+        timers[source] = timers.get(source, 0.0) + seconds
+
+
+# Decorator recording the latency of every call under `operation`
+def instrument(operation):
+    def decorator(function):
+        if not ENABLED:  # Zero overhead when instrumentation is off
+            return function
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                observe(operation, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+# Size of a JSON document in UTF-8 bytes (json.loads also takes bytes)
+def _size(text):
+    return len(text) if isinstance(text, (bytes, bytearray)) else len(text.encode('utf-8'))
+
+
+# json.loads that records parse time and bytes read for a source
+def loads(text, source):
+    if not ENABLED:
+        return json.loads(text)
+    start = time.perf_counter()
+    data = json.loads(text)
+    _add_json_time('parse', source, time.perf_counter() - start)
+    count_bytes('read', source, _size(text))
+    return data
+
+
+# json.dumps that records serialize time and bytes written for a source
+def dumps(data, source, **options):
+    if not ENABLED:
+        return json.dumps(data, **options)
+    start = time.perf_counter()
+    text = json.dumps(data, **options)
+    _add_json_time('serialize', source, time.perf_counter() - start)
+    count_bytes('written', source, _size(text))
+    return text
+
+
+# Copy of every metric
+def snapshot():
+    with _lock:
+        return {
+            'latency': {operation: list(histogram) for operation, histogram in _latency.items()},
+            'bytes': {direction: dict(counters) for direction, counters in _bytes.items()},
+            'json_seconds': {phase: dict(timers) for phase, timers in _json_seconds.items()},
+        }
+
+
+# Human-readable report for the Stats menu
+def format_report():
+    if not ENABLED:
+        return "Instrumentation is off. Start the program with INVENTORY_METRICS=1 to collect stats."
+    data = snapshot()
+    lines = [f"{'Operation':<22}{'Calls':>8}{'Mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}"]
+    for operation, histogram in sorted(data['latency'].items()):
+        calls = sum(histogram[:-1])
+        lines.append(f"{operation:<22}{calls:>8}{histogram[-1] / calls * 1000:>10.3f}"
+                     f"{_quantile(histogram, 0.5) * 1000:>10.3f}{_quantile(histogram, 0.99) * 1000:>10.3f}")
+    for direction, counters in data['bytes'].items():
+        for source, amount in sorted(counters.items()):
+            lines.append(f"Bytes {direction} ({source}): {amount}")
+    for phase, timers in data['json_seconds'].items():
+        for source, seconds in sorted(timers.items()):
+            lines.append(f"JSON {phase} time ({source}): {seconds * 1000:.3f} ms")
+    return '\n'.join(lines)
+
+
+# Upper bucket bound containing the given quantile (histogram resolution)
+def _quantile(histogram, quantile):
+    calls = sum(histogram[:-1])
+    seen = 0
+    for position, bound in enumerate(BUCKETS):
+        seen += histogram[position]
+        if seen >= quantile * calls:
+            return bound
+    return float('inf')
+
+
+# Metrics in the Prometheus text exposition format
+def format_exposition():
+    data = snapshot()
+    lines = ['# TYPE inventory_operation_seconds histogram']
+    for operation, histogram in sorted(data['latency'].items()):
+        cumulative = 0
+        for position, bound in enumerate(BUCKETS):
+            cumulative += histogram[position]
+            lines.append(f'inventory_operation_seconds_bucket{{operation="{operation}",le="{bound}"}} {cumulative}')
+        cumulative += histogram[len(BUCKETS)]
+        lines.append(f'inventory_operation_seconds_bucket{{operation="{operation}",le="+Inf"}} {cumulative}')
+        lines.append(f'inventory_operation_seconds_sum{{operation="{operation}"}} {histogram[-1]}')
+        lines.append(f'inventory_operation_seconds_count{{operation="{operation}"}} {cumulative}')
+    for direction, counters in data['bytes'].items():
+        lines.append(f'# TYPE inventory_bytes_{direction}_total counter')
+        for source, amount in sorted(counters.items()):
+            lines.append(f'inventory_bytes_{direction}_total{{source="{source}"}} {amount}')
+    for phase, timers in data['json_seconds'].items():
+        lines.append(f'# TYPE inventory_json_{phase}_seconds_total counter')
+        for source, seconds in sorted(timers.items()):
+            lines.append(f'inventory_json_{phase}_seconds_total{{source="{source}"}} {seconds}')
+    return '\n'.join(lines) + '\n'
+
+
+# Write the exposition file atomically
+def export(path=METRICS_FILE):
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as file:
+        file.write(format_exposition())
+    os.replace(temp_path, path)
+
+
+# Background thread writing the exposition file periodically
+def _export_forever():
+    while True:
+        time.sleep(EXPORT_INTERVAL)
+        try:
+            export()
+        except OSError:  # A full disk or missing directory must not kill the app
+            pass
+
+
+if ENABLED:
+    threading.Thread(target=_export_forever, name='metrics-exporter', daemon=True).start()
@@ -0,0 +1,264 @@
+import argparse  # Import argparse for command-line options
+import bisect  # Import bisect to find price bands without numpy
+import heapq  # Import heapq for bounded top-N selection without numpy
+import json  # Import the JSON module for machine-readable reports
+import math  # Import math to round item shares up
+from array import array  # Import array for contiguous columns without numpy
+from operator import attrgetter  # Import attrgetter to read item fields
+import Credential_Store  # Import the credential store to check the user exists
+import Storage_Backend  # Import the pluggable storage backends
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Inventory analytics
+#
+# Reports on one store's (tenant's) items. The items are first copied into
+# contiguous array.array columns: name, price, count, sales_count and revenue
+# (the item's sales_price). With numpy the columns are viewed as numpy arrays
+# without copying, and every report is a handful of vectorized operations,
+# fast even at a million items. Without numpy the same reports are computed
+# in plain Python. The reports are:
+#   - ABC classification: items ranked by revenue, A covering the first 80%
+#     of revenue, B the next 15% and C the rest (and every unsold item)
+#   - sell-through: sales_count / (sales_count + count) per item, overall,
+#     and the slowest and fastest movers among items with stock
+#   - revenue concentration: the share of revenue from the top 1%, 10% and 20%
+#     of items, the items needed for half and 80% of revenue, the
+#     Herfindahl-Hirschman index and the Gini coefficient
+#   - price bands: items, units in stock, stock value and revenue per band
+#
+#   python Inventory_Analytics.py USER [--top 10] [--json]
+
+A_SHARE = 0.80  # Cumulative revenue share covered by class A
+B_SHARE = 0.95  # Cumulative revenue share covered by classes A and B
+CLASSES = ('A', 'B', 'C')
+TOP_SHARES = (0.01, 0.10, 0.20)  # Fractions of items whose revenue share is reported
+PRICE_BANDS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000)  # Lower edges of the price bands
+TOP_N = 10  # Slowest and fastest movers listed
+
+
+# A store's items as contiguous columns
+def materialize(inventory):
+    items = inventory.values()
+    columns = {name: array(code, map(attrgetter(field), items)) for name, field, code in (
+        ('price', 'price', 'd'), ('count', 'count', 'q'), ('sales_count', 'sales_count', 'q'),
+        ('revenue', 'sales_price', 'd'))}
+    if numpy is not None:  # Same memory, seen as numpy arrays
+        columns = {name: numpy.frombuffer(column, dtype=numpy.float64 if column.typecode == 'd' else numpy.int64)
+                   for name, column in columns.items()}
+    columns['names'] = list(inventory)
+    return columns
+
+
+# Row numbers ordered by revenue, highest first (ties keep their order)
+def revenue_order(columns):
+    if numpy is not None:
+        return numpy.argsort(-columns['revenue'], kind='stable')
+    revenue = columns['revenue']
+    return sorted(range(len(revenue)), key=revenue.__getitem__, reverse=True)
+
+
+# ABC classes: per class its items, revenue, revenue share, units in stock and stock value
+def abc_report(columns, order):
+    revenue, price, count = columns['revenue'], columns['price'], columns['count']
+    classes = {label: {'items': 0, 'revenue': 0.0, 'share': 0.0, 'units': 0, 'stock_value': 0.0} for label in CLASSES}
+    if numpy is not None:
+        total = float(revenue.sum())
+        ranked = revenue[order]
+        before = (numpy.cumsum(ranked) - ranked) / total if total > 0 else numpy.ones(len(ranked))
+        labels = numpy.full(len(ranked), 2, dtype=numpy.int8)
+        labels[before < B_SHARE] = 1
+        labels[before < A_SHARE] = 0
+        labels[ranked <= 0] = 2  # Unsold items are always C
+        per_item = numpy.empty_like(labels)
+        per_item[order] = labels
+        for number, label in enumerate(CLASSES):
+            chosen = per_item == number
+            classes[label].update(items=int(chosen.sum()), revenue=float(revenue[chosen].sum()),
+                                  units=int(count[chosen].sum()), stock_value=float(price[chosen] @ count[chosen]))
+    else:
+        total = sum(revenue)
+        cumulative = 0.0
+        for row in order:
+            share_before = cumulative / total if total > 0 else 1.0
+            label = 'C' if revenue[row] <= 0 or share_before >= B_SHARE else 'B' if share_before >= A_SHARE else 'A'
+            cumulative += revenue[row]
+            entry = classes[label]
+            entry['items'] += 1
+            entry['revenue'] += revenue[row]
+            entry['units'] += count[row]
+            entry['stock_value'] += price[row] * count[row]
+    for entry in classes.values():
+        entry['share'] = entry['revenue'] / total if total > 0 else 0.0
+    return classes
+
+
+# Positions of the `top` smallest values of a numpy array, smallest first (ties in position
+# order), found with a partition instead of a full sort
+def lowest_positions(values, top):
+    if top <= 0:
+        return numpy.array([], dtype=numpy.intp)
+    if len(values) <= top:
+        return numpy.argsort(values, kind='stable')
+    cutoff = numpy.partition(values, top - 1)[top - 1]
+    below = numpy.flatnonzero(values < cutoff)  # Fewer than `top` of these
+    tied = numpy.flatnonzero(values == cutoff)[:top - len(below)]
+    candidates = numpy.concatenate((below, tied))
+    return candidates[numpy.argsort(values[candidates], kind='stable')]
+
+
+# Sell-through overall and per item, with the slowest and fastest movers that still have stock
+def sell_through_report(columns, top=TOP_N):
+    names, count, sales_count = columns['names'], columns['count'], columns['sales_count']
+    if numpy is not None:
+        handled = sales_count + count
+        rate = numpy.divide(sales_count, handled, out=numpy.zeros(len(handled)), where=handled > 0)
+        stocked = numpy.flatnonzero(count > 0)
+        total_handled = int(handled.sum())
+        overall = int(sales_count.sum()) / total_handled if total_handled else 0.0
+        median = float(numpy.median(rate[handled > 0])) if total_handled else 0.0
+        stocked_rates = rate[stocked]
+        slowest = stocked[lowest_positions(stocked_rates, top)]
+        fastest = stocked[lowest_positions(-stocked_rates, top)]
+    else:
+        rate = [sold / (sold + left) if sold + left > 0 else 0.0 for sold, left in zip(sales_count, count)]
+        total_handled = sum(sales_count) + sum(count)
+        overall = sum(sales_count) / total_handled if total_handled else 0.0
+        rates = sorted(value for value, sold, left in zip(rate, sales_count, count) if sold + left > 0)
+        middle = len(rates) // 2
+        median = (rates[middle] if len(rates) % 2 else (rates[middle - 1] + rates[middle]) / 2) if rates else 0.0
+        stocked = [row for row in range(len(rate)) if count[row] > 0]
+        slowest = heapq.nsmallest(top, stocked, key=rate.__getitem__)
+        fastest = heapq.nsmallest(top, stocked, key=lambda row: -rate[row])
+    return {
+        'overall': overall,
+        'median': median,
+        'slowest': [[names[row], float(rate[row]), int(count[row])] for row in slowest],
+        'fastest': [[names[row], float(rate[row]), int(count[row])] for row in fastest],
+    }
+
+
+# Share of revenue held by the top items, items needed for 50% and 80% of it, HHI and Gini
+def concentration_report(columns, order):
+    revenue = columns['revenue']
+    items = len(revenue)
+    if numpy is not None:
+        ranked = revenue[order]
+        total = float(ranked.sum())
+        cumulative = numpy.cumsum(ranked)
+        top_shares = {share: float(cumulative[math.ceil(items * share) - 1]) for share in TOP_SHARES} if items else {}
+        needed = {share: int(numpy.searchsorted(cumulative, share * total * (1 - 1e-12))) + 1 for share in (0.5, A_SHARE)}
+        hhi = float(((ranked / total) ** 2).sum()) if total > 0 else 0.0
+        ascending = ranked[::-1]
+        weighted = float(numpy.arange(1, items + 1) @ ascending)
+    else:
+        ranked = [revenue[row] for row in order]
+        total = sum(ranked)
+        cumulative, running = [], 0.0
+        for value in ranked:
+            running += value
+            cumulative.append(running)
+        top_shares = {share: cumulative[math.ceil(items * share) - 1] for share in TOP_SHARES} if items else {}
+        needed = {share: bisect.bisect_left(cumulative, share * total * (1 - 1e-12)) + 1 for share in (0.5, A_SHARE)}
+        hhi = sum((value / total) ** 2 for value in ranked) if total > 0 else 0.0
+        weighted = sum(rank * value for rank, value in enumerate(reversed(ranked), start=1))
+    if total <= 0:
+        return {'revenue': 0.0, 'top_shares': {}, 'items_for_half': 0, 'items_for_80': 0, 'hhi': 0.0, 'gini': 0.0}
+    return {
+        'revenue': total,
+        'top_shares': {f"{share:.0%}": value / total for share, value in top_shares.items()},
+        'items_for_half': needed[0.5],
+        'items_for_80': needed[A_SHARE],
+        'hhi': hhi,
+        'gini': 2 * weighted / (items * total) - (items + 1) / items,
+    }
+
+
+# Items, units in stock, stock value and revenue per price band
+def price_band_report(columns):
+    price, count, revenue = columns['price'], columns['count'], columns['revenue']
+    bands = len(PRICE_BANDS)
+    if numpy is not None:
+        band = numpy.searchsorted(numpy.array(PRICE_BANDS, dtype=numpy.float64), price, side='right') - 1
+        band = numpy.maximum(band, 0)  # A negative price counts in the lowest band
+        totals = {
+            'items': numpy.bincount(band, minlength=bands),
+            'units': numpy.bincount(band, weights=count, minlength=bands),
+            'stock_value': numpy.bincount(band, weights=price * count, minlength=bands),
+            'revenue': numpy.bincount(band, weights=revenue, minlength=bands),
+        }
+        totals = {key: values.tolist() for key, values in totals.items()}
+    else:
+        totals = {key: [0] * bands for key in ('items', 'units', 'stock_value', 'revenue')}
+        for item_price, item_count, item_revenue in zip(price, count, revenue):
+            band = max(bisect.bisect_right(PRICE_BANDS, item_price) - 1, 0)  # A negative price counts in the lowest band
+            totals['items'][band] += 1
+            totals['units'][band] += item_count
+            totals['stock_value'][band] += item_price * item_count
+            totals['revenue'][band] += item_revenue
+    report = []
+    for band, low in enumerate(PRICE_BANDS):
+        high = PRICE_BANDS[band + 1] if band + 1 < bands else None
+        report.append({'band': f"{low}-{high}" if high is not None else f"{low}+", 'items': int(totals['items'][band]),
+                       'units': int(totals['units'][band]), 'stock_value': float(totals['stock_value'][band]),
+                       'revenue': float(totals['revenue'][band])})
+    return report
+
+
+# Every report for one store's inventory ({name: Item})
+def inventory_report(inventory, top=TOP_N):
+    columns = materialize(inventory)
+    order = revenue_order(columns)
+    return {
+        'items': len(columns['names']),
+        'abc': abc_report(columns, order),
+        'sell_through': sell_through_report(columns, top),
+        'concentration': concentration_report(columns, order),
+        'price_bands': price_band_report(columns),
+    }
+
+
+# Human-readable report
+def format_report(report):
+    lines = [f"📦 Items: {report['items']}", "\n🔤 ABC classes (by cumulative revenue):"]
+    for label, entry in report['abc'].items():
+        lines.append(f"  {label}: {entry['items']} item(s), revenue {entry['revenue']:.2f} ({entry['share']:.1%}), "
+                     f"{entry['units']} unit(s) in stock worth {entry['stock_value']:.2f}")
+    sell_through = report['sell_through']
+    lines.append(f"\n🚚 Sell-through: {sell_through['overall']:.1%} overall, {sell_through['median']:.1%} median item")
+    for title, key in (("Slowest movers", 'slowest'), ("Fastest movers", 'fastest')):
+        lines.append(f"  {title}: " + (', '.join(f"{name} ({rate:.1%}, {count} left)"
+                                                  for name, rate, count in sell_through[key]) or 'none'))
+    concentration = report['concentration']
+    lines.append(f"\n🎯 Revenue concentration: revenue {concentration['revenue']:.2f}")
+    if concentration['top_shares']:
+        lines.append("  " + ', '.join(f"top {items} of items: {share:.1%}"
+                                      for items, share in concentration['top_shares'].items()))
+        lines.append(f"  {concentration['items_for_half']} item(s) make half the revenue, "
+                     f"{concentration['items_for_80']} make 80%")
+        lines.append(f"  HHI {concentration['hhi']:.4f}, Gini {concentration['gini']:.3f}")
+    lines.append("\n💲 Price bands:")
+    for band in report['price_bands']:
+        if band['items']:
+            lines.append(f"  {band['band']:>9}: {band['items']} item(s), {band['units']} unit(s), "
+                         f"stock value {band['stock_value']:.2f}, revenue {band['revenue']:.2f}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ABC classes, sell-through, revenue concentration and price bands of a store.")
+    parser.add_argument('user', help="Store (user) to report on")
+    parser.add_argument('--top', type=int, default=TOP_N, help="Slowest and fastest movers to list")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    args = parser.parse_args()
+    if not Credential_Store.user_exists(args.user):
+        parser.error(f"Unknown user '{args.user}'.")
+    report = inventory_report(Storage_Backend.get_backend().load_tenant(args.user)['inventory'], args.top)
+    print(json.dumps(report) if args.json else format_report(report))
+
+
+if __name__ == "__main__":
+    main()
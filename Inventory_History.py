@@ -0,0 +1,309 @@
+import time  # Import time to timestamp versions
+
+# Inventory versions with structural sharing
+#
+# Every change to the inventory becomes a version that can be undone, redone
+# or viewed later. A version's items live in a PersistentMap, a hash trie
+# that is never modified in place:
+#   - setting or removing a key copies only the nodes on the path from the
+#     root to that key (a few 32-way nodes) and shares the rest with the
+#     previous version. Recording a version costs O(changed items), not
+#     O(catalog), and versions are cheap to keep.
+#   - each node stores a 32-bit bitmap of the slots in use and a tuple of
+#     only those children, so sparse nodes stay small.
+# History keeps the recent versions of one inventory. Each version also
+# keeps the names it changed, so undo and redo only touch those items. The
+# retention policy bounds memory: only the newest `limit` versions are kept,
+# and optionally only those younger than `max_age` seconds. Nodes that no
+# kept version shares are freed as usual.
+
+BITS = 5  # Hash bits consumed per trie level
+WIDTH = 1 << BITS  # Children per node
+MASK = WIDTH - 1
+HASH_BITS = 64  # Keys whose 64-bit hashes are equal end up in one collision node
+HASH_MASK = (1 << HASH_BITS) - 1
+
+
+# Trie node: a bitmap of the slots in use and their children, in slot order.
+# A child is a (key, value) leaf or another node.
+class _Node:
+    __slots__ = ('bitmap', 'children')
+
+    def __init__(self, bitmap, children):
+        self.bitmap = bitmap
+        self.children = children
+
+
+# Keys whose whole hashes are equal, as a tuple of (key, value) leaves
+class _Collision:
+    __slots__ = ('leaves',)
+
+    def __init__(self, leaves):
+        self.leaves = leaves
+
+
+EMPTY_NODE = _Node(0, ())
+_MISSING = object()  # Default that no stored value can equal
+
+
+# Hash of a key as a non-negative 64-bit number
+def _hash(key):
+    return hash(key) & HASH_MASK
+
+
+# Subtree holding two leaves whose hashes agree below `shift`
+def _pair(shift, leaf, leaf_hash, other, other_hash):
+    if shift >= HASH_BITS:
+        return _Collision((leaf, other))
+    slot = (leaf_hash >> shift) & MASK
+    other_slot = (other_hash >> shift) & MASK
+    if slot == other_slot:
+        return _Node(1 << slot, (_pair(shift + BITS, leaf, leaf_hash, other, other_hash),))
+    children = (leaf, other) if slot < other_slot else (other, leaf)
+    return _Node((1 << slot) | (1 << other_slot), children)
+
+
+# Copy of a node with key set to value; returns (node, whether the key is new)
+def _set(node, shift, key_hash, key, value):
+    if type(node) is _Collision:
+        for position, leaf in enumerate(node.leaves):
+            if leaf[0] == key:
+                return _Collision(node.leaves[:position] + ((key, value),) + node.leaves[position + 1:]), False
+        return _Collision(node.leaves + ((key, value),)), True
+    bit = 1 << ((key_hash >> shift) & MASK)
+    position = (node.bitmap & (bit - 1)).bit_count()
+    children = node.children
+    if not node.bitmap & bit:
+        return _Node(node.bitmap | bit, children[:position] + ((key, value),) + children[position:]), True
+    child = children[position]
+    if type(child) is tuple:
+        if child[0] == key:
+            new_child, added = (key, value), False
+        else:
+            new_child, added = _pair(shift + BITS, child, _hash(child[0]), (key, value), key_hash), True
+    else:
+        new_child, added = _set(child, shift + BITS, key_hash, key, value)
+    return _Node(node.bitmap, children[:position] + (new_child,) + children[position + 1:]), added
+
+
+# Copy of a node without key: the node itself if the key is absent, a single
+# remaining leaf (to be stored in the parent directly) or None if nothing is left
+def _remove(node, shift, key_hash, key):
+    if type(node) is _Collision:
+        leaves = tuple(leaf for leaf in node.leaves if leaf[0] != key)
+        if len(leaves) == len(node.leaves):
+            return node
+        return leaves[0] if len(leaves) == 1 else _Collision(leaves)
+    bit = 1 << ((key_hash >> shift) & MASK)
+    if not node.bitmap & bit:
+        return node
+    position = (node.bitmap & (bit - 1)).bit_count()
+    children = node.children
+    child = children[position]
+    if type(child) is tuple:
+        if child[0] != key:
+            return node
+        new_child = None
+    else:
+        new_child = _remove(child, shift + BITS, key_hash, key)
+        if new_child is child:
+            return node
+    if new_child is None:
+        if len(children) == 1:
+            return None
+        if len(children) == 2 and type(children[1 - position]) is tuple:
+            return children[1 - position]
+        return _Node(node.bitmap & ~bit, children[:position] + children[position + 1:])
+    if len(children) == 1 and type(new_child) is tuple:
+        return new_child
+    return _Node(node.bitmap, children[:position] + (new_child,) + children[position + 1:])
+
+
+# Node holding (hash, key, value) entries whose hashes agree below `shift`
+def _build(entries, shift):
+    if len(entries) == 1:
+        return entries[0][1:]
+    if shift >= HASH_BITS:
+        return _Collision(tuple(entry[1:] for entry in entries))
+    slots = {}
+    for entry in entries:
+        slots.setdefault((entry[0] >> shift) & MASK, []).append(entry)
+    bitmap = 0
+    for slot in slots:
+        bitmap |= 1 << slot
+    return _Node(bitmap, tuple(_build(slots[slot], shift + BITS) for slot in sorted(slots)))
+
+
+# (key, value) leaves below a node
+def _leaves(node):
+    if type(node) is tuple:
+        yield node
+    elif type(node) is _Collision:
+        yield from node.leaves
+    else:
+        for child in node.children:
+            yield from _leaves(child)
+
+
+# Immutable hash map; set() and remove() return a new map sharing most nodes with this one
+class PersistentMap:
+    __slots__ = ('root', 'size')
+
+    def __init__(self, root=EMPTY_NODE, size=0):
+        self.root = root
+        self.size = size
+
+    # Map of a dict or iterable of (key, value) pairs, built in one pass without copying
+    @classmethod
+    def from_items(cls, items):
+        items = dict(items)
+        if not items:
+            return cls()
+        root = _build([(_hash(key), key, value) for key, value in items.items()], 0)
+        if type(root) is tuple:
+            root = _Node(1 << (_hash(root[0]) & MASK), (root,))
+        return cls(root, len(items))
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __iter__(self):
+        return (key for key, _ in _leaves(self.root))
+
+    def items(self):
+        return _leaves(self.root)
+
+    def get(self, key, default=None):
+        key_hash = _hash(key)
+        node, shift = self.root, 0
+        while True:
+            if type(node) is _Collision:
+                for leaf in node.leaves:
+                    if leaf[0] == key:
+                        return leaf[1]
+                return default
+            bit = 1 << ((key_hash >> shift) & MASK)
+            if not node.bitmap & bit:
+                return default
+            node = node.children[(node.bitmap & (bit - 1)).bit_count()]
+            if type(node) is tuple:
+                return node[1] if node[0] == key else default
+            shift += BITS
+
+    def set(self, key, value):
+        root, added = _set(self.root, 0, _hash(key), key, value)
+        return PersistentMap(root, self.size + added)
+
+    def remove(self, key):
+        key_hash = _hash(key)
+        root = _remove(self.root, 0, key_hash, key)
+        if root is self.root:
+            return self
+        if root is None:
+            return PersistentMap()
+        if type(root) is tuple:
+            root = _Node(1 << (_hash(root[0]) & MASK), (root,))
+        return PersistentMap(root, self.size - 1)
+
+
+
+# One recorded state of the inventory
+class Version:
+    __slots__ = ('number', 'time', 'items', 'total_sales', 'changed')
+
+    def __init__(self, number, time, items, total_sales, changed):
+        self.number = number  # Counts up from 0, the state the history started from
+        self.time = time  # When it was recorded (time.time())
+        self.items = items  # PersistentMap of name -> row tuple
+        self.total_sales = total_sales
+        self.changed = changed  # Names that differ from the previous version
+
+
+# Recent versions of one inventory, with undo and redo
+class History:
+    def __init__(self, items=(), total_sales=0.0, limit=100, max_age=None):
+        self.limit = limit  # Versions kept at most (at least 1)
+        self.max_age = max_age  # Seconds a version is kept, or None for no age limit
+        self.versions = [Version(0, time.time(), PersistentMap.from_items(items), total_sales, ())]
+        self.position = 0  # Index of the current version; later ones can be redone
+        self.pending = set()  # Names changed since the current version
+
+    @property
+    def current(self):
+        return self.versions[self.position]
+
+    # Note that an item changed (it is read back when the version is recorded)
+    def touch(self, name):
+        self.pending.add(name)
+
+    # Record a new version from the changed rows (name -> row, or None if the
+    # item is gone); returns it, or None if nothing changed. Later versions
+    # can no longer be redone.
+    def record(self, rows, total_sales):
+        current = self.current
+        items = current.items
+        changed = []
+        for name, row in rows.items():
+            if row is None:
+                updated = items.remove(name)
+            elif items.get(name) != row:
+                updated = items.set(name, row)
+            else:
+                continue
+            if updated is not items:
+                items = updated
+                changed.append(name)
+        self.pending.clear()
+        if not changed and total_sales == current.total_sales:
+            return None
+        version = Version(self.versions[-1].number + 1, time.time(), items, total_sales, tuple(changed))
+        del self.versions[self.position + 1:]
+        self.versions.append(version)
+        self.position += 1
+        self.trim()
+        return version
+
+    # Drop versions beyond the retention limits (never the current one)
+    def trim(self):
+        drop = max(len(self.versions) - max(self.limit, 1), 0)
+        if self.max_age is not None:
+            oldest = time.time() - self.max_age
+            while drop < len(self.versions) - 1 and self.versions[drop].time < oldest:
+                drop += 1
+        drop = min(drop, self.position)
+        if drop:
+            del self.versions[:drop]
+            self.position -= drop
+
+    # Step back one version; returns (version, names to restore) or None at the oldest kept one
+    def undo(self):
+        if self.position == 0:
+            return None
+        changed = self.current.changed
+        self.position -= 1
+        return self.current, changed
+
+    # Step forward one undone version; returns (version, names to restore) or None
+    def redo(self):
+        if self.position == len(self.versions) - 1:
+            return None
+        self.position += 1
+        return self.current, self.current.changed
+
+    # Kept version with this number, or None
+    def find(self, number):
+        for version in self.versions:
+            if version.number == number:
+                return version
+        return None
+
+    # Latest kept version recorded at or before a time, or None
+    def as_of(self, when):
+        found = None
+        for version in self.versions:
+            if version.time <= when:
+                found = version
+        return found
@@ -0,0 +1,58 @@
+# Inventory items
+#
+# Each item of the per-user layout is an Item with __slots__ instead of a dict
+# of four string keys. That drops the per-item hash table: an Item is a fixed
+# 64-byte object (plus its values), so a million SKUs cost far less memory.
+# On disk items keep their JSON shape, {'price', 'count', 'sales_count',
+# 'sales_price'}: to_dict/from_dict convert at the edges, and encode() is the
+# `default` hook that lets json.dumps write Items directly.
+
+FIELDS = ('price', 'count', 'sales_count', 'sales_price')  # Item fields in their JSON order
+
+
+# One SKU: price, stock and all-time sales
+class Item:
+    __slots__ = FIELDS
+
+    def __init__(self, price, count, sales_count=0, sales_price=0.0):
+        self.price = price
+        self.count = count
+        self.sales_count = sales_count
+        self.sales_price = sales_price
+
+    def __repr__(self):
+        return (f"Item(price={self.price!r}, count={self.count!r}, "
+                f"sales_count={self.sales_count!r}, sales_price={self.sales_price!r})")
+
+    def __eq__(self, other):
+        if not isinstance(other, Item):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    # Build an item from its JSON dict (sales default to zero)
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['price'], data['count'], data.get('sales_count', 0), data.get('sales_price', 0.0))
+
+    # The item's JSON dict
+    def to_dict(self):
+        return {'price': self.price, 'count': self.count, 'sales_count': self.sales_count, 'sales_price': self.sales_price}
+
+    # Independent copy of the item
+    def copy(self):
+        return Item(self.price, self.count, self.sales_count, self.sales_price)
+
+
+# json.dumps `default` hook: encode Items as their JSON dict
+def encode(value):
+    if isinstance(value, Item):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# Replace every JSON dict in an inventory with an Item, in place (one dict is freed per step)
+def from_json(inventory):
+    for name, data in inventory.items():
+        if not isinstance(data, Item):
+            inventory[name] = Item.from_dict(data)
+    return inventory
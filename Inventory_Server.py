@@ -0,0 +1,345 @@
+import argparse  # Import argparse for command-line options
+import asyncio  # Import asyncio for the concurrent network server
+import json  # Import the JSON module for the line protocol
+from datetime import datetime  # Import datetime to timestamp sales and replay them after a merge
+import Credential_Store  # Import the hashed credential store
+import Inventory_Item  # Import the slotted item record
+import Sales_Ledger  # Import the sales ledger and rollups
+import Storage_Backend  # Import the pluggable storage backends
+import Transaction_Log  # Import the log compaction setting
+
+# Inventory network server
+#
+# Plain TCP line protocol: each request and response is one JSON object per
+# line. A connection starts with {"op": "login", "user": ..., "password": ...}
+# and then sends operations such as {"op": "buy_item", "name": "Tea", "quantity": 2}.
+# Every response has "ok" plus either the result or an "error" message.
+#
+# Each user's data is loaded once and kept in memory. Stock checks and updates
+# happen under a per-item lock, so concurrent purchases of the same item can
+# never oversell. Adding and deleting items takes the user's lock. Changes are
+# collected per user and written to the transaction log by a background task,
+# so no request waits for disk I/O.
+# Other processes (Main_Menu.py sessions, another server) may write the same
+# user's data. Every write passes the version the server last loaded or wrote,
+# and when another process wrote first the server reloads the user's data and
+# re-applies its pending changes on top, the same way Main_Menu.rebase does.
+
+FLUSH_INTERVAL = 0.5  # Seconds between background writes of pending changes
+
+
+# In-memory state of one logged-in user
+class Tenant:
+    def __init__(self, user):
+        self.user = user
+        self.data = Storage_Backend.get_backend().load_tenant(user)  # Inventory, total sales and rollups
+        self.version = self.data.pop('version')  # Version of the stored data the pending changes build on
+        self.lock = asyncio.Lock()  # Guards adding and deleting items
+        self.item_locks = {}  # Item name -> asyncio.Lock guarding that item's stock
+        self.dirty = set()  # Items changed since the last flush
+        self.sales = {}  # Item name -> [[timestamp, quantity, amount], ...] sold since the last flush
+        self.ledger = []  # (name, quantity, amount, time) sales waiting to be appended
+        self.fields = {}  # Item name -> fields set outright since the last flush ('price', 'count' or 'item')
+        self.unledgered = []  # Sales whose record is written but which aren't in the ledger yet
+        self.log_records = 0  # Records in the user's transaction log after the last flush
+
+    # Lock for one item, created on first use
+    def item_lock(self, name):
+        lock = self.item_locks.get(name)
+        if lock is None:
+            lock = self.item_locks[name] = asyncio.Lock()
+        return lock
+
+    # Mark an item as changed; `field` names what was set outright ('item' for the whole item)
+    def touch(self, name, field=None):
+        self.dirty.add(name)
+        if field is not None:
+            self.fields.setdefault(name, set()).add(field)
+
+    # Take the pending changes as a transaction-log record plus the taken changes
+    # (the record is None if there are none)
+    def take_changes(self):
+        if not self.dirty:
+            return None, None
+        inventory = self.data['inventory']
+        batch = []
+        for name in self.dirty:
+            item = inventory.get(name)
+            entry = {'name': name, 'item': item.to_dict() if item is not None else None}  # Copy for the writer thread
+            if name in self.sales:
+                entry['sales'] = self.sales[name]
+            batch.append(entry)
+        record = {'user': self.user, 'batch': batch, 'total_sales': self.data['total_sales']}
+        taken = self.dirty, self.sales, self.ledger, self.fields
+        self.dirty, self.sales, self.ledger, self.fields = set(), {}, [], {}
+        return record, taken
+
+    # Put changes whose write failed back in front of the ones made since
+    def restore(self, taken):
+        dirty, sales, ledger, fields = taken
+        for name, newer in self.sales.items():
+            sales.setdefault(name, []).extend(newer)
+        for name, newer in self.fields.items():
+            fields.setdefault(name, set()).update(newer)
+        self.dirty, self.sales, self.ledger, self.fields = dirty | self.dirty, sales, ledger + self.ledger, fields
+
+    # Merge another process's writes: adopt `latest` (freshly loaded) and re-apply the pending
+    # changes on top. Sales are re-applied as deltas, so both processes' sales count; fields set
+    # here (a price, a count, or a whole added or deleted item) replace the stored ones
+    def rebase(self, latest):
+        merged = latest['inventory']
+        inventory = self.data['inventory']
+        for name in self.dirty:
+            fields = self.fields.get(name, ())
+            ours = inventory.get(name)
+            if 'item' in fields or name not in merged:  # Set here outright, or deleted there
+                if ours is None:
+                    merged.pop(name, None)
+                else:
+                    merged[name] = ours
+            else:
+                item = merged[name]
+                for _, quantity, amount in self.sales.get(name, ()):
+                    item.count = max(item.count - quantity, 0)  # Both processes may have sold the last units
+                    item.sales_count += quantity
+                    item.sales_price += amount
+                if 'price' in fields:
+                    item.price = ours.price
+                if 'count' in fields:
+                    item.count = ours.count
+        sold = 0.0
+        for name, sales in self.sales.items():
+            for stamp, quantity, amount in sales:
+                Sales_Ledger.record_sale(latest['rollups'], name, quantity, amount, datetime.fromisoformat(stamp))
+                sold += amount
+        self.version = latest.pop('version')
+        latest['total_sales'] += sold
+        self.data = latest
+
+
+# Server holding every logged-in user's state
+class InventoryServer:
+    def __init__(self, flush_interval=FLUSH_INTERVAL):
+        self.tenants = {}  # User name -> Tenant
+        self.flush_interval = flush_interval
+
+    # Get (and load on first use) a user's state
+    def tenant(self, user):
+        if user not in self.tenants:
+            self.tenants[user] = Tenant(user)
+        return self.tenants[user]
+
+    # Check a user's password (hashing runs in a worker thread, off the event loop)
+    async def authenticate(self, user, password):
+        if not isinstance(user, str) or not isinstance(password, str):
+            return False
+        return await asyncio.to_thread(Credential_Store.verify, user, password)
+
+    # Operations: each takes the user's state and the request, returns a result dict
+
+    async def op_display_inventory(self, tenant, request):
+        inventory = tenant.data['inventory']
+        items = {name: item.to_dict() for name, item in inventory.items()}  # Copy so later changes don't leak
+        return {'inventory': items, 'total_sales': tenant.data['total_sales']}
+
+    async def op_add_item(self, tenant, request):
+        name = request['name']
+        price = float(request['price'])
+        count = int(request['count'])
+        if price < 0 or count < 0:
+            raise ValueError("Price and count must not be negative.")
+        async with tenant.lock:
+            if name in tenant.data['inventory']:
+                raise ValueError(f"Item '{name}' already exists.")
+            tenant.data['inventory'][name] = Inventory_Item.Item(price, count)
+            tenant.touch(name, 'item')
+        return {'name': name}
+
+    async def op_buy_item(self, tenant, request):
+        name = request['name']
+        quantity = int(request['quantity'])
+        if quantity <= 0:
+            raise ValueError("Quantity must be positive.")
+        async with tenant.item_lock(name):
+            item = tenant.data['inventory'].get(name)
+            if item is None:
+                raise KeyError(name)
+            if item.count < quantity:
+                raise ValueError(f"Insufficient stock for '{name}'.")
+            amount = quantity * item.price
+            now = datetime.now()
+            item.count -= quantity
+            item.sales_count += quantity
+            item.sales_price += amount
+            tenant.data['total_sales'] += amount
+            Sales_Ledger.record_sale(tenant.data['rollups'], name, quantity, amount, now)
+            tenant.sales.setdefault(name, []).append([now.isoformat(timespec='seconds'), quantity, amount])
+            tenant.ledger.append((name, quantity, amount, now))
+            tenant.touch(name)
+        return {'name': name, 'quantity': quantity, 'amount': amount, 'count': item.count}
+
+    async def op_change_price(self, tenant, request):
+        name = request['name']
+        price = float(request['price'])
+        if price < 0:
+            raise ValueError("Price must not be negative.")
+        async with tenant.item_lock(name):
+            item = tenant.data['inventory'].get(name)
+            if item is None:
+                raise KeyError(name)
+            item.price = price
+            tenant.touch(name, 'price')
+        return {'name': name, 'price': price}
+
+    async def op_update_inventory(self, tenant, request):
+        name = request['name']
+        count = int(request['count'])
+        if count < 0:
+            raise ValueError("Count must not be negative.")
+        async with tenant.item_lock(name):
+            item = tenant.data['inventory'].get(name)
+            if item is None:
+                raise KeyError(name)
+            item.count = count
+            tenant.touch(name, 'count')
+        return {'name': name, 'count': count}
+
+    async def op_delete_item(self, tenant, request):
+        name = request['name']
+        async with tenant.lock, tenant.item_lock(name):
+            if tenant.data['inventory'].pop(name, None) is None:
+                raise KeyError(name)
+            tenant.touch(name, 'item')
+        return {'name': name}
+
+    # Handle one request line and build the response
+    async def dispatch(self, session, request):
+        op = request.get('op')
+        if op == 'login':
+            if not await self.authenticate(request.get('user'), request.get('password')):
+                return {'ok': False, 'error': 'Invalid username or password.'}
+            session['tenant'] = self.tenant(request['user'])
+            return {'ok': True}
+        if session.get('tenant') is None:
+            return {'ok': False, 'error': 'Not logged in.'}
+        handler = getattr(self, f'op_{op}', None)
+        if handler is None:
+            return {'ok': False, 'error': f"Unknown operation '{op}'."}
+        try:
+            result = await handler(session['tenant'], request)
+        except KeyError as error:  # Missing field or unknown item
+            return {'ok': False, 'error': f"Item or field {error} not found."}
+        except (TypeError, ValueError) as error:  # Bad values or business rule violations
+            return {'ok': False, 'error': str(error)}
+        return {'ok': True, **result}
+
+    # Serve one client connection
+    async def handle_client(self, reader, writer):
+        session = {}
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:  # Client closed the connection
+                    break
+                try:
+                    request = json.loads(line)
+                    response = await self.dispatch(session, request) if isinstance(request, dict) else {'ok': False, 'error': 'Request must be an object.'}
+                except json.JSONDecodeError:
+                    response = {'ok': False, 'error': 'Malformed JSON.'}
+                writer.write(json.dumps(response).encode('utf-8') + b'\n')
+                await writer.drain()
+        except ConnectionError:  # Client went away mid-request
+            pass
+        finally:
+            writer.close()
+
+    # Write every user's pending changes (file I/O runs in a worker thread)
+    async def flush(self):
+        for tenant in list(self.tenants.values()):
+            await self.flush_tenant(tenant)
+
+    # Write one user's pending changes, merging other processes' writes first whenever one wrote in between.
+    # Once the record is in, the ledger append and the compaction only follow it: if one of them fails,
+    # it is retried by a later flush, never the record itself (which would count its sales twice)
+    async def flush_tenant(self, tenant):
+        backend = Storage_Backend.get_backend()
+        snapshot = None
+        while True:
+            record, taken = tenant.take_changes()
+            if record is None:
+                break
+            # A compaction snapshot must match the record exactly, so take it now, before any await
+            snapshot = copy_data(tenant.data) if tenant.log_records + 1 >= Transaction_Log.COMPACT_THRESHOLD else None
+            version = tenant.version
+            try:
+                tenant.log_records = await asyncio.to_thread(backend.record_changes, tenant.user, record, version)
+            except Storage_Backend.VersionConflict:  # Another process wrote first: merge, then write again
+                tenant.restore(taken)
+                tenant.rebase(await asyncio.to_thread(backend.load_tenant, tenant.user))
+                continue
+            except Exception:
+                tenant.restore(taken)
+                raise
+            tenant.version = None if version is None else version + 1
+            tenant.unledgered.extend(taken[2])
+            break
+
+        if tenant.unledgered:  # Only once their record is in, so a retried batch never reaches the ledger twice
+            sales, tenant.unledgered = tenant.unledgered, []
+            try:
+                await asyncio.to_thread(backend.append_sales, tenant.user, sales)
+            except Exception:
+                tenant.unledgered = sales + tenant.unledgered
+                raise
+        if snapshot is not None:  # The log is long enough to fold into a fresh snapshot
+            version = tenant.version
+            try:
+                await asyncio.to_thread(backend.save_tenant, tenant.user, snapshot, version)
+            except Storage_Backend.VersionConflict:  # Another process wrote meanwhile: a later flush compacts
+                return
+            tenant.version = None if version is None else version + 1
+            tenant.log_records = 0
+
+    # Flush pending changes periodically
+    async def flush_forever(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as error:  # The changes stay pending and are retried on the next tick
+                print(f"⚠️ Background save failed: {error}")
+
+    # Run the server until cancelled, flushing once more on the way out
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle_client, host, port)
+        flusher = asyncio.create_task(self.flush_forever())
+        print(f"📡 Inventory server listening on {host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            flusher.cancel()
+            await self.flush()
+
+
+# Deep copy of a user's data for writing from another thread
+def copy_data(data):
+    copy = json.loads(json.dumps({key: value for key, value in data.items() if key != 'inventory'}))
+    copy['inventory'] = {name: item.copy() for name, item in data['inventory'].items()}
+    return copy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve inventory operations over TCP.")
+    parser.add_argument('--host', default='127.0.0.1', help="Address to listen on")
+    parser.add_argument('--port', type=int, default=8765, help="Port to listen on")
+    parser.add_argument('--flush-interval', type=float, default=FLUSH_INTERVAL, help="Seconds between background writes")
+    args = parser.parse_args()
+    try:
+        asyncio.run(InventoryServer(args.flush_interval).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("👋 Server stopped.")
+
+
+if __name__ == "__main__":
+    main()
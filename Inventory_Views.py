@@ -0,0 +1,104 @@
+import heapq  # Import heapq for bounded top-N and page selection
+from itertools import islice  # Import islice to cut pages out of a stream
+
+# Streaming inventory views
+#
+# Both inventory layouts produce rows as (name, price, count, ...) tuples from
+# a generator. The helpers below filter, page and rank those rows without
+# building the whole table. Sorted pages and top-N views keep at most
+# (page + 1) * page_size or N rows in a heap, however large the catalog is.
+
+NAME, PRICE, COUNT = 0, 1, 2  # Row positions shared by both layouts
+SORT_KEYS = {'name': NAME, 'price': PRICE, 'count': COUNT}  # Sortable columns
+
+
+# Keep only rows matching the given name prefix, stock range and price range
+def filter_rows(rows, name_prefix=None, min_stock=None, max_stock=None, min_price=None, max_price=None):
+    for row in rows:
+        if name_prefix and not row[NAME].startswith(name_prefix):
+            continue
+        if min_stock is not None and row[COUNT] < min_stock:
+            continue
+        if max_stock is not None and row[COUNT] > max_stock:
+            continue
+        if min_price is not None and row[PRICE] < min_price:
+            continue
+        if max_price is not None and row[PRICE] > max_price:
+            continue
+        yield row
+
+
+# Rows of one page (0-based), optionally sorted by a row position
+def page_rows(rows, page, page_size, sort_by=None, descending=False):
+    start = page * page_size
+    if sort_by is None:  # Natural order: just skip ahead in the stream
+        return list(islice(rows, start, start + page_size))
+    select = heapq.nlargest if descending else heapq.nsmallest
+    return select(start + page_size, rows, key=lambda row: row[sort_by])[start:]
+
+
+# The n rows with the largest (or smallest) value at a row position
+def top_rows(rows, n, position, largest=True):
+    select = heapq.nlargest if largest else heapq.nsmallest
+    return select(n, rows, key=lambda row: row[position])
+
+
+# Read an optional number from the user (blank means no limit)
+def ask_number(prompt, convert=float):
+    value = input(prompt).strip()
+    return convert(value) if value else None
+
+
+# Interactive browser shared by both layouts
+#
+# make_rows() returns a fresh row generator, show_rows(rows) prints a list of
+# rows, and rankings maps a menu label to (row position, largest first).
+def browse(make_rows, show_rows, rankings):
+    options = ['Filtered and sorted pages'] + list(rankings)
+    for number, label in enumerate(options, start=1):
+        print(f"{number}. {label}")
+    choice = input(f"Enter browse option (1-{len(options)}): ").strip()
+    if not choice.isdigit() or not 1 <= int(choice) <= len(options):
+        print("❌ Invalid option.")
+        return
+    try:
+        if choice == '1':
+            prefix = input("Name starts with (blank for any): ").strip() or None
+            min_stock = ask_number("Minimum stock (blank for none): ", int)
+            max_stock = ask_number("Maximum stock (blank for none): ", int)
+            min_price = ask_number("Minimum price (blank for none): ")
+            max_price = ask_number("Maximum price (blank for none): ")
+            sort = input("Sort by (name/price/count, blank for none): ").strip().lower()
+            descending = sort and input("Descending? (y/n): ").strip().lower() == 'y'
+            page_size = ask_number("Rows per page (default 20): ", int) or 20
+            if page_size < 0:
+                raise ValueError(page_size)
+        else:
+            n = ask_number("How many items? (default 10): ", int) or 10
+            if n < 0:
+                raise ValueError(n)
+    except ValueError:
+        print("❌ Invalid number.")
+        return
+
+    if choice != '1':  # Bounded-heap ranking
+        position, largest = rankings[options[int(choice) - 1]]
+        show_rows(top_rows(make_rows(), n, position, largest))
+        return
+    if sort and sort not in SORT_KEYS:
+        print("❌ Invalid sort column.")
+        return
+
+    page = 0
+    while True:
+        rows = filter_rows(make_rows(), prefix, min_stock, max_stock, min_price, max_price)
+        rows = page_rows(rows, page, page_size, SORT_KEYS.get(sort), descending)
+        print(f"\nPage {page + 1}")
+        show_rows(rows)
+        command = input("n = next page, p = previous page, q = quit: ").strip().lower()
+        if command == 'n' and len(rows) == page_size:
+            page += 1
+        elif command == 'p' and page > 0:
+            page -= 1
+        elif command == 'q':
+            break
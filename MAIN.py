@@ -1,22 +1,703 @@
-import json
+import operator
+import sys
+import time
+from array import array
+from itertools import repeat
+
+import Instrumentation
+import Inventory_History
+import Inventory_Views
+import Name_Search
+import Reorder_Index
+import Storage_Backend
 
 # File operations
 
+INDEX_KEY = '_name_index'  # In-memory name -> row index, never written to disk
+SEARCH_KEY = '_search_index'  # In-memory Name_Search.NameIndex, built on first search
+REORDER_KEY = '_reorder_index'  # In-memory Reorder_Index.ReorderIndex, built on first report
+HISTORY_KEY = '_history'  # In-memory Inventory_History.History, kept by the interactive program
+VERSION_KEY = '_version'  # Stored version this inventory was loaded or last saved at
+BASE_KEY = '_base'  # Copy of the columns as loaded or last saved, for merging other sessions' saves
+SAVE_RETRIES = 10  # Merge-and-retry rounds before a save gives up on a busy store
+REPORT_LOWEST = 10  # Lowest-stock items listed by the reorder report
+HISTORY_LIMIT = 100  # Versions kept for undo and viewing
+HISTORY_MAX_AGE = None  # Seconds a version is kept (None: only HISTORY_LIMIT applies)
+
+on_reorder = None  # Called as on_reorder(name, count, reorder_point) when an item reaches its reorder point
+_numpy = None  # numpy once load_numpy() has imported it (False if it isn't installed)
+
+def load_numpy():
+    """
+    Import numpy on first use, so starting the program doesn't pay for it.
+
+    Returns:
+    - module or None: numpy, or None if it isn't installed.
+    """
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+def new_inventory(names=(), prices=(), counts=(), total_sales=0.0, reorder_points=()):
+    """
+    Build an inventory with typed columns.
+
+    Names are interned, prices are stored in a float64 array and counts
+    and reorder points in int64 arrays, so each SKU costs a few bytes per
+    column instead of a boxed Python object.
+
+    Parameters:
+    - names (iterable): Item names.
+    - prices (iterable): Item prices.
+    - counts (iterable): Item counts.
+    - total_sales (float): Total sales so far.
+    - reorder_points (iterable): Item reorder points; missing ones are 0.
+
+    Returns:
+    - dict: The inventory dictionary.
+
+    Raises:
+    - ValueError: If a price or count is not a valid non-negative number.
+    """
+    inventory = {
+        'Name': [sys.intern(str(name)) for name in names],
+        'Price': array('d', (parse_price(price) for price in prices)),
+        'Count': array('q', (parse_count(count) for count in counts)),
+        'Reorder': array('q', (parse_count(point) for point in reorder_points)),
+        'Total Sales': float(total_sales),
+    }
+    missing = len(inventory['Name']) - len(inventory['Reorder'])
+    if missing > 0:
+        inventory['Reorder'].extend(repeat(0, missing))
+    build_name_index(inventory)
+    return inventory
+
+@Instrumentation.instrument('MAIN.load_inventory')
 def load_inventory():
-    try:
-        with open('inventory.json', 'r') as file:
-            inventory = json.load(file)
-    except FileNotFoundError:
-        inventory = {'Name': [], 'Price': [], 'Count': [], 'Total Sales': 0.0}
+    data = Storage_Backend.get_backend().load_columns()
+    inventory = new_inventory(data.get('Name', []), data.get('Price', []),
+                              data.get('Count', []), data.get('Total Sales', 0.0), data.get('Reorder', []))
+    inventory[VERSION_KEY] = data.get('Version')
+    inventory[BASE_KEY] = copy_columns(inventory)
     return inventory
 
+@Instrumentation.instrument('MAIN.save_inventory')
 def save_inventory(inventory):
-    with open('inventory.json', 'w') as file:
-        json.dump(inventory, file, indent=4)
+    """
+    Save the inventory without losing other sessions' saves.
+
+    The write only goes through if the stored inventory is still at the
+    version this one was loaded or last saved at. If another process saved
+    in between, its inventory is loaded, this session's changes are merged
+    into it (see merge_inventory) and the save is tried again.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+
+    Returns:
+    - None
+
+    Raises:
+    - Storage_Backend.VersionConflict: If other sessions kept saving first SAVE_RETRIES times.
+    """
+    backend = Storage_Backend.get_backend()
+    for attempt in range(SAVE_RETRIES):
+        data = {
+            'Name': inventory['Name'],
+            'Price': inventory['Price'].tolist(),
+            'Count': inventory['Count'].tolist(),
+            'Reorder': inventory['Reorder'].tolist(),
+            'Total Sales': inventory['Total Sales'],
+        }
+        expected = inventory.get(VERSION_KEY)
+        try:
+            backend.save_columns(data, expected)
+        except Storage_Backend.VersionConflict:
+            if attempt == SAVE_RETRIES - 1:
+                raise
+            merge_inventory(inventory, backend.load_columns())
+            continue
+        if expected is not None:
+            inventory[VERSION_KEY] = expected + 1
+        inventory[BASE_KEY] = copy_columns(inventory)
+        return
+
+def copy_columns(columns):
+    """
+    Copy the stored columns of an inventory.
+
+    Parameters:
+    - columns (dict): The inventory dictionary, or columns loaded by the storage backend.
+
+    Returns:
+    - dict: Name, Price, Count, Reorder and Total Sales, independent of the original.
+    """
+    return {
+        'Name': list(columns['Name']),
+        'Price': array('d', columns['Price']),
+        'Count': array('q', columns['Count']),
+        'Reorder': array('q', columns.get('Reorder') or repeat(0, len(columns['Name']))),
+        'Total Sales': columns.get('Total Sales', 0.0),
+    }
+
+def merge_inventory(inventory, latest):
+    """
+    Rebase this session's changes onto the latest saved inventory.
+
+    This session's changes are the differences from BASE_KEY, the columns
+    as loaded or last saved. Counts and total sales are merged as deltas,
+    so sales made in both sessions add up. Prices and reorder points
+    changed here replace the saved ones. Items added or deleted here are
+    added or deleted in the result. If both sessions sold the last units,
+    the merged count is kept at 0 rather than going negative.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary, updated in place.
+    - latest (dict): The latest saved columns, as loaded by the storage backend.
+
+    Returns:
+    - None
+    """
+    base = inventory[BASE_KEY]
+    base_rows = {name: row for row, name in enumerate(base['Name'])}
+    names, prices, counts, reorder_points = [], [], [], []
+    for name, price, count, reorder_point in zip(latest['Name'], latest['Price'], latest['Count'],
+                                                 latest.get('Reorder') or repeat(0)):
+        row = find_item(inventory, name)
+        base_row = base_rows.get(name)
+        if row is None and base_row is not None:  # Deleted here
+            continue
+        if row is not None and base_row is None:  # Added both here and there: this session's item wins below
+            continue
+        if row is not None:
+            count += inventory['Count'][row] - base['Count'][base_row]
+            if inventory['Price'][row] != base['Price'][base_row]:
+                price = inventory['Price'][row]
+            if inventory['Reorder'][row] != base['Reorder'][base_row]:
+                reorder_point = inventory['Reorder'][row]
+        names.append(name)
+        prices.append(price)
+        counts.append(max(count, 0))
+        reorder_points.append(reorder_point)
+    merged = set(names)
+    for row, name in enumerate(inventory['Name']):
+        if name in merged:
+            continue
+        base_row = base_rows.get(name)
+        if base_row is not None and (inventory['Price'][row], inventory['Count'][row], inventory['Reorder'][row]) == (
+                base['Price'][base_row], base['Count'][base_row], base['Reorder'][base_row]):
+            continue  # Deleted there and untouched here
+        names.append(name)  # Added here, or deleted there after this session changed it
+        prices.append(inventory['Price'][row])
+        counts.append(inventory['Count'][row])
+        reorder_points.append(inventory['Reorder'][row])
+    total_sales = latest.get('Total Sales', 0.0) + inventory['Total Sales'] - base['Total Sales']
+    if HISTORY_KEY in inventory:
+        for name in set(inventory['Name']).union(names):
+            inventory[HISTORY_KEY].touch(name)
+    inventory.pop(SEARCH_KEY, None)  # Rebuilt on next use
+    inventory.pop(REORDER_KEY, None)
+    inventory.update(new_inventory(names, prices, counts, total_sales, reorder_points))
+    inventory[VERSION_KEY] = latest.get('Version')
+    inventory[BASE_KEY] = copy_columns(latest)
+    record_version(inventory)  # The merge is a version of its own, so it can be undone separately
+
+# Validation
+
+def parse_price(value):
+    """
+    Convert a price to a float, rejecting invalid or negative values.
+
+    Parameters:
+    - value (str or number): The price to convert.
+
+    Returns:
+    - float: The price.
+
+    Raises:
+    - ValueError: If the value is not a non-negative number.
+    """
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid price: {value!r}.") from None
+    if price < 0 or price != price:
+        raise ValueError(f"Invalid price: {value!r}.")
+    return price
+
+def parse_count(value):
+    """
+    Convert a count to an int, rejecting invalid or negative values.
+
+    Parameters:
+    - value (str or number): The count to convert.
+
+    Returns:
+    - int: The count.
+
+    Raises:
+    - ValueError: If the value is not a non-negative whole number.
+    """
+    try:
+        count = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid count: {value!r}.") from None
+    if count < 0:
+        raise ValueError(f"Invalid count: {value!r}.")
+    return count
+
+# Reorder points
+
+def reorder_index(inventory):
+    """
+    Get the index of items by stock above their reorder point, building it on first use.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+
+    Returns:
+    - Reorder_Index.ReorderIndex: The index, also stored under REORDER_KEY in the inventory.
+    """
+    index = inventory.get(REORDER_KEY)
+    if index is None:
+        index = inventory[REORDER_KEY] = Reorder_Index.ReorderIndex(
+            zip(inventory['Name'], inventory['Count'], inventory['Reorder']))
+    return index
+
+def stock_changed(inventory, index, previous):
+    """
+    Record a change to an item's count or reorder point.
+
+    Updates the reorder index if it is built, notes the change for the
+    next history version, and calls on_reorder if the item has just
+    reached its reorder point.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+    - index (int): Row of the item.
+    - previous (int): The item's count minus its reorder point before the change.
+
+    Returns:
+    - None
+    """
+    name = inventory['Name'][index]
+    count = inventory['Count'][index]
+    reorder_point = inventory['Reorder'][index]
+    if HISTORY_KEY in inventory:
+        inventory[HISTORY_KEY].touch(name)
+    if REORDER_KEY in inventory:
+        inventory[REORDER_KEY].update(name, count, reorder_point)
+    if on_reorder is not None and previous > 0 >= count - reorder_point:
+        on_reorder(name, count, reorder_point)
+
+def set_count(inventory, index, count):
+    """
+    Set an item's count and keep the reorder index current.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+    - index (int): Row of the item.
+    - count (int): The new count.
+
+    Returns:
+    - None
+    """
+    previous = inventory['Count'][index] - inventory['Reorder'][index]
+    inventory['Count'][index] = count
+    stock_changed(inventory, index, previous)
+
+def set_price(inventory, index, price):
+    """
+    Set an item's price and note the change for the next history version.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+    - index (int): Row of the item.
+    - price (float): The new price.
+
+    Returns:
+    - None
+    """
+    inventory['Price'][index] = price
+    if HISTORY_KEY in inventory:
+        inventory[HISTORY_KEY].touch(inventory['Name'][index])
+
+def set_reorder_point(inventory, name, reorder_point):
+    """
+    Set the stock level at which an item needs reordering.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+    - name (str): Name of the item.
+    - reorder_point (str or int): The new reorder point (0 for none).
+
+    Returns:
+    - None
+
+    Raises:
+    - ValueError: If the item doesn't exist or the reorder point is invalid.
+    """
+    index = find_item(inventory, name)
+    if index is None:
+        raise ValueError(not_found_message(inventory, name))
+    reorder_point = parse_count(reorder_point)
+    previous = inventory['Count'][index] - inventory['Reorder'][index]
+    inventory['Reorder'][index] = reorder_point
+    stock_changed(inventory, index, previous)
+
+def reorder_report(inventory):
+    """
+    Show the items at or below their reorder point and the lowest-stock items.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+
+    Returns:
+    - None
+    """
+    index = reorder_index(inventory)
+    print("\nItems at or below their reorder point:")
+    show_reorder_rows(inventory, index.below_reorder_point())
+    print(f"\n{REPORT_LOWEST} lowest-stock items (count minus reorder point):")
+    show_reorder_rows(inventory, index.lowest(REPORT_LOWEST))
+
+def show_reorder_rows(inventory, entries):
+    """
+    Print reorder report rows.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+    - entries (list): (name, count minus reorder point) pairs.
+
+    Returns:
+    - None
+    """
+    if not entries:
+        print("None.")
+    for name, headroom in entries:
+        index = find_item(inventory, name)
+        print(f"Name: {name}, Count: {inventory['Count'][index]}, "
+              f"Reorder point: {inventory['Reorder'][index]}, Above reorder point: {headroom}")
+
+def reorder_alert(name, count, reorder_point):
+    """
+    Default on_reorder hook of the interactive program: print a warning.
+
+    Parameters:
+    - name (str): Name of the item.
+    - count (int): Its count.
+    - reorder_point (int): Its reorder point.
+
+    Returns:
+    - None
+    """
+    print(f"Reorder {name}: {count} left, reorder point {reorder_point}.")
+
+# History
+
+def inventory_history(inventory):
+    """
+    Get the inventory's version history, starting it from the current state on first use.
+
+    Until the history is started, changes cost nothing extra; afterwards
+    every change is noted so record_version can store it.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+
+    Returns:
+    - Inventory_History.History: The history, also stored under HISTORY_KEY in the inventory.
+    """
+    history = inventory.get(HISTORY_KEY)
+    if history is None:
+        rows = zip(inventory['Name'], zip(inventory['Price'], inventory['Count'], inventory['Reorder']))
+        history = inventory[HISTORY_KEY] = Inventory_History.History(
+            rows, inventory['Total Sales'], HISTORY_LIMIT, HISTORY_MAX_AGE)
+    return history
+
+def record_version(inventory):
+    """
+    Store the changes made since the last version as a new version.
+
+    Only the changed items are read and copied into the new version, which
+    shares everything else with the previous one.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+
+    Returns:
+    - Inventory_History.Version or None: The new version, or None if there is no history or nothing changed.
+    """
+    history = inventory.get(HISTORY_KEY)
+    if history is None:
+        return None
+    rows = {}
+    for name in history.pending:
+        index = find_item(inventory, name)
+        rows[name] = None if index is None else (
+            inventory['Price'][index], inventory['Count'][index], inventory['Reorder'][index])
+    return history.record(rows, inventory['Total Sales'])
+
+def restore_version(inventory, version, names):
+    """
+    Bring items back to their state in a version.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+    - version (Inventory_History.Version): The version to restore.
+    - names (iterable): Names of the items that differ from it.
+
+    Returns:
+    - None
+    """
+    history = inventory.pop(HISTORY_KEY)  # Restoring is not a change of its own
+    try:
+        for name in names:
+            row = version.items.get(name)
+            index = find_item(inventory, name)
+            if row is None:
+                if index is not None:
+                    delete_item(inventory, name)
+            elif index is None:
+                add_item(inventory, name, *row)
+            else:
+                set_price(inventory, index, row[0])
+                set_count(inventory, index, row[1])
+                set_reorder_point(inventory, name, row[2])
+        inventory['Total Sales'] = version.total_sales
+    finally:
+        inventory[HISTORY_KEY] = history
+
+def undo_change(inventory):
+    """
+    Undo the latest change that hasn't been undone yet.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+
+    Returns:
+    - Inventory_History.Version or None: The version now current, or None if there is nothing to undo.
+    """
+    history = inventory_history(inventory)
+    record_version(inventory)
+    step = history.undo()
+    if step is not None:
+        restore_version(inventory, *step)
+        return step[0]
+    return None
+
+def redo_change(inventory):
+    """
+    Redo the latest undone change.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+
+    Returns:
+    - Inventory_History.Version or None: The version now current, or None if there is nothing to redo.
+    """
+    history = inventory_history(inventory)
+    if record_version(inventory) is not None:
+        return None  # A new change discards the undone ones
+    step = history.redo()
+    if step is not None:
+        restore_version(inventory, *step)
+        return step[0]
+    return None
+
+def show_history(inventory):
+    """
+    List the kept versions, oldest first.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+
+    Returns:
+    - None
+    """
+    history = inventory_history(inventory)
+    record_version(inventory)
+    print("\nVersions:")
+    for version in history.versions:
+        names = ', '.join(sorted(version.changed)[:5])
+        if len(version.changed) > 5:
+            names += f" and {len(version.changed) - 5} more"
+        marker = " (current)" if version is history.current else ""
+        print(f"Version {version.number} at {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(version.time))}{marker}: "
+              f"{len(version.items)} item(s), total sales ${version.total_sales:.2f}"
+              + (f", changed {names}" if names else ""))
+
+def parse_when(text):
+    """
+    Convert a version number or a time to a timestamp or version number.
+
+    Parameters:
+    - text (str): A version number, a time today ("HH:MM" or "HH:MM:SS") or a date and time ("YYYY-MM-DD HH:MM[:SS]").
+
+    Returns:
+    - tuple: ('version', number) or ('time', seconds since the epoch).
+
+    Raises:
+    - ValueError: If the text is none of these.
+    """
+    text = text.strip()
+    if text.isdigit():
+        return 'version', int(text)
+    for layout in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%H:%M:%S', '%H:%M'):
+        try:
+            parsed = time.strptime(text, layout)
+        except ValueError:
+            continue
+        if not layout.startswith('%Y'):
+            today = time.localtime()
+            parsed = time.struct_time((today.tm_year, today.tm_mon, today.tm_mday) + tuple(parsed)[3:6] + (0, 0, -1))
+        return 'time', time.mktime(parsed)
+    raise ValueError(f"Invalid version or time: {text!r}.")
+
+def show_version(inventory):
+    """
+    Show the inventory as it was at a version or time, without changing it.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+
+    Returns:
+    - None
+    """
+    history = inventory_history(inventory)
+    record_version(inventory)
+    try:
+        kind, value = parse_when(input("\nEnter a version number or a time (HH:MM[:SS] or YYYY-MM-DD HH:MM[:SS]): "))
+    except ValueError as error:
+        print(f"\n{error}")
+        return
+    version = history.find(value) if kind == 'version' else history.as_of(value)
+    if version is None:
+        print("\nNo such version is kept.")
+        return
+    print(f"\nInventory at version {version.number}:")
+    if not len(version.items):
+        print("No items in inventory.")
+    else:
+        show_rows((name, price, count) for name, (price, count, _) in sorted(version.items.items()))
+    print(f"\nTotal Sales: ${version.total_sales:.2f}")
+
+# Name index
+
+def build_name_index(inventory):
+    """
+    Build the name -> row index for the inventory.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+
+    Returns:
+    - dict: The index, also stored under INDEX_KEY in the inventory.
+    """
+    index = {name: row for row, name in enumerate(inventory['Name'])}
+    inventory[INDEX_KEY] = index
+    return index
+
+def find_item(inventory, name):
+    """
+    Look up the row of an item by name in constant time.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+    - name (str): Name of the item.
+
+    Returns:
+    - int or None: Row of the item, or None if it is not in the inventory.
+    """
+    index = inventory.get(INDEX_KEY)
+    if index is None:
+        index = build_name_index(inventory)
+    return index.get(name)
+
+def find_items(inventory, names):
+    """
+    Look up the rows of many items at once.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+    - names (iterable): Names of the items.
+
+    Returns:
+    - list: Row of each item in the same order, None for unknown names.
+    """
+    index = inventory.get(INDEX_KEY)
+    if index is None:
+        index = build_name_index(inventory)
+    return [index.get(name) for name in names]
+
+# Name search
+
+def search_index(inventory):
+    """
+    Get the prefix and fuzzy search index, building it on first use.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+
+    Returns:
+    - Name_Search.NameIndex: The index, also stored under SEARCH_KEY in the inventory.
+    """
+    index = inventory.get(SEARCH_KEY)
+    if index is None:
+        index = inventory[SEARCH_KEY] = Name_Search.NameIndex(inventory['Name'])
+    return index
+
+def not_found_message(inventory, name):
+    """
+    Build the message for an unknown item, with the closest names as suggestions.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+    - name (str): The name that was not found.
+
+    Returns:
+    - str: The message.
+    """
+    message = f"Item '{name}' not found in inventory."
+    suggestions = search_index(inventory).suggest(name)
+    if suggestions:
+        message += f" Did you mean: {', '.join(suggestions)}?"
+    return message
+
+def search_items(inventory):
+    """
+    Search items by name prefix, substring or approximate spelling.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+
+    Returns:
+    - None
+    """
+    query = input("\nSearch for: ").strip()
+    if not query:
+        print("\nPlease enter some text to search for.")
+        return
+    index = search_index(inventory)
+    names = index.prefix(query, Name_Search.SEARCH_LIMIT)
+    for name in index.contains(query, Name_Search.SEARCH_LIMIT) + index.similar(query):
+        if name not in names and len(names) < Name_Search.SEARCH_LIMIT:
+            names.append(name)
+    if not names:
+        print(f"\nNo items match '{query}'.")
+        return
+    rows = find_items(inventory, names)
+    show_rows((name, inventory['Price'][row], inventory['Count'][row]) for name, row in zip(names, rows))
 
 # Inventory management functions
 
-def add_item(inventory, name, price, count):
+def add_item(inventory, name, price, count, reorder_point=0):
     """
     Add a new item to the inventory.
 
@@ -25,13 +706,95 @@ def add_item(inventory, name, price, count):
     - name (str): Name of the item.
     - price (str): Price of the item.
     - count (str): Count of the item.
+    - reorder_point (str or int): Reorder point of the item (0 for none).
 
     Returns:
     - None
+
+    Raises:
+    - ValueError: If the item already exists or the price or count is invalid.
     """
+    if find_item(inventory, name) is not None:
+        raise ValueError(f"Item '{name}' already exists.")
+    price = parse_price(price)
+    count = parse_count(count)
+    reorder_point = parse_count(reorder_point)
+    name = sys.intern(name)
+    inventory[INDEX_KEY][name] = len(inventory['Name'])
+    if SEARCH_KEY in inventory:
+        inventory[SEARCH_KEY].add(name)
     inventory['Name'].append(name)
     inventory['Price'].append(price)
     inventory['Count'].append(count)
+    inventory['Reorder'].append(reorder_point)
+    if REORDER_KEY in inventory:
+        inventory[REORDER_KEY].update(name, count, reorder_point)
+    if HISTORY_KEY in inventory:
+        inventory[HISTORY_KEY].touch(name)
+
+def delete_item(inventory, name):
+    """
+    Delete an item from the inventory.
+
+    The last row is moved into the freed slot so the delete costs O(1)
+    and only one index entry has to be rewritten.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+    - name (str): Name of the item.
+
+    Returns:
+    - bool: True if the item was deleted, False if it was not found.
+    """
+    index = find_item(inventory, name)
+    if index is None:
+        return False
+    last = len(inventory['Name']) - 1
+    for column in ('Name', 'Price', 'Count', 'Reorder'):
+        inventory[column][index] = inventory[column][last]
+        inventory[column].pop()
+    del inventory[INDEX_KEY][name]
+    if index != last:
+        inventory[INDEX_KEY][inventory['Name'][index]] = index
+    if SEARCH_KEY in inventory:
+        inventory[SEARCH_KEY].remove(name)
+    if REORDER_KEY in inventory:
+        inventory[REORDER_KEY].remove(name)
+    if HISTORY_KEY in inventory:
+        inventory[HISTORY_KEY].touch(name)
+    return True
+
+def rename_item(inventory, name, new_name):
+    """
+    Rename an item, keeping its row, price and count.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+    - name (str): Current name of the item.
+    - new_name (str): New name of the item.
+
+    Returns:
+    - None
+
+    Raises:
+    - ValueError: If the item doesn't exist or the new name is taken.
+    """
+    index = find_item(inventory, name)
+    if index is None:
+        raise ValueError(not_found_message(inventory, name))
+    if find_item(inventory, new_name) is not None:
+        raise ValueError(f"Item '{new_name}' already exists.")
+    new_name = sys.intern(new_name)
+    inventory['Name'][index] = new_name
+    del inventory[INDEX_KEY][name]
+    inventory[INDEX_KEY][new_name] = index
+    if SEARCH_KEY in inventory:
+        inventory[SEARCH_KEY].rename(name, new_name)
+    if REORDER_KEY in inventory:
+        inventory[REORDER_KEY].rename(name, new_name)
+    if HISTORY_KEY in inventory:
+        inventory[HISTORY_KEY].touch(name)
+        inventory[HISTORY_KEY].touch(new_name)
 
 def display_inventory(inventory):
     """
@@ -47,15 +810,52 @@ def display_inventory(inventory):
     if not inventory['Name']:
         print("No items in inventory.")
     else:
-        for i in range(len(inventory['Name'])):
-            name = inventory['Name'][i]
-            price = inventory['Price'][i]
-            count = inventory['Count'][i]
-            print(f"Name: {name}, Price: {price}, Count: {count}")
+        show_rows(iter_rows(inventory))
 
     total_sales = inventory.get('Total Sales', 0.0)
     print(f"\nTotal Sales: ${total_sales:.2f}")
 
+def iter_rows(inventory):
+    """
+    Yield inventory rows one at a time without copying the columns.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+
+    Returns:
+    - generator: (name, price, count) tuples.
+    """
+    return zip(inventory['Name'], inventory['Price'], inventory['Count'])
+
+def show_rows(rows):
+    """
+    Print inventory rows as they are produced.
+
+    Parameters:
+    - rows (iterable): (name, price, count) tuples.
+
+    Returns:
+    - None
+    """
+    for name, price, count in rows:
+        print(f"Name: {name}, Price: {price}, Count: {count}")
+
+def browse_inventory(inventory):
+    """
+    Browse the inventory with filters, sorting, pages and lowest-stock views.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+
+    Returns:
+    - None
+    """
+    print("\nBrowse inventory:")
+    Inventory_Views.browse(lambda: iter_rows(inventory), show_rows, {
+        'Lowest stock': (Inventory_Views.COUNT, False),
+        'Most expensive': (Inventory_Views.PRICE, True),
+    })
+
 def update_item(inventory):
     """
     Update an existing item in the inventory.
@@ -68,8 +868,8 @@ def update_item(inventory):
     """
     item_name = input("\nEnter the name of the item to update: ")
 
-    if item_name in inventory['Name']:
-        index = inventory['Name'].index(item_name)
+    index = find_item(inventory, item_name)
+    if index is not None:
         print(f"\nCurrent details of {item_name}:")
         print(f"Price: {inventory['Price'][index]}")
         print(f"Count: {inventory['Count'][index]}")
@@ -77,15 +877,22 @@ def update_item(inventory):
         new_price = input("\nEnter the new price (press Enter to keep current): ").strip()
         new_count = input("Enter the new count (press Enter to keep current): ").strip()
 
-        if new_price:
-            inventory['Price'][index] = new_price
+        try:
+            new_price = parse_price(new_price) if new_price else None
+            new_count = parse_count(new_count) if new_count else None
+        except ValueError as error:
+            print(f"\n{error}")
+            return
+
+        if new_price is not None:
+            set_price(inventory, index, new_price)
 
-        if new_count:
-            inventory['Count'][index] = new_count
+        if new_count is not None:
+            set_count(inventory, index, new_count)
 
         print(f"\n{item_name} updated successfully!")
     else:
-        print(f"\nItem '{item_name}' not found in inventory.")
+        print(f"\n{not_found_message(inventory, item_name)}")
 
 def get_item_details(inventory):
     """
@@ -99,13 +906,14 @@ def get_item_details(inventory):
     """
     item_name = input("\nEnter the name of the item to get details: ")
 
-    if item_name in inventory['Name']:
-        index = inventory['Name'].index(item_name)
+    index = find_item(inventory, item_name)
+    if index is not None:
         print(f"\nDetails of {item_name}:")
         print(f"Price: {inventory['Price'][index]}")
         print(f"Count: {inventory['Count'][index]}")
+        print(f"Reorder point: {inventory['Reorder'][index]}")
     else:
-        print(f"\nItem '{item_name}' not found in inventory.")
+        print(f"\n{not_found_message(inventory, item_name)}")
 
 def buy_item(inventory):
     """
@@ -121,20 +929,48 @@ def buy_item(inventory):
 
     item_name = input("\nEnter the name of the item to buy: ")
 
-    if item_name in inventory['Name']:
-        index = inventory['Name'].index(item_name)
+    index = find_item(inventory, item_name)
+    if index is not None:
         print(f"Buying {item_name}...")
-        quantity = int(input(f"Enter the quantity to buy (Available: {inventory['Count'][index]}): "))
-        
-        if quantity <= int(inventory['Count'][index]):
-            inventory['Count'][index] -= quantity
-            total_cost = quantity * float(inventory['Price'][index])
-            inventory['Total Sales'] += total_cost
+        try:
+            quantity = parse_count(input(f"Enter the quantity to buy (Available: {inventory['Count'][index]}): ").strip())
+        except ValueError as error:
+            print(error)
+            return
+
+        if 0 < quantity <= inventory['Count'][index]:
+            total_cost = sell_item(inventory, item_name, quantity)
             print(f"Successfully bought {quantity} {item_name}(s) for ${total_cost:.2f}.")
         else:
             print("Insufficient quantity available.")
     else:
-        print(f"Item '{item_name}' not found in inventory.")
+        print(not_found_message(inventory, item_name))
+
+def sell_item(inventory, name, quantity):
+    """
+    Sell some units of an item, updating its count and the total sales.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+    - name (str): Name of the item.
+    - quantity (int): Units sold.
+
+    Returns:
+    - float: The value of the sale.
+
+    Raises:
+    - ValueError: If the item doesn't exist, the quantity is not positive or there is not enough stock.
+    """
+    index = find_item(inventory, name)
+    if index is None:
+        raise ValueError(not_found_message(inventory, name))
+    quantity = parse_count(quantity)
+    if quantity == 0 or quantity > inventory['Count'][index]:
+        raise ValueError(f"Cannot buy {quantity} {name}(s): {inventory['Count'][index]} available.")
+    set_count(inventory, index, inventory['Count'][index] - quantity)
+    total_cost = quantity * inventory['Price'][index]
+    inventory['Total Sales'] += total_cost
+    return total_cost
 
 def change_price(inventory):
     """
@@ -148,16 +984,20 @@ def change_price(inventory):
     """
     item_name = input("\nEnter the name of the item to change the price: ")
 
-    if item_name in inventory['Name']:
-        index = inventory['Name'].index(item_name)
+    index = find_item(inventory, item_name)
+    if index is not None:
         print(f"\nCurrent price of {item_name}: {inventory['Price'][index]}")
 
-        new_price = input("Enter the new price: ").strip()
-        inventory['Price'][index] = new_price
+        try:
+            new_price = parse_price(input("Enter the new price: ").strip())
+        except ValueError as error:
+            print(f"\n{error}")
+            return
+        set_price(inventory, index, new_price)
 
         print(f"\nPrice of {item_name} updated successfully to {new_price}.")
     else:
-        print(f"\nItem '{item_name}' not found in inventory.")
+        print(f"\n{not_found_message(inventory, item_name)}")
 
 def update_inventory(inventory):
     """
@@ -171,16 +1011,92 @@ def update_inventory(inventory):
     """
     item_name = input("\nEnter the name of the item to update count: ")
 
-    if item_name in inventory['Name']:
-        index = inventory['Name'].index(item_name)
+    index = find_item(inventory, item_name)
+    if index is not None:
         print(f"\nCurrent count of {item_name}: {inventory['Count'][index]}")
 
-        new_count = input("Enter the new count: ").strip()
-        inventory['Count'][index] = new_count
+        try:
+            new_count = parse_count(input("Enter the new count: ").strip())
+        except ValueError as error:
+            print(f"\n{error}")
+            return
+        set_count(inventory, index, new_count)
 
         print(f"\nCount of {item_name} updated successfully to {new_count}.")
     else:
-        print(f"\nItem '{item_name}' not found in inventory.")
+        print(f"\n{not_found_message(inventory, item_name)}")
+
+# Whole-catalog operations
+
+def total_stock_value(inventory):
+    """
+    Compute the value of all stock on hand (sum of price * count).
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+
+    Returns:
+    - float: The total stock value.
+    """
+    numpy = load_numpy()
+    if numpy is not None and inventory['Name']:
+        prices = numpy.frombuffer(inventory['Price'], dtype=numpy.float64)
+        counts = numpy.frombuffer(inventory['Count'], dtype=numpy.int64)
+        return float(numpy.dot(prices, counts))
+    return float(sum(map(operator.mul, inventory['Price'], inventory['Count'])))
+
+def reprice_all(inventory, percent):
+    """
+    Change every price by a percentage (e.g. 10 for +10%, -5 for -5%).
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+    - percent (float): The percentage change.
+
+    Returns:
+    - None
+
+    Raises:
+    - ValueError: If the change would make prices negative.
+    """
+    factor = 1 + float(percent) / 100
+    if factor < 0:
+        raise ValueError(f"Invalid percentage: {percent!r}.")
+    numpy = load_numpy()
+    if numpy is not None and inventory['Name']:
+        prices = numpy.frombuffer(inventory['Price'], dtype=numpy.float64)
+        prices *= factor
+    else:
+        inventory['Price'] = array('d', map(factor.__mul__, inventory['Price']))
+    if HISTORY_KEY in inventory:
+        for name in inventory['Name']:
+            inventory[HISTORY_KEY].touch(name)
+
+def restock_all(inventory, amount):
+    """
+    Add the same amount of stock to every item.
+
+    Parameters:
+    - inventory (dict): The inventory dictionary.
+    - amount (int): Units to add to each item.
+
+    Returns:
+    - None
+
+    Raises:
+    - ValueError: If the amount is not a non-negative whole number.
+    """
+    amount = parse_count(amount)
+    numpy = load_numpy()
+    if numpy is not None and inventory['Name']:
+        counts = numpy.frombuffer(inventory['Count'], dtype=numpy.int64)
+        counts += amount
+    else:
+        inventory['Count'] = array('q', map(amount.__add__, inventory['Count']))
+    inventory.pop(REORDER_KEY, None)  # Every entry changed: rebuild on the next report
+    if HISTORY_KEY in inventory:
+        for name in inventory['Name']:
+            inventory[HISTORY_KEY].touch(name)
 
 def more_options(inventory):
     """
@@ -195,25 +1111,102 @@ def more_options(inventory):
     while True:
         print("\nMore options:")
         print("1. Get item details")
-        print("2. Back to main menu")
+        print("2. Delete an item")
+        print("3. Total stock value")
+        print("4. Reprice all items by percentage")
+        print("5. Restock all items")
+        print("6. Browse inventory")
+        print("7. Search items")
+        print("8. Rename an item")
+        print("9. Set reorder point")
+        print("10. Undo last change")
+        print("11. Redo")
+        print("12. Change history")
+        print("13. Show inventory at a version or time")
+        print("14. Back to main menu")
 
-        choice = input("\nEnter your choice (1-2): ")
+        choice = input("\nEnter your choice (1-14): ")
 
         if choice == '1':
             get_item_details(inventory)
         elif choice == '2':
+            item_name = input("\nEnter the name of the item to delete: ")
+            if delete_item(inventory, item_name):
+                print(f"\n{item_name} deleted from inventory.")
+            else:
+                print(f"\n{not_found_message(inventory, item_name)}")
+        elif choice == '3':
+            print(f"\nTotal stock value: ${total_stock_value(inventory):.2f}")
+        elif choice == '4':
+            try:
+                reprice_all(inventory, float(input("\nEnter the percentage change: ")))
+                print("\nAll prices updated.")
+            except ValueError as error:
+                print(f"\n{error}")
+        elif choice == '5':
+            try:
+                restock_all(inventory, input("\nEnter the units to add to each item: ").strip())
+                print("\nAll items restocked.")
+            except ValueError as error:
+                print(f"\n{error}")
+        elif choice == '6':
+            browse_inventory(inventory)
+        elif choice == '7':
+            search_items(inventory)
+        elif choice == '8':
+            item_name = input("\nEnter the name of the item to rename: ")
+            new_name = input("Enter the new name: ")
+            try:
+                rename_item(inventory, item_name, new_name)
+                print(f"\n{item_name} renamed to {new_name}.")
+            except ValueError as error:
+                print(f"\n{error}")
+        elif choice == '9':
+            item_name = input("\nEnter the name of the item: ")
+            try:
+                set_reorder_point(inventory, item_name, input("Enter the reorder point (0 for none): ").strip())
+                print(f"\nReorder point of {item_name} updated.")
+            except ValueError as error:
+                print(f"\n{error}")
+        elif choice == '10':
+            version = undo_change(inventory)
+            print(f"\nUndone: back to version {version.number}." if version else "\nNothing to undo.")
+        elif choice == '11':
+            version = redo_change(inventory)
+            print(f"\nRedone: now at version {version.number}." if version else "\nNothing to redo.")
+        elif choice == '12':
+            show_history(inventory)
+        elif choice == '13':
+            show_version(inventory)
+        elif choice == '14':
             break
         else:
-            print("\nInvalid choice. Please enter a number from 1 to 2.")
+            print("\nInvalid choice. Please enter a number from 1 to 14.")
+        record_version(inventory)  # Each change becomes a version that can be undone
 
 def main():
     # Print a welcome message
     print("\nWelcome to the Inventory Management System!\n")
 
     # Load inventory from JSON file
-    inventory = load_inventory()
+    try:
+        inventory = load_inventory()
+    except ValueError as error:
+        print(f"Could not load the inventory: {error}")
+        print("Move that file aside, or set INVENTORY_BACKEND to another backend, and start again.")
+        return
+
+    # Warn as soon as a sale or count change takes an item down to its reorder point
+    global on_reorder
+    on_reorder = reorder_alert
+
+    # Keep versions of the inventory for undo and viewing past states
+    inventory_history(inventory)
 
     while True:
+        # Store the previous choice's changes as a version
+        record_version(inventory)
+
         # Display the main menu
         print("\nOptions:")
         print("1. Add a new item")
@@ -224,9 +1217,10 @@ def main():
         print("6. Update item count")
         print("7. More options")
         print("8. Display inventory")
-        print("9. Save and exit")
+        print("9. Reorder report")
+        print("10. Save and exit")
 
-        choice = input("\nEnter your choice (1-9): ")
+        choice = input("\nEnter your choice (1-10): ")
 
         if choice == '1':
             # Add a new item
@@ -234,8 +1228,12 @@ def main():
             name = input("Name: ")
             price = input("Price: ")
             count = input("Count: ")
-            add_item(inventory, name, price, count)
-            print(f"{name} added to inventory.")
+            reorder_point = input("Reorder point (press Enter for none): ").strip() or 0
+            try:
+                add_item(inventory, name, price, count, reorder_point)
+                print(f"{name} added to inventory.")
+            except ValueError as error:
+                print(f"\n{error}")
 
         elif choice == '2':
             # Update an existing item
@@ -266,13 +1264,21 @@ def main():
             display_inventory(inventory)
 
         elif choice == '9':
+            # Items that need reordering
+            reorder_report(inventory)
+
+        elif choice == '10':
             # Save inventory to JSON file and exit
-            save_inventory(inventory)
+            try:
+                save_inventory(inventory)
+            except Storage_Backend.VersionConflict as error:
+                print(f"\nCould not save: {error}")
+                continue
             print("\nInventory saved. Exiting program. Goodbye!")
             break
 
         else:
-            print("\nInvalid choice. Please enter a number from 1 to 9.")
+            print("\nInvalid choice. Please enter a number from 1 to 10.")
 
 if __name__ == "__main__":
     main()
@@ -1,111 +1,409 @@
+import csv  # Import the CSV module for reading batch files
 import json  # Import the JSON module for reading and writing JSON data
 import time  # Import the time module for time-related functions
-import matplotlib.pyplot as plt  # Import matplotlib for plotting graphs
 from datetime import datetime  # Import datetime module for date and time manipulation
-from prettytable import PrettyTable  # Import PrettyTable for displaying tables
+from itertools import islice  # Import islice to cap the rows shown at once
 import getpass  # Import getpass for secure password input
+import atexit  # Import atexit to flush pending changes on exit
+import signal  # Import signal to flush pending changes on termination
+import threading  # Import threading for the write-behind thread
+import Credential_Store  # Import the hashed credential store
+import Instrumentation  # Import operation latency and I/O instrumentation
+import Inventory_Item  # Import the slotted item record
+import Inventory_Views  # Import streaming, paginated and top-N inventory views
+import Name_Search  # Import the prefix and fuzzy item-name index
+import Sales_Ledger  # Import the timestamped sales ledger and period rollups
+import Storage_Backend  # Import the pluggable storage backends
+import Tenant_Storage  # Import per-user sharded storage
+import Transaction_Log  # Import the log compaction setting
 
 # Global variables
 current_user = None  # Variable to store the current logged-in user
 inventory = {}  # Dictionary to hold item data in the inventory
 total_sales = 0  # Variable to store the total sales across all items, initialized to 0
+rollups = Sales_Ledger.new_rollups()  # Per-day/month/year sales totals for each item
+search_index = None  # Name_Search.NameIndex over the inventory, built on first use
 
-# Load inventory from JSON file for the current user
+# Persistence settings
+USE_TRANSACTION_LOG = True  # Append one record per mutation instead of rewriting the snapshot
+WRITE_BEHIND_INTERVAL = 1.0  # Seconds between background writes of pending changes (0 writes immediately, None leaves it to the caller)
+
+# Display settings
+DISPLAY_LIMIT = None  # Rows shown by display_inventory before pointing at the browser (None shows every row)
+SALES_COUNT = 3  # Position of the sales count in iter_inventory_rows rows
+
+# Write-behind state: changes made since the last write, coalesced per item
+pending_lock = threading.Lock()  # Guards the pending changes below
+write_lock = threading.Lock()  # Serializes writes to the storage backend
+pending_items = {}  # Item name -> copy of its latest state (None if deleted)
+pending_sales = {}  # Item name -> [[timestamp, quantity, amount], ...] for rollup replay
+pending_ledger = []  # (name, quantity, amount, time) sales not yet in the ledger
+pending_renames = {}  # New item name -> old name, for renames not yet written
+pending_fields = {}  # Item name -> fields set outright ('price', 'count', or 'item' for the whole item)
+pending_total = 0  # Total sales as of the latest pending change
+changed_since_snapshot = False  # Whether the current user has changes the snapshot doesn't include
+compact_due = False  # Set by the writer when the log should be folded into a snapshot
+tenant_version = None  # Version of the user's stored data this session last loaded or wrote
+rebase_due = False  # Set when another session wrote first; its changes are merged on the main thread
+writer_stop = threading.Event()  # Tells the writer thread to exit
+writer_thread = None  # Background writer thread, started on the first change
+
+# Load inventory for the current user from the storage backend
+@Instrumentation.instrument('load_inventory')
 def load_inventory():
-    global inventory, total_sales
-    try:
-        with open('inventory.json', 'r') as file:  # Open the inventory JSON file in read mode
-            data = file.read()  # Read the entire contents of the file
-            if data:  # Check if data is not empty
-                data = json.loads(data)  # Parse the JSON data into a Python dictionary
-                user_data = data.get(current_user, {})  # Retrieve the current user's data from JSON
-                inventory = user_data.get('inventory', {})  # Retrieve the inventory dictionary for the current user
-                total_sales = user_data.get('total_sales', 0)  # Retrieve the total sales for the current user
-            else:  # If data is empty (file is empty or doesn't exist)
-                inventory = {}  # Initialize an empty inventory dictionary
-                total_sales = 0  # Initialize total sales to 0
-    except FileNotFoundError:  # Handle the case where the inventory.json file doesn't exist
-        inventory = {}  # Initialize an empty inventory dictionary
-        total_sales = 0  # Initialize total sales to 0
-
-# Save inventory to JSON file for the current user
+    global inventory, total_sales, rollups, changed_since_snapshot, search_index, tenant_version, rebase_due
+    # Only the current user's data is read
+    user_data = Storage_Backend.get_backend().load_tenant(current_user)
+    inventory = user_data['inventory']  # Retrieve the inventory dictionary for the current user
+    total_sales = user_data['total_sales']  # Retrieve the total sales for the current user
+    rollups = user_data['rollups']  # Retrieve the sales rollups for the current user
+    tenant_version = user_data.get('version')  # Writes are rejected if another session writes first
+    changed_since_snapshot = rebase_due = False
+    search_index = None  # Rebuilt from this inventory on the first search
+
+# Save inventory for the current user to the storage backend
+@Instrumentation.instrument('save_inventory')
 def save_inventory():
-    try:
-        with open('inventory.json', 'r') as file:  # Open the inventory JSON file in read mode
-            data = file.read()  # Read the entire contents of the file
-            if data:  # Check if data is not empty
-                data = json.loads(data)  # Parse the JSON data into a Python dictionary
-            else:  # If data is empty (file is empty or doesn't exist)
-                data = {}  # Initialize an empty dictionary
-    except FileNotFoundError:  # Handle the case where the inventory.json file doesn't exist
-        data = {}  # Initialize an empty dictionary
+    global changed_since_snapshot, compact_due, tenant_version, rebase_due
+    while True:
+        if rebase_due:  # Another session wrote first: merge its changes before writing ours
+            rebase()
+        with write_lock:  # Wait for an in-flight background write to finish
+            if rebase_due:  # The writer found a conflict meanwhile
+                continue
+            with pending_lock:  # The snapshot supersedes pending item changes
+                taken = take_pending()
+                changed_since_snapshot = compact_due = False
+            backend = Storage_Backend.get_backend()
+            try:
+                # Rewrite the current user's data atomically (and clear their transaction log)
+                backend.save_tenant(current_user, {'inventory': inventory, 'total_sales': total_sales, 'rollups': rollups},
+                                    tenant_version)
+            except Storage_Backend.VersionConflict:
+                restore_pending(*taken)
+                rebase_due = True
+                continue
+            except Exception:
+                restore_pending(*taken)
+                raise
+            if tenant_version is not None:
+                tenant_version += 1
+            ledger = taken[2]
+            if ledger:  # The ledger lives outside the snapshot, so pending sales still go there
+                backend.append_sales(current_user, ledger)
+            return
 
-    # Update the data dictionary with current user's inventory and total sales
-    data[current_user] = {'inventory': inventory, 'total_sales': total_sales}
+# Record a change to one item; `sale` is (quantity, amount, time) for purchases
+def log_change(name, sale=None, fields=None):
+    log_changes([name], {name: sale} if sale else None, fields=fields)
+
+# Record changes to several items; they are written together by the next flush
+# (`renames` maps a new item name to its old one; `fields` names the fields that
+# were set outright, e.g. ('price',). A change with neither fields nor a sale
+# replaces the whole item)
+def log_changes(names, sales=None, renames=None, fields=None):
+    global pending_total, changed_since_snapshot
+    with pending_lock:
+        for name in names:  # Copy the item now, so the writer never sees a half-applied change
+            item = inventory.get(name)
+            pending_items.pop(name, None)  # Re-insert so entries stay in the order of their last change
+            pending_items[name] = item.to_dict() if item is not None else None
+            changed = pending_fields.setdefault(name, set())  # What a merge with another session must keep
+            if fields:
+                changed.update(fields)
+            elif not sales or name not in sales:
+                changed.add('item')
+        pending_renames.update(renames or {})
+        for name, (quantity, amount, when) in (sales or {}).items():
+            pending_sales.setdefault(name, []).append([when.isoformat(timespec='seconds'), quantity, amount])
+            pending_ledger.append((name, quantity, amount, when))
+        pending_total = total_sales
+        changed_since_snapshot = True
+    if not USE_TRANSACTION_LOG:  # Without the log every change rewrites the snapshot
+        save_inventory()
+        return
+    if WRITE_BEHIND_INTERVAL is None:  # The caller decides when to flush (Command_Script.py)
+        pass
+    elif WRITE_BEHIND_INTERVAL <= 0:  # Write-behind disabled: write right away
+        flush_changes()
+    else:
+        start_writer()
+    if rebase_due:  # A write found another session's changes: merge them on this thread
+        sync_changes()
+    if compact_due:  # Compact on this thread so the snapshot matches the in-memory state
+        save_inventory()
 
-    with open('inventory.json', 'w') as file:  # Open the inventory JSON file in write mode
-        json.dump(data, file, indent=4)  # Write the updated data dictionary to the JSON file with formatting
+# Take every pending change and start a new batch (caller holds pending_lock)
+def take_pending():
+    global pending_items, pending_sales, pending_ledger, pending_renames, pending_fields
+    taken = pending_items, pending_sales, pending_ledger, pending_renames, pending_fields
+    pending_items, pending_sales, pending_ledger, pending_renames, pending_fields = {}, {}, [], {}, {}
+    return taken
+
+# Put changes whose write failed back in front of the ones made since
+def restore_pending(items, sales, ledger, renames, fields):
+    global pending_items, pending_sales, pending_ledger, pending_renames, pending_fields, changed_since_snapshot
+    with pending_lock:
+        items.update(pending_items)  # Newer item states win
+        for name, newer in pending_sales.items():
+            sales.setdefault(name, []).extend(newer)
+        renames.update(pending_renames)
+        for name, newer in pending_fields.items():
+            fields.setdefault(name, set()).update(newer)
+        pending_items, pending_sales, pending_ledger, pending_renames, pending_fields = (
+            items, sales, ledger + pending_ledger, renames, fields)
+        changed_since_snapshot = True
+
+# Merge another session's writes: reload the user's data and re-apply the pending changes on top
+# (main thread only). Sales are re-applied as deltas, so both sessions' sales count; fields set
+# here (a price, a count, or a whole added, deleted or renamed item) replace the stored ones
+def rebase():
+    global inventory, total_sales, rollups, tenant_version, search_index, rebase_due, pending_total
+    with write_lock:
+        latest = Storage_Backend.get_backend().load_tenant(current_user)
+        with pending_lock:
+            merged = latest['inventory']
+            for name in pending_items:
+                fields = pending_fields.get(name, ())
+                ours = inventory.get(name)
+                if 'item' in fields or name not in merged:  # Set here outright, or deleted there
+                    if ours is None:
+                        merged.pop(name, None)
+                    else:
+                        merged[name] = ours
+                else:
+                    item = merged[name]
+                    for _, quantity, amount in pending_sales.get(name, ()):
+                        item.count = max(item.count - quantity, 0)  # Both sessions may have sold the last units
+                        item.sales_count += quantity
+                        item.sales_price += amount
+                    if 'price' in fields:
+                        item.price = ours.price
+                    if 'count' in fields:
+                        item.count = ours.count
+                pending_items[name] = merged[name].to_dict() if name in merged else None
+            sold = 0
+            for name, sales in pending_sales.items():  # Sales first, so a rename below moves them too
+                for stamp, quantity, amount in sales:
+                    Sales_Ledger.record_sale(latest['rollups'], name, quantity, amount, datetime.fromisoformat(stamp))
+                    sold += amount
+            for new_name, old_name in pending_renames.items():
+                Sales_Ledger.rename_item(latest['rollups'], old_name, new_name)
+            inventory, rollups = merged, latest['rollups']
+            total_sales = pending_total = latest['total_sales'] + sold
+            tenant_version = latest['version']
+            search_index = None  # Rebuilt from the merged inventory on the next search
+            rebase_due = False
+
+# Write pending changes now, merging other sessions' writes first if needed (main thread only)
+def sync_changes():
+    flush_changes()
+    while rebase_due:
+        rebase()
+        flush_changes()
+
+# Write pending changes as one transaction-log record
+def flush_changes():
+    global compact_due, tenant_version, rebase_due
+    with write_lock:
+        if rebase_due:  # Another session wrote first: the main thread merges before anything is written
+            return
+        with pending_lock:  # Take the pending changes and start a new batch
+            if not pending_items and not pending_ledger:
+                return
+            total = pending_total
+            taken = take_pending()
+        items, sales, ledger, renames, _ = taken
+        batch = []
+        for name, item in items.items():  # Only changed items are encoded
+            entry = {'name': name, 'item': item}
+            if name in renames:  # Replay moves the old name's rollups to this one
+                entry['renamed_from'] = renames[name]
+            if name in sales:  # Purchases carry their sales so rollups can be replayed
+                entry['sales'] = sales[name]
+            batch.append(entry)
+        backend = Storage_Backend.get_backend()
+        record = {'user': current_user, 'batch': batch, 'total_sales': total}
+        try:
+            log_records = backend.record_changes(current_user, record, tenant_version)
+        except Storage_Backend.VersionConflict:
+            restore_pending(*taken)
+            rebase_due = True
+            return
+        except Exception:
+            restore_pending(*taken)
+            raise
+        if tenant_version is not None:
+            tenant_version += 1
+        if ledger:  # Only once the record is in, so a retried batch never reaches the ledger twice
+            backend.append_sales(current_user, ledger)
+        if log_records >= Transaction_Log.COMPACT_THRESHOLD:  # Log grew too long
+            compact_due = True  # The next change compacts it
+
+# Background loop flushing pending changes every WRITE_BEHIND_INTERVAL seconds
+def write_behind():
+    while not writer_stop.wait(WRITE_BEHIND_INTERVAL):
+        try:
+            flush_changes()
+        except Exception as error:  # flush_changes put the batch back: keep it pending and retry on the next tick
+            print(f"⚠️ Background save failed: {error}")
+
+# Start the background writer if it isn't running
+def start_writer():
+    global writer_thread
+    if writer_thread is None:
+        writer_stop.clear()
+        writer_thread = threading.Thread(target=write_behind, name='write-behind', daemon=True)
+        writer_thread.start()
+
+# Stop the background writer and write everything still pending
+def stop_writer():
+    global writer_thread
+    if writer_thread is not None:
+        writer_stop.set()
+        writer_thread.join()
+        writer_thread = None
+    sync_changes()
+
+# Flush on logout and exit; the snapshot is only rewritten if something changed
+def close_session():
+    stop_writer()
+    if changed_since_snapshot:
+        save_inventory()
+
+# Turn termination signals into a normal exit so pending changes are flushed
+def exit_on_signal(signum, frame):
+    raise SystemExit(128 + signum)
+
+# Plain-text table used when PrettyTable is not installed
+class PlainTable:
+    def __init__(self):
+        self.field_names = []  # Column headers
+        self.rows = []  # Table rows
+
+    def add_row(self, row):
+        self.rows.append([str(value) for value in row])
+
+    def __str__(self):
+        headers = [str(name) for name in self.field_names]
+        widths = [len(name) for name in headers]  # Widest value in each column
+        for row in self.rows:
+            widths = [max(width, len(value)) for width, value in zip(widths, row)]
+        lines = [' | '.join(name.ljust(width) for name, width in zip(headers, widths))]
+        lines.append('-+-'.join('-' * width for width in widths))
+        for row in self.rows:
+            lines.append(' | '.join(value.ljust(width) for value, width in zip(row, widths)))
+        return '\n'.join(lines)
+
+# Create a table, importing PrettyTable only the first time a table is shown
+def new_table():
+    try:
+        from prettytable import PrettyTable  # Import PrettyTable for displaying tables
+    except ImportError:  # Fall back to plain text output
+        return PlainTable()
+    return PrettyTable()
 
 # Display the current inventory state and total sales as a table
+@Instrumentation.instrument('display_inventory')
 def display_inventory():
     print("\n📦 Current Inventory and Sales")  # Print a header for inventory and sales
-    table = PrettyTable()  # Create a PrettyTable instance for displaying data in tabular format
+    table = new_table()  # Create a table instance for displaying data in tabular format
     table.field_names = ["Name", "Price", "Count", "Sales (Count)", "Sales (Price)"]  # Define table column headers
-    
-    for name, details in inventory.items():  # Iterate through each item in the inventory dictionary
-        sales_count = details.get('sales_count', 0)  # Retrieve 'sales_count' or default to 0 if not found
-        sales_price = details.get('sales_price', 0.0)  # Retrieve 'sales_price' or default to 0.0 if not found
-        table.add_row([name, details['price'], details['count'], sales_count, sales_price])  # Add a row to the table
-    
-    print(table)  # Print the PrettyTable containing inventory details
+
+    for row in islice(iter_inventory_rows(), DISPLAY_LIMIT):  # Only the first DISPLAY_LIMIT rows are built, if set
+        table.add_row(list(row))  # Add a row to the table
+
+    print(table)  # Print the table containing inventory details
+    if DISPLAY_LIMIT is not None and len(inventory) > DISPLAY_LIMIT:  # Point large catalogs at the paginated browser
+        print(f"📄 Showing {DISPLAY_LIMIT} of {len(inventory)} items. Use 'Browse Inventory' to see the rest.")
     print(f"💰 Total sales: {total_sales}")  # Print total sales at the end
 
+# Yield inventory rows one at a time: (name, price, count, sales count, sales price)
+def iter_inventory_rows():
+    for name, item in inventory.items():
+        yield name, item.price, item.count, item.sales_count, item.sales_price
+
+# Print a list of inventory rows as a table
+def show_rows(rows):
+    table = new_table()  # Create a table instance for displaying data in tabular format
+    table.field_names = ["Name", "Price", "Count", "Sales (Count)", "Sales (Price)"]  # Define table column headers
+    for row in rows:
+        table.add_row(list(row))
+    print(table)
+
+# Browse the inventory with filters, sorting, pages and top-N views
+def browse_inventory():
+    print("\n🔎 Browse Inventory")  # Print header for the browser
+    Inventory_Views.browse(iter_inventory_rows, show_rows, {
+        'Top sellers': (SALES_COUNT, True),  # Largest sales count first
+        'Lowest stock': (Inventory_Views.COUNT, False),  # Smallest count first
+    })
+
 # Add new item to the inventory
+@Instrumentation.instrument('add_item')
 def add_item(name, price, count):
     if name in inventory:  # Check if item already exists in inventory
         print(f"⚠️ Item '{name}' already exists. Use 'update inventory' to modify count.")  # Print warning message
+        return False
     else:
         # Add new item details to inventory dictionary with initial sales metrics
-        inventory[name] = {'price': price, 'count': count, 'sales_count': 0, 'sales_price': 0.0}
-        save_inventory()  # Save updated inventory to JSON file
+        inventory[name] = Inventory_Item.Item(price, count)
+        if search_index is not None:  # Keep the search index in step
+            search_index.add(name)
+        log_change(name)  # Queue the change for writing
         print(f"✅ Item '{name}' added to inventory.")  # Print success message
+        return True
 
 # Buy item from the inventory
+@Instrumentation.instrument('buy_item')
 def buy_item(name, quantity):
     global total_sales  # Access the global total_sales variable
     if name in inventory:  # Check if item exists in inventory
-        if inventory[name]['count'] >= quantity:  # Check if sufficient stock is available
+        if inventory[name].count >= quantity:  # Check if sufficient stock is available
             # Update item count, sales count, and total sales
-            inventory[name]['count'] -= quantity
-            inventory[name]['sales_count'] += quantity
-            inventory[name]['sales_price'] += quantity * inventory[name]['price']
-            total_sales += quantity * inventory[name]['price']
-            save_inventory()  # Save updated inventory to JSON file
+            amount = quantity * inventory[name].price  # Value of this sale
+            now = datetime.now()  # Time of the sale
+            inventory[name].count -= quantity
+            inventory[name].sales_count += quantity
+            inventory[name].sales_price += amount
+            total_sales += amount
+            Sales_Ledger.record_sale(rollups, name, quantity, amount, now)  # Update day/month/year totals
+            log_change(name, (quantity, amount, now))  # Queue the change and the sale for writing
             print(f"🛒 Purchased {quantity} of '{name}'.")  # Print purchase confirmation
+            return True
         else:
             print(f"❌ Insufficient stock for '{name}'.")  # Print insufficient stock message
+            return False
     else:
-        print(f"❌ Item '{name}' not found in inventory.")  # Print item not found message
+        item_not_found(name)  # Print item not found message with suggestions
+        return False
 
 # Change price of an existing item
+@Instrumentation.instrument('change_price')
 def change_price(name, new_price):
     if name in inventory:  # Check if item exists in inventory
-        inventory[name]['price'] = new_price  # Update item price
-        save_inventory()  # Save updated inventory to JSON file
+        inventory[name].price = new_price  # Update item price
+        log_change(name, fields=('price',))  # Queue the change for writing
         print(f"💲 Price of '{name}' updated to {new_price}.")  # Print success message
+        return True
     else:
-        print(f"❌ Item '{name}' not found in inventory.")  # Print item not found message
+        item_not_found(name)  # Print item not found message with suggestions
+        return False
 
 # Update the count of an item in the inventory
+@Instrumentation.instrument('update_inventory')
 def update_inventory(name, count):
     if name in inventory:  # Check if item exists in inventory
-        inventory[name]['count'] = count  # Update item count
-        save_inventory()  # Save updated inventory to JSON file
+        inventory[name].count = count  # Update item count
+        log_change(name, fields=('count',))  # Queue the change for writing
         print(f"🔄 Inventory of '{name}' updated to {count}.")  # Print success message
+        return True
     else:
-        print(f"❌ Item '{name}' not found in inventory.")  # Print item not found message
+        item_not_found(name)  # Print item not found message with suggestions
+        return False
 
 # Display statistics for a specific item by its name
+@Instrumentation.instrument('detail_by_name')
 def detail_by_name(name, period):
     if name in inventory:  # Check if item exists in inventory
         now = datetime.now()  # Get current date and time
@@ -115,19 +413,175 @@ def detail_by_name(name, period):
             print(f"\n📅 Statistics for '{name}' in {now.strftime('%Y-%m')}:")
         elif period == 'year':  # Check if period is 'year'
             print(f"\n📅 Statistics for '{name}' in {now.strftime('%Y')}:")
-        # Print item details including price, stock, sales count, and sales price
-        print(f"Price: {inventory[name]['price']}, Stock: {inventory[name]['count']}, Sales (Count): {inventory[name]['sales_count']}, Sales (Price): {inventory[name]['sales_price']}")
+        else:  # Unknown period
+            print("❌ Invalid period. Please enter day, month or year.")
+            return
+        # Look up this period's sales in the rollups
+        period_count, period_price = Sales_Ledger.period_stats(rollups, name, period, now)
+        # Print item details including price, stock, sales count, and sales price for the period
+        print(f"Price: {inventory[name].price}, Stock: {inventory[name].count}, Sales (Count): {period_count}, Sales (Price): {period_price}")
+        print(f"All-time Sales (Count): {inventory[name].sales_count}, All-time Sales (Price): {inventory[name].sales_price}")
     else:
-        print(f"❌ Item '{name}' not found in inventory.")  # Print item not found message
+        item_not_found(name)  # Print item not found message with suggestions
 
 # Delete an item from the inventory
+@Instrumentation.instrument('delete_item')
 def delete_item(name):
     if name in inventory:  # Check if item exists in inventory
         del inventory[name]  # Delete item from inventory dictionary
-        save_inventory()  # Save updated inventory to JSON file
+        if search_index is not None:  # Keep the search index in step
+            search_index.remove(name)
+        log_change(name)  # Queue the change for writing
         print(f"🗑️ Item '{name}' deleted from inventory.")  # Print success message
+        return True
+    else:
+        item_not_found(name)  # Print item not found message with suggestions
+        return False
+
+# Rename an item, keeping its stock, sales and sales history
+@Instrumentation.instrument('rename_item')
+def rename_item(name, new_name):
+    if name not in inventory:  # Check if item exists in inventory
+        item_not_found(name)
+    elif new_name in inventory:  # The new name must be free
+        print(f"⚠️ Item '{new_name}' already exists.")
     else:
-        print(f"❌ Item '{name}' not found in inventory.")  # Print item not found message
+        inventory[new_name] = inventory.pop(name)  # Move the item to its new name
+        Sales_Ledger.rename_item(rollups, name, new_name)  # Move its day/month/year totals too
+        if search_index is not None:  # Keep the search index in step
+            search_index.rename(name, new_name)
+        log_changes([name, new_name], renames={new_name: name})  # Queue both names as one change
+        print(f"✏️ Item '{name}' renamed to '{new_name}'.")  # Print success message
+
+# Search index over the current inventory, built on first use
+def get_search_index():
+    global search_index
+    if search_index is None:
+        search_index = Name_Search.NameIndex(inventory)
+    return search_index
+
+# Report a missing item and suggest names close to what was typed
+def item_not_found(name):
+    print(f"❌ Item '{name}' not found in inventory.")  # Print item not found message
+    suggestions = get_search_index().suggest(name)
+    if suggestions:
+        print(f"💡 Did you mean: {', '.join(suggestions)}?")
+
+# Search items by name prefix, substring or approximate spelling
+def search_items():
+    query = input("Search for: ").strip()
+    if not query:
+        print("❌ Please enter some text to search for.")
+        return
+    index = get_search_index()
+    names = index.prefix(query, Name_Search.SEARCH_LIMIT)  # Autocomplete: names starting with the query
+    for name in index.contains(query, Name_Search.SEARCH_LIMIT) + index.similar(query):  # Then substring and fuzzy matches
+        if name not in names and len(names) < Name_Search.SEARCH_LIMIT:
+            names.append(name)
+    if not names:
+        print(f"🔍 No items match '{query}'.")
+        return
+    show_rows((name, inventory[name].price, inventory[name].count, inventory[name].sales_count, inventory[name].sales_price)
+              for name in names)
+
+# Check a batch of (name, value) pairs and sum the values per item
+def validate_batch(rows, field):
+    errors = []  # Problems found in the batch
+    totals = {}  # Name -> summed value, preserving first-seen order
+    for line, (name, value) in enumerate(rows, start=1):
+        if name not in inventory:  # Every item must exist
+            errors.append(f"Line {line}: item '{name}' not found in inventory.")
+        elif not isinstance(value, int) or isinstance(value, bool) or value < 0 or (field == 'quantity' and value == 0):
+            errors.append(f"Line {line}: invalid {field} {value!r} for '{name}'.")
+        else:
+            totals[name] = totals.get(name, 0) + value
+    return totals, errors
+
+# Buy many items in one all-or-nothing transaction
+@Instrumentation.instrument('buy_items')
+def buy_items(orders):
+    global total_sales  # Access the global total_sales variable
+    totals, errors = validate_batch(orders, 'quantity')  # Validate every line before touching stock
+    for name, quantity in totals.items():  # Check stock against the summed quantity per item
+        if inventory[name].count < quantity:
+            errors.append(f"Insufficient stock for '{name}': {quantity} requested, {inventory[name].count} available.")
+    if errors:  # Reject the whole batch
+        for error in errors:
+            print(f"❌ {error}")
+        return False
+
+    now = datetime.now()  # One timestamp for the whole order
+    sales = {}  # Name -> (quantity, amount, time) for the ledger and transaction log
+    batch_total = 0  # Value of the whole order
+    for name, quantity in totals.items():
+        amount = quantity * inventory[name].price  # Value of this line
+        inventory[name].count -= quantity
+        inventory[name].sales_count += quantity
+        inventory[name].sales_price += amount
+        batch_total += amount
+        Sales_Ledger.record_sale(rollups, name, quantity, amount, now)  # Update day/month/year totals
+        sales[name] = (quantity, amount, now)
+    total_sales += batch_total  # Total sales is updated once for the whole order
+    log_changes(list(totals), sales)  # Queue the whole order; it is written as part of a single record
+    print(f"🛒 Purchased {len(totals)} item(s) for a total of {batch_total}.")
+    return True
+
+# Set the counts of many items in one all-or-nothing transaction
+@Instrumentation.instrument('update_inventories')
+def update_inventories(updates):
+    latest = {}  # Name -> final count (the last update for an item wins)
+    for name, count in updates:
+        latest[name] = count
+    _, errors = validate_batch(updates, 'count')  # Validate every line before touching stock
+    if errors:  # Reject the whole batch
+        for error in errors:
+            print(f"❌ {error}")
+        return False
+    for name, count in latest.items():
+        inventory[name].count = count  # Update item count
+    log_changes(list(latest), fields=('count',))  # Queue the whole update; it is written as part of a single record
+    print(f"🔄 Inventory of {len(latest)} item(s) updated.")
+    return True
+
+# Read (name, value) pairs from a CSV or NDJSON batch file
+def read_batch_file(path, field):
+    rows = []
+    with open(path, 'r', newline='') as file:
+        if path.lower().endswith(('.ndjson', '.jsonl')):  # One JSON object per line
+            for line in file:
+                if line.strip():
+                    row = json.loads(line)
+                    if not isinstance(row, dict):  # Valid JSON, but not an object
+                        raise ValueError(f"Expected a JSON object, got: {line.strip()}")
+                    rows.append((row.get('name'), row.get(field)))
+        else:  # CSV with name,value columns and an optional header row
+            for line_number, row in enumerate(csv.reader(file), start=1):
+                if not row or (line_number == 1 and row[0].strip().lower() == 'name'):  # Only the first line can be a header
+                    continue
+                value = row[1].strip() if len(row) > 1 else ''
+                rows.append((row[0].strip(), int(value) if value.lstrip('-').isdigit() else value))
+    return rows
+
+# Process a batch of purchases or restocks from a file
+def process_batch_file():
+    print("\n📄 Batch Processing")  # Print header for batch processing
+    print("1. Buy items (name, quantity)")
+    print("2. Update item counts (name, count)")
+    option = input("Enter batch option (1-2): ")  # Prompt user to choose the batch type
+    if option not in ('1', '2'):
+        print("❌ Invalid option.")
+        return
+    path = input("Enter path to CSV or NDJSON file: ")  # Prompt user for the batch file
+    field = 'quantity' if option == '1' else 'count'
+    try:
+        rows = read_batch_file(path, field)
+    except (OSError, ValueError) as error:  # Missing file or malformed JSON
+        print(f"❌ Could not read batch file: {error}")
+        return
+    if option == '1':
+        buy_items(rows)
+    else:
+        update_inventories(rows)
 
 # Generate graphs based on inventory data
 def generate_graph():
@@ -136,8 +590,24 @@ def generate_graph():
     print("1. All product sales")
     print("2. All product stock")
     print("3. All product sales and stock")
+    print("4. Product sales in the current day/month/year")
+    print("5. Export all charts to files")
+
+    data_option = int(input("Enter data option (1-5): "))  # Prompt user to choose data option
 
-    data_option = int(input("Enter data option (1-3): "))  # Prompt user to choose data option
+    if data_option == 5:  # If user chooses option 5 (Export all charts)
+        import Chart_Export  # Import the headless exporter (renders in worker processes)
+        fmt = input("Enter file format (png/svg): ").strip().lower() or 'png'  # Prompt user for the image format
+        if fmt not in ('png', 'svg'):
+            print("❌ Invalid format.")
+            return
+        output_dir = f"{Chart_Export.OUTPUT_DIR}/{Tenant_Storage.shard_name(current_user)}"  # One folder per user
+        paths = Chart_Export.export_charts(inventory, output_dir, fmt)  # Unchanged charts are served from the cache
+        for chart, path in paths.items():
+            print(f"🖼️ {chart}: {path}")
+        return
+
+    import matplotlib.pyplot as plt  # Import matplotlib for plotting graphs (only loaded when graphs are used)
     
     if data_option == 1:  # If user chooses option 1 (All product sales)
         print("\nGraph Types:")  # Print options for graph types
@@ -148,7 +618,7 @@ def generate_graph():
 
         if graph_option == 1:  # If user chooses option 1 (Bar Graph)
             names = list(inventory.keys())  # Get list of item names
-            plt.bar(names, [inventory[name]['sales_count'] for name in names])  # Plot bar graph of sales count
+            plt.bar(names, [inventory[name].sales_count for name in names])  # Plot bar graph of sales count
             plt.xlabel('Items')  # Set x-axis label
             plt.ylabel('Sales (Count)')  # Set y-axis label
             plt.title('Bar Graph: Sales (Count) of all items')  # Set title of the graph
@@ -157,11 +627,11 @@ def generate_graph():
         elif graph_option == 2:  # If user chooses option 2 (Pie Chart)
             names = list(inventory.keys())  # Get list of item names
             plt.figure(figsize=(8, 8))  # Set figure size
-            plt.pie([inventory[name]['sales_count'] for name in names], labels=names, autopct='%1.1f%%')  # Plot pie chart of sales count
+            plt.pie([inventory[name].sales_count for name in names], labels=names, autopct='%1.1f%%')  # Plot pie chart of sales count
             plt.title('Pie Chart: Sales (Count) Distribution')  # Set title of the graph
             plt.show()  # Display the graph
         elif graph_option == 3:  # If user chooses option 3 (Histogram)
-            plt.hist([inventory[name]['sales_count'] for name in inventory.keys()], bins=10)  # Plot histogram of sales count
+            plt.hist([inventory[name].sales_count for name in inventory.keys()], bins=10)  # Plot histogram of sales count
             plt.xlabel('Sales (Count)')  # Set x-axis label
             plt.ylabel('Frequency')  # Set y-axis label
             plt.title('Histogram: Sales (Count) Distribution')  # Set title of the graph
@@ -176,7 +646,7 @@ def generate_graph():
 
         if graph_option == 1:  # If user chooses option 1 (Bar Graph)
             names = list(inventory.keys())  # Get list of item names
-            plt.bar(names, [inventory[name]['count'] for name in names])  # Plot bar graph of item stocks
+            plt.bar(names, [inventory[name].count for name in names])  # Plot bar graph of item stocks
             plt.xlabel('Items')  # Set x-axis label
             plt.ylabel('Stocks')  # Set y-axis label
             plt.title('Bar Graph: Stocks of all items')  # Set title of the graph
@@ -194,7 +664,7 @@ def generate_graph():
         if graph_option == 1:  # If user chooses option 1 (Bar Graph: Stocks)
             names = list(inventory.keys())  # Get list of item names
             plt.figure(figsize=(10, 5))  # Set figure size
-            plt.bar(names, [inventory[name]['count'] for name in names], label='Stocks')  # Plot bar graph of item stocks
+            plt.bar(names, [inventory[name].count for name in names], label='Stocks')  # Plot bar graph of item stocks
             plt.xlabel('Items')  # Set x-axis label
             plt.ylabel('Quantity')  # Set y-axis label
             plt.title('Bar Graph: Stocks of all items')  # Set title of the graph
@@ -204,7 +674,7 @@ def generate_graph():
         elif graph_option == 2:  # If user chooses option 2 (Bar Graph: Sales (Count))
             names = list(inventory.keys())  # Get list of item names
             plt.figure(figsize=(10, 5))  # Set figure size
-            plt.bar(names, [inventory[name]['sales_count'] for name in names], label='Sales (Count)')  # Plot bar graph of sales count
+            plt.bar(names, [inventory[name].sales_count for name in names], label='Sales (Count)')  # Plot bar graph of sales count
             plt.xlabel('Items')  # Set x-axis label
             plt.ylabel('Quantity')  # Set y-axis label
             plt.title('Bar Graph: Sales (Count) of all items')  # Set title of the graph
@@ -214,44 +684,47 @@ def generate_graph():
         else:
             print("❌ Invalid option.")  # Print error message for invalid option
 
+    elif data_option == 4:  # If user chooses option 4 (Product sales in a period)
+        period = input("Enter period (day/month/year): ").lower()  # Prompt user to choose the period
+        if period not in Sales_Ledger.PERIOD_FORMATS:  # Reject unknown periods
+            print("❌ Invalid period.")
+            return
+        totals = Sales_Ledger.period_totals(rollups, period)  # Read this period's bucket from the rollups
+        names = list(totals.keys())  # Items sold during the period
+        plt.figure(figsize=(10, 5))  # Set figure size
+        plt.bar(names, [totals[name][0] for name in names], label='Sales (Count)')  # Plot bar graph of period sales
+        plt.xlabel('Items')  # Set x-axis label
+        plt.ylabel('Sales (Count)')  # Set y-axis label
+        plt.title(f'Bar Graph: Sales (Count) this {period}')  # Set title of the graph
+        plt.xticks(rotation=45)  # Rotate x-axis labels for better readability
+        plt.legend()  # Display legend
+        plt.show()  # Display the graph
+
     else:
         print("❌ Invalid option.")  # Print error message for invalid option
 
 # Registration function
 def register_user():
-    with open('login.json', 'r') as file:  # Open the login JSON file in read mode
-        try:
-            users = json.load(file)  # Load existing user data from JSON
-        except json.JSONDecodeError:  # Handle JSON decoding error
-            users = {}  # Initialize empty dictionary if file is empty or not JSON formatted
-
     username = input("Enter a new username: ")  # Prompt user to enter a new username
-    if username in users:  # Check if username already exists in the users dictionary
+    if Credential_Store.user_exists(username):  # Check if username is already registered
         print("❌ Username already exists. Try logging in.")  # Print error message if username exists
         return False  # Return False to indicate registration failure
 
     password = getpass.getpass("Enter a new password: ")  # Prompt user to enter a new password securely
-    users[username] = password  # Add new username-password pair to the users dictionary
+    if not Credential_Store.register(username, password):  # Append a salted hash to the credential store
+        print("❌ Username already exists. Try logging in.")  # Someone registered the name in the meantime
+        return False
 
-    with open('login.json', 'w') as file:  # Open the login JSON file in write mode
-        json.dump(users, file, indent=4)  # Write updated users dictionary to JSON file with formatting
-    
     print("✅ Registration successful. You can now log in.")  # Print success message
     return True  # Return True to indicate registration success
 
 # Login function
 def login_user():
     global current_user  # Access the global current_user variable
-    with open('login.json', 'r') as file:  # Open the login JSON file in read mode
-        try:
-            users = json.load(file)  # Load existing user data from JSON
-        except json.JSONDecodeError:  # Handle JSON decoding error
-            users = {}  # Initialize empty dictionary if file is empty or not JSON formatted
-
     username = input("Enter username: ")  # Prompt user to enter username
     password = getpass.getpass("Enter password: ")  # Prompt user to enter password securely
 
-    if username in users and users[username] == password:  # Check if username exists and password is correct
+    if Credential_Store.verify(username, password):  # Check if username exists and password is correct
         current_user = username  # Set current_user to the logged-in username
         print("✅ Login successful.")  # Print success message
         load_inventory()  # Load inventory data for the logged-in user
@@ -259,6 +732,17 @@ def login_user():
     else:
         print("❌ Invalid username or password. Please try again.")  # Print error message
 
+# Ask for a price; returns None (after saying why) unless it is a non-negative number
+def ask_price(prompt):
+    try:
+        price = float(input(prompt))
+    except ValueError:
+        price = None
+    if price is None or not price >= 0:  # Also rejects NaN, which fails every comparison
+        print("❌ Price must be a non-negative number.")
+        return None
+    return price
+
 # Main menu function
 def main_menu():
     while True:  # Loop to display menu until user chooses to exit
@@ -272,23 +756,31 @@ def main_menu():
         print("7. Delete Item")
         print("8. Generate Graph")
         print("9. Save and Logout")
-        choice = input("Enter your choice (1-9): ")  # Prompt user to enter choice
+        print("10. Process Batch File")
+        print("11. Browse Inventory")
+        print("12. Stats")
+        print("13. Search Items")
+        print("14. Rename Item")
+        print("15. Analytics Report")
+        choice = input("Enter your choice (1-15): ")  # Prompt user to enter choice
 
         if choice == '1':  # Option to display inventory
             display_inventory()
         elif choice == '2':  # Option to add new item
             name = input("Enter item name: ")
-            price = float(input("Enter item price: "))
-            count = int(input("Enter item count: "))
-            add_item(name, price, count)
+            price = ask_price("Enter item price: ")
+            if price is not None:
+                count = int(input("Enter item count: "))
+                add_item(name, price, count)
         elif choice == '3':  # Option to buy item
             name = input("Enter item name: ")
             quantity = int(input("Enter quantity to buy: "))
             buy_item(name, quantity)
         elif choice == '4':  # Option to change item price
             name = input("Enter item name: ")
-            new_price = float(input("Enter new price: "))
-            change_price(name, new_price)
+            new_price = ask_price("Enter new price: ")
+            if new_price is not None:
+                change_price(name, new_price)
         elif choice == '5':  # Option to update item count
             name = input("Enter item name: ")
             new_count = int(input("Enter new count: "))
@@ -303,14 +795,33 @@ def main_menu():
         elif choice == '8':  # Option to generate graphs
             generate_graph()
         elif choice == '9':  # Option to save and logout
-            save_inventory()  # Save current inventory to JSON file
+            close_session()  # Flush pending changes and save the current inventory
             print("🔒 Logged out.")  # Print logout message
             break  # Exit the loop and end the program
+        elif choice == '10':  # Option to process a batch file
+            process_batch_file()
+        elif choice == '11':  # Option to browse the inventory
+            browse_inventory()
+        elif choice == '12':  # Option to show operation stats
+            print("\n📈 Stats")
+            print(Instrumentation.format_report())
+        elif choice == '13':  # Option to search items by name
+            search_items()
+        elif choice == '14':  # Option to rename an item
+            name = input("Enter item name: ")
+            new_name = input("Enter new name: ")
+            rename_item(name, new_name)
+        elif choice == '15':  # Option to show ABC classes, sell-through, concentration and price bands
+            import Inventory_Analytics  # Import the analytics reports (only loaded when the report is shown)
+            print("\n📊 Analytics")
+            print(Inventory_Analytics.format_report(Inventory_Analytics.inventory_report(inventory)))
         else:  # Handle invalid menu choices
-            print("❌ Invalid choice. Please enter a number from 1 to 9.")
+            print("❌ Invalid choice. Please enter a number from 1 to 15.")
 
 # Entry point of the program
 def main():
+    atexit.register(sync_changes)  # Write pending changes however the program ends
+    signal.signal(signal.SIGTERM, exit_on_signal)  # SIGTERM unwinds normally, so atexit runs
     while True:  # Loop to handle login and registration until successful
         print("\n🔒 Login or Register")  # Print login or register header
         print("1. Login")
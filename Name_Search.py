@@ -0,0 +1,127 @@
+import heapq  # Import heapq to rank fuzzy matches without sorting every candidate
+from bisect import bisect_left, insort  # Import bisect for the sorted prefix index
+from itertools import islice  # Import islice to stop short scans early
+
+# Item-name search index
+#
+# Names are matched case-insensitively. Two structures are kept up to date as
+# items are added, deleted and renamed:
+#   - a sorted list of (folded name, name) pairs. A prefix query is two binary
+#     searches plus a slice, and autocomplete returns the first few entries.
+#   - a trigram index mapping every 3-character slice of the padded folded
+#     name to the names containing it. A "contains" query intersects the
+#     posting sets of the query's trigrams. A fuzzy query ranks names by how
+#     many trigrams they share with the query, so a name still matches with a
+#     typo or two in it.
+# Both apps build the index lazily the first time a search or suggestion is
+# needed, so loading a large catalog doesn't pay for it up front.
+
+SUGGESTIONS = 5  # Names offered when a lookup fails
+SEARCH_LIMIT = 100  # Results shown by a search
+MIN_SIMILARITY = 0.3  # Lowest trigram similarity counted as a fuzzy match
+
+
+# Case-insensitive form of a name
+def fold(name):
+    return name.casefold()
+
+
+# Trigrams of a folded name, padded so short names and word starts still have some
+def trigrams(folded):
+    padded = f"  {folded} "
+    return {padded[start:start + 3] for start in range(len(padded) - 2)}
+
+
+# Prefix and trigram index over item names
+class NameIndex:
+    def __init__(self, names=()):
+        self.entries = sorted((fold(name), name) for name in names)  # Sorted (folded name, name)
+        self.grams = {}  # Trigram -> set of names containing it
+        for _, name in self.entries:
+            self._add_grams(name)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _add_grams(self, name):
+        for gram in trigrams(fold(name)):
+            self.grams.setdefault(gram, set()).add(name)
+
+    # Index a new name
+    def add(self, name):
+        insort(self.entries, (fold(name), name))
+        self._add_grams(name)
+
+    # Drop a name from the index
+    def remove(self, name):
+        entry = (fold(name), name)
+        position = bisect_left(self.entries, entry)
+        if position < len(self.entries) and self.entries[position] == entry:
+            del self.entries[position]
+        for gram in trigrams(entry[0]):
+            names = self.grams.get(gram)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self.grams[gram]
+
+    # Re-index a renamed item
+    def rename(self, old_name, new_name):
+        self.remove(old_name)
+        self.add(new_name)
+
+    # Names starting with a prefix, in alphabetical order
+    def prefix(self, prefix, limit=None):
+        folded = fold(prefix)
+        matches = []
+        for position in range(bisect_left(self.entries, (folded,)), len(self.entries)):
+            key, name = self.entries[position]
+            if not key.startswith(folded) or len(matches) == limit:
+                break
+            matches.append(name)
+        return matches
+
+    # Names containing a substring, in alphabetical order
+    def contains(self, text, limit=None):
+        folded = fold(text)
+        if len(folded) < 3:  # Too short for trigrams: fall back to a scan
+            return list(islice((name for key, name in self.entries if folded in key), limit))
+        grams = sorted({folded[start:start + 3] for start in range(len(folded) - 2)},
+                       key=lambda gram: len(self.grams.get(gram, ())))
+        candidates = set(self.grams.get(grams[0], ()))  # Start from the rarest trigram
+        for gram in grams[1:]:
+            candidates &= self.grams.get(gram, set())
+            if not candidates:
+                break
+        return sorted(name for name in candidates if folded in fold(name))[:limit]
+
+    # Names most similar to the text (typo tolerant), best first
+    def similar(self, text, limit=SUGGESTIONS, min_similarity=MIN_SIMILARITY):
+        query = trigrams(fold(text))
+        postings = sorted((self.grams.get(gram, set()) for gram in query), key=len)
+        rare = (len(postings) + 1) // 2  # Candidates come from the rarer half of the trigrams
+        shared = {}  # Name -> trigrams shared with the query
+        for names in postings[:rare]:
+            for name in names:
+                shared[name] = shared.get(name, 0) + 1
+        for names in postings[rare:]:  # Common trigrams only add to existing candidates
+            for name in shared:
+                if name in names:
+                    shared[name] += 1
+        scored = []
+        for name, common in shared.items():
+            similarity = common / (len(query) + len(name) + 1 - common)  # Jaccard (a name has len + 1 trigrams)
+            if similarity >= min_similarity:
+                scored.append((similarity, name))
+        return [name for _, name in heapq.nlargest(limit, scored)]
+
+    # Suggestions for a name that wasn't found: prefix matches, then substring, then fuzzy
+    def suggest(self, text, limit=SUGGESTIONS):
+        suggestions = []
+        for search in (self.prefix, self.contains, self.similar):  # Cheapest first; stop once there are enough
+            for name in search(text, limit):
+                if name not in suggestions:
+                    suggestions.append(name)
+            if len(suggestions) >= limit:
+                break
+        return suggestions[:limit]
@@ -0,0 +1,76 @@
+import heapq  # Import heapq for the lazily updated stock heap
+
+# Reorder-point index
+#
+# Every item has a reorder point (0 when none is set). Its headroom is its
+# stock minus that point, and it needs reordering once the headroom reaches
+# zero or below. The index keeps a min-heap of (headroom, name) entries:
+#   - a stock or threshold change pushes a new entry and records the item's
+#     current headroom. The superseded entry stays in the heap and is skipped
+#     when it reaches the top. The heap is rebuilt once stale entries
+#     outnumber live ones.
+#   - "items at or below their reorder point" and "the k lowest items" pop
+#     entries from the top and push them back afterwards. That costs
+#     O(k log n) for k results instead of a scan of the whole catalog.
+# The index is only built when a report first needs it, so alerts for items
+# reaching their reorder point come from MAIN.stock_changed (MAIN.on_reorder).
+
+
+# Min-heap of items by stock remaining above their reorder point
+class ReorderIndex:
+    def __init__(self, items=()):
+        self.headroom = {name: count - threshold for name, count, threshold in items}  # Current headroom per item
+        self.heap = [(headroom, name) for name, headroom in self.headroom.items()]
+        heapq.heapify(self.heap)
+
+    def __len__(self):
+        return len(self.headroom)
+
+    # Record an item's new stock or reorder point
+    def update(self, name, count, threshold):
+        headroom = count - threshold
+        if self.headroom.get(name) == headroom:
+            return
+        self.headroom[name] = headroom
+        heapq.heappush(self.heap, (headroom, name))
+        if len(self.heap) > 2 * len(self.headroom) + 64:  # Mostly stale entries: rebuild
+            self.compact()
+
+    # Forget a deleted item (its heap entries become stale)
+    def remove(self, name):
+        self.headroom.pop(name, None)
+
+    # Move an item to its new name
+    def rename(self, old_name, new_name):
+        headroom = self.headroom.pop(old_name, None)
+        if headroom is not None:
+            self.headroom[new_name] = headroom
+            heapq.heappush(self.heap, (headroom, new_name))
+
+    # Rebuild the heap from the live entries only
+    def compact(self):
+        self.heap = [(headroom, name) for name, headroom in self.headroom.items()]
+        heapq.heapify(self.heap)
+
+    # Pop live entries while they satisfy `keep(headroom, taken)`, then restore them
+    def _take(self, keep):
+        taken = []
+        while self.heap:
+            headroom, name = self.heap[0]
+            if self.headroom.get(name) != headroom or (taken and taken[-1] == (headroom, name)):
+                heapq.heappop(self.heap)  # Stale or duplicate entry: drop it for good
+                continue
+            if not keep(headroom, len(taken)):
+                break
+            taken.append(heapq.heappop(self.heap))
+        for entry in taken:
+            heapq.heappush(self.heap, entry)
+        return [(name, headroom) for headroom, name in taken]
+
+    # The k items with the least stock above their reorder point, lowest first
+    def lowest(self, k):
+        return self._take(lambda headroom, taken: taken < k)
+
+    # Every item at or below its reorder point, lowest first
+    def below_reorder_point(self, limit=None):
+        return self._take(lambda headroom, taken: headroom <= 0 and (limit is None or taken < limit))
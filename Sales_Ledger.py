@@ -0,0 +1,92 @@
+import Instrumentation  # Import the timed JSON helpers
+from datetime import datetime  # Import datetime for timestamps and period keys
+
+# Timestamped sales ledger with time-bucketed rollups
+#
+# Every purchase is appended to a per-user ledger file in time order. Next to
+# it, rollups keep running [count, revenue] totals per item for each day,
+# month and year, so a per-item, per-period query is a couple of dictionary
+# lookups no matter how long the sales history gets.
+
+PERIOD_FORMATS = {'day': '%Y-%m-%d', 'month': '%Y-%m', 'year': '%Y'}  # Bucket key per period
+
+
+# Create empty rollups
+def new_rollups():
+    return {period: {} for period in PERIOD_FORMATS}
+
+
+# Bucket key of a period containing the given time
+def period_key(period, when):
+    return when.strftime(PERIOD_FORMATS[period])
+
+
+# Add one sale to every period bucket it belongs to
+def record_sale(rollups, name, quantity, amount, when):
+    for period in PERIOD_FORMATS:
+        bucket = rollups.setdefault(period, {}).setdefault(period_key(period, when), {})
+        totals = bucket.setdefault(name, [0, 0.0])  # [sales count, sales revenue]
+        totals[0] += quantity
+        totals[1] += amount
+
+
+# Move an item's rollup totals to a new name (merging with any totals already there)
+def rename_item(rollups, old_name, new_name):
+    for buckets in rollups.values():
+        for items in buckets.values():
+            totals = items.pop(old_name, None)
+            if totals is not None:
+                merged = items.setdefault(new_name, [0, 0.0])
+                merged[0] += totals[0]
+                merged[1] += totals[1]
+
+
+# Sales count and revenue of one item in the period containing `when`
+def period_stats(rollups, name, period, when=None):
+    when = when or datetime.now()
+    bucket = rollups.get(period, {}).get(period_key(period, when), {})
+    count, amount = bucket.get(name, (0, 0.0))
+    return count, amount
+
+
+# Sales count and revenue of every item in the period containing `when`
+def period_totals(rollups, period, when=None):
+    when = when or datetime.now()
+    return rollups.get(period, {}).get(period_key(period, when), {})
+
+
+# Append a sale to a ledger file
+def append_sale(path, name, quantity, amount, when):
+    append_sales(path, [(name, quantity, amount, when)])
+
+
+# Append many (name, quantity, amount, time) sales to a ledger file in one write
+def append_sales(path, sales):
+    lines = []
+    for name, quantity, amount, when in sales:
+        entry = [when.isoformat(timespec='seconds'), name, quantity, amount]
+        lines.append(Instrumentation.dumps(entry, 'ledger', separators=(',', ':')) + '\n')
+    with open(path, 'a') as file:  # Open the ledger in append mode
+        file.write(''.join(lines))
+
+
+# Yield (time, name, quantity, amount) for each sale in a ledger file
+def iter_sales(path):
+    try:
+        with open(path, 'r') as file:
+            for line in file:
+                try:
+                    stamp, name, quantity, amount = Instrumentation.loads(line, 'ledger')
+                except ValueError:  # Skip a torn final line
+                    continue
+                yield datetime.fromisoformat(stamp), name, quantity, amount
+    except FileNotFoundError:  # No sales recorded yet
+        return
+
+
+# Rebuild rollups from scratch by replaying a ledger file
+def rebuild_rollups(path):
+    rollups = new_rollups()
+    for when, name, quantity, amount in iter_sales(path):
+        record_sale(rollups, name, quantity, amount, when)
+    return rollups
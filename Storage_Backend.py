@@ -0,0 +1,406 @@
+import abc  # Import abc for the backend interface
+import argparse  # Import argparse for the import command
+import os  # Import os to read the backend choice from the environment
+import sqlite3  # Import sqlite3 for the embedded database backend
+import threading  # Import threading so the server can write from worker threads
+from datetime import datetime  # Import datetime to decode sale timestamps
+from itertools import repeat  # Import repeat to default missing reorder points
+import File_Lock  # Import cross-process locks and version counters
+import Instrumentation  # Import the timed JSON helpers
+import Inventory_Item  # Import the slotted item record
+import Sales_Ledger  # Import the sales ledger and rollups
+import Tenant_Storage  # Import per-user sharded JSON storage
+import Transaction_Log  # Import the append-only transaction log
+
+# Pluggable storage backends
+#
+# Both inventory layouts persist through one interface:
+#   - per-user data (Main_Menu.py): {'inventory': {name: item}, 'total_sales', 'rollups'}
+#   - columnar data (MAIN.py, File_Operators.py): {'Name': [...], 'Price': [...], 'Count': [...], 'Reorder': [...], 'Total Sales'}
+#
+# JsonBackend is the existing behavior: per-user shards with a transaction log
+# and a sales ledger, and the columnar layout in inventory.json. SqliteBackend
+# keeps everything in one indexed SQLite database in WAL mode. There a sale or
+# price change updates only the affected rows, so no log or compaction is
+# needed. The columnar layout has its own tables (column_store, column_items),
+# so no user name is reserved for it. Set INVENTORY_BACKEND=sqlite to use it,
+# and run `python Storage_Backend.py import` to copy existing JSON data across.
+#
+# Every store (a user, or the columnar layout) has a version that each write
+# increments. It is loaded as user_data['version'] or columns['Version'].
+# Writes can pass the version they started from as `expected_version`; if
+# another process wrote in between, they raise VersionConflict and write
+# nothing. The JSON backend locks its files with File_Lock, and
+# SQLite checks the version inside the write transaction.
+
+BACKEND = os.environ.get('INVENTORY_BACKEND', 'json')  # 'json' or 'sqlite'
+DATABASE_FILE = os.environ.get('INVENTORY_DATABASE', 'inventory.db')  # SQLite database path
+COLUMNAR_FILE = 'inventory.json'  # JSON file of the columnar layout
+COLUMNAR_STORE = '__columnar__'  # Name of the columnar layout in migration reports and binary snapshots
+
+_backend = None  # Backend shared by the whole process
+
+VersionConflict = File_Lock.VersionConflict  # Raised by a write whose expected version is out of date
+
+
+# Empty columnar inventory
+def empty_columns():
+    return {'Name': [], 'Price': [], 'Count': [], 'Reorder': [], 'Total Sales': 0.0, 'Version': 0}
+
+
+# Reject a columnar inventory that names an item twice (every backend keys items by name)
+def check_names(names):
+    seen = set()
+    for name in names:
+        if name in seen:
+            raise ValueError(f"Item '{name}' appears more than once in the columnar inventory.")
+        seen.add(name)
+
+
+# Interface every backend implements
+class StorageBackend(abc.ABC):
+    # Load one user's data: {'inventory', 'total_sales', 'rollups', 'version'}
+    @abc.abstractmethod
+    def load_tenant(self, user):
+        raise NotImplementedError
+
+    # Replace one user's data
+    @abc.abstractmethod
+    def save_tenant(self, user, user_data, expected_version=None):
+        raise NotImplementedError
+
+    # Persist a transaction-log style record; returns how many records await compaction
+    @abc.abstractmethod
+    def record_changes(self, user, record, expected_version=None):
+        raise NotImplementedError
+
+    # Append (name, quantity, amount, time) sales to a user's ledger
+    @abc.abstractmethod
+    def append_sales(self, user, sales):
+        raise NotImplementedError
+
+    # Names of every stored user
+    @abc.abstractmethod
+    def tenants(self):
+        raise NotImplementedError
+
+    # Load the columnar layout (with its 'Version')
+    @abc.abstractmethod
+    def load_columns(self):
+        raise NotImplementedError
+
+    # Replace the columnar layout
+    @abc.abstractmethod
+    def save_columns(self, columns, expected_version=None):
+        raise NotImplementedError
+
+
+# Sharded JSON files (the original storage)
+class JsonBackend(StorageBackend):
+    def load_tenant(self, user):
+        return Tenant_Storage.load_tenant(user)
+
+    def save_tenant(self, user, user_data, expected_version=None):
+        Tenant_Storage.save_tenant(user, user_data, expected_version)
+
+    def record_changes(self, user, record, expected_version=None):
+        return Tenant_Storage.append_change(user, record, expected_version)
+
+    def append_sales(self, user, sales):
+        Tenant_Storage.append_sales(user, sales)
+
+    def tenants(self):
+        return list(Tenant_Storage.load_index())
+
+    def load_columns(self):
+        with File_Lock.reading(COLUMNAR_FILE) as version:
+            try:
+                with open(COLUMNAR_FILE, 'r') as file:
+                    data = Instrumentation.loads(file.read(), 'columns')
+            except FileNotFoundError:
+                data = None
+        if data and 'Name' not in data:
+            raise ValueError(f"{COLUMNAR_FILE} does not use the Name/Price/Count layout.")
+        data = data or empty_columns()
+        data['Version'] = version
+        return data
+
+    def save_columns(self, columns, expected_version=None):
+        columns = {key: value for key, value in columns.items() if key != 'Version'}  # The lock file holds it
+        text = Instrumentation.dumps(columns, 'columns', indent=4)
+        with File_Lock.writing(COLUMNAR_FILE, expected_version):
+            Transaction_Log.replace_file(COLUMNAR_FILE, text)
+
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS tenants (
+    user TEXT PRIMARY KEY,
+    total_sales REAL NOT NULL DEFAULT 0,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS items (
+    user TEXT NOT NULL,
+    name TEXT NOT NULL,
+    price REAL NOT NULL,
+    count INTEGER NOT NULL,
+    sales_count INTEGER NOT NULL DEFAULT 0,
+    sales_price REAL NOT NULL DEFAULT 0,
+    position INTEGER NOT NULL DEFAULT 0,
+    reorder_point INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user, name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollups (
+    user TEXT NOT NULL,
+    period TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    name TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    amount REAL NOT NULL,
+    PRIMARY KEY (user, period, bucket, name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sales (
+    user TEXT NOT NULL,
+    time TEXT NOT NULL,
+    name TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    amount REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sales_by_time ON sales (user, time);
+CREATE TABLE IF NOT EXISTS column_store (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    total_sales REAL NOT NULL DEFAULT 0,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS column_items (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    price REAL NOT NULL,
+    count INTEGER NOT NULL,
+    reorder_point INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+'''
+
+
+# Indexed SQLite database
+class SqliteBackend(StorageBackend):
+    def __init__(self, path=DATABASE_FILE):
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')  # Readers don't block the writer
+        self.connection.execute('PRAGMA synchronous=NORMAL')  # Durable at checkpoints, fast commits
+        tables = {row[0] for row in self.connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.connection.executescript(SCHEMA)
+        columns = {row[1] for row in self.connection.execute('PRAGMA table_info(items)')}
+        if 'reorder_point' not in columns:  # Database created before reorder points
+            self.connection.execute('ALTER TABLE items ADD COLUMN reorder_point INTEGER NOT NULL DEFAULT 0')
+        columns = {row[1] for row in self.connection.execute('PRAGMA table_info(tenants)')}
+        if 'version' not in columns:  # Database created before versions
+            self.connection.execute('ALTER TABLE tenants ADD COLUMN version INTEGER NOT NULL DEFAULT 0')
+        if 'tenants' in tables and 'column_store' not in tables:  # Database that kept the columnar layout as a tenant
+            self._move_columnar_tenant()
+        self.lock = threading.Lock()  # One writer at a time on the shared connection
+
+    def load_tenant(self, user):
+        with self.lock:
+            rows = self.connection.execute(
+                'SELECT name, price, count, sales_count, sales_price FROM items WHERE user = ?', (user,)).fetchall()
+            total = self.connection.execute(
+                'SELECT total_sales, version FROM tenants WHERE user = ?', (user,)).fetchone()
+            buckets = self.connection.execute(
+                'SELECT period, bucket, name, count, amount FROM rollups WHERE user = ?', (user,)).fetchall()
+        inventory = {row[0]: Inventory_Item.Item(*row[1:]) for row in rows}
+        rollups = Sales_Ledger.new_rollups()
+        for period, bucket, name, count, amount in buckets:
+            rollups.setdefault(period, {}).setdefault(bucket, {})[name] = [count, amount]
+        total_sales, version = total or (0, 0)
+        return {'inventory': inventory, 'total_sales': total_sales, 'rollups': rollups, 'version': version}
+
+    def save_tenant(self, user, user_data, expected_version=None):
+        with self.lock, self.connection:  # One transaction
+            self._bump_version(user, expected_version)
+            self.connection.execute('DELETE FROM items WHERE user = ?', (user,))
+            self.connection.execute('DELETE FROM rollups WHERE user = ?', (user,))
+            self.connection.executemany(
+                'INSERT INTO items (user, name, price, count, sales_count, sales_price) VALUES (?, ?, ?, ?, ?, ?)',
+                ((user, name, item.price, item.count, item.sales_count, item.sales_price)
+                 for name, item in user_data.get('inventory', {}).items()))
+            self.connection.executemany(
+                'INSERT INTO rollups VALUES (?, ?, ?, ?, ?, ?)',
+                ((user, period, bucket, name, totals[0], totals[1])
+                 for period, buckets in user_data.get('rollups', {}).items()
+                 for bucket, items in buckets.items()
+                 for name, totals in items.items()))
+            self._set_total(user, user_data.get('total_sales', 0))
+
+    def record_changes(self, user, record, expected_version=None):
+        with self.lock, self.connection:  # One transaction: the whole batch or nothing
+            self._bump_version(user, expected_version)
+            for entry in record.get('batch', [record]):
+                name, item = entry['name'], entry['item']
+                if 'renamed_from' in entry:  # Move the item's rollups to its new name
+                    self.connection.execute(
+                        'INSERT INTO rollups SELECT user, period, bucket, ?, count, amount FROM rollups '
+                        'WHERE user = ? AND name = ? ON CONFLICT (user, period, bucket, name) '
+                        'DO UPDATE SET count = count + excluded.count, amount = amount + excluded.amount',
+                        (name, user, entry['renamed_from']))
+                    self.connection.execute(
+                        'DELETE FROM rollups WHERE user = ? AND name = ?', (user, entry['renamed_from']))
+                if item is None:
+                    self.connection.execute('DELETE FROM items WHERE user = ? AND name = ?', (user, name))
+                else:
+                    self.connection.execute(
+                        'INSERT INTO items (user, name, price, count, sales_count, sales_price) VALUES (?, ?, ?, ?, ?, ?) '
+                        'ON CONFLICT (user, name) DO UPDATE SET price = excluded.price, count = excluded.count, '
+                        'sales_count = excluded.sales_count, sales_price = excluded.sales_price',
+                        (user, name, item['price'], item['count'], item['sales_count'], item['sales_price']))
+                for stamp, quantity, amount in Transaction_Log.entry_sales(entry):
+                    when = datetime.fromisoformat(stamp)
+                    for period in Sales_Ledger.PERIOD_FORMATS:
+                        self.connection.execute(
+                            'INSERT INTO rollups VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (user, period, bucket, name) '
+                            'DO UPDATE SET count = count + excluded.count, amount = amount + excluded.amount',
+                            (user, period, Sales_Ledger.period_key(period, when), name, quantity, amount))
+            self._set_total(user, record['total_sales'])
+        return 0  # Rows are updated in place, so there is never anything to compact
+
+    def append_sales(self, user, sales):
+        with self.lock, self.connection:
+            self.connection.executemany(
+                'INSERT INTO sales VALUES (?, ?, ?, ?, ?)',
+                ((user, when.isoformat(timespec='seconds'), name, quantity, amount)
+                 for name, quantity, amount, when in sales))
+
+    def tenants(self):
+        with self.lock:
+            return [row[0] for row in self.connection.execute('SELECT user FROM tenants')]
+
+    def load_columns(self):
+        with self.lock:
+            rows = self.connection.execute(
+                'SELECT name, price, count, reorder_point FROM column_items ORDER BY position').fetchall()
+            total = self.connection.execute('SELECT total_sales, version FROM column_store').fetchone()
+        columns = empty_columns()
+        for name, price, count, reorder_point in rows:
+            columns['Name'].append(name)
+            columns['Price'].append(price)
+            columns['Count'].append(count)
+            columns['Reorder'].append(reorder_point)
+        columns['Total Sales'], columns['Version'] = total or (0.0, 0)
+        return columns
+
+    def save_columns(self, columns, expected_version=None):
+        check_names(columns['Name'])
+        with self.lock, self.connection:
+            self._bump_version(None, expected_version)
+            self.connection.execute('DELETE FROM column_items')
+            self.connection.executemany(
+                'INSERT INTO column_items (name, price, count, reorder_point, position) VALUES (?, ?, ?, ?, ?)',
+                ((name, price, count, reorder_point, position)
+                 for position, (name, price, count, reorder_point) in enumerate(zip(
+                     columns['Name'], columns['Price'], columns['Count'],
+                     columns.get('Reorder') or repeat(0, len(columns['Name']))))))
+            self.connection.execute('UPDATE column_store SET total_sales = ?', (columns.get('Total Sales', 0.0),))
+
+    # Move the columnar layout out of the tenant COLUMNAR_STORE, where databases
+    # created before the column tables kept it, into column_store and column_items
+    def _move_columnar_tenant(self):
+        with self.connection:
+            self.connection.execute(
+                'INSERT INTO column_items SELECT name, position, price, count, reorder_point FROM items WHERE user = ?',
+                (COLUMNAR_STORE,))
+            self.connection.execute(
+                'INSERT INTO column_store SELECT 0, total_sales, version FROM tenants WHERE user = ?',
+                (COLUMNAR_STORE,))
+            self.connection.execute('DELETE FROM items WHERE user = ?', (COLUMNAR_STORE,))
+            self.connection.execute('DELETE FROM tenants WHERE user = ?', (COLUMNAR_STORE,))
+
+    # Increment a store's version (a user's, or the columnar layout's for None), checking it first if
+    # `expected` is given (caller holds the lock and transaction; as the transaction's first write it
+    # also takes the database's write lock)
+    def _bump_version(self, user, expected):
+        table, column, key = ('column_store', 'id', 0) if user is None else ('tenants', 'user', user)
+        updated = self.connection.execute(
+            f'UPDATE {table} SET version = version + 1 WHERE {column} = ? AND (? IS NULL OR version = ?)',
+            (key, expected, expected)).rowcount
+        if updated:
+            return
+        row = self.connection.execute(f'SELECT version FROM {table} WHERE {column} = ?', (key,)).fetchone()
+        if row is not None or expected not in (None, 0):  # The store exists at another version
+            store = COLUMNAR_STORE if user is None else user
+            raise VersionConflict(f"{self.path}:{store}", expected, row[0] if row else 0)
+        self.connection.execute(f'INSERT INTO {table} ({column}, total_sales, version) VALUES (?, 0, 1)', (key,))
+
+    # Insert or update a user's total sales (caller holds the lock and transaction)
+    def _set_total(self, user, total_sales):
+        self.connection.execute(
+            'INSERT INTO tenants (user, total_sales) VALUES (?, ?) '
+            'ON CONFLICT (user) DO UPDATE SET total_sales = excluded.total_sales', (user, total_sales))
+
+
+# A new instance of the backend selected by INVENTORY_BACKEND (e.g. for a worker process)
+def open_backend():
+    if BACKEND == 'sqlite':
+        return SqliteBackend()
+    if BACKEND == 'json':
+        return JsonBackend()
+    raise ValueError(f"Unknown INVENTORY_BACKEND '{BACKEND}' (expected 'json' or 'sqlite').")
+
+
+# The backend shared by the whole process, created on first use
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = open_backend()
+    return _backend
+
+
+# Copy a JSON file of either layout into a backend; returns the stores imported
+def import_json_file(path, target):
+    data = Transaction_Log.read_snapshot(path)
+    if 'Name' in data:  # Columnar layout
+        target.save_columns(data)
+        return [COLUMNAR_STORE]
+    imported = []
+    legacy = {key: data.pop(key) for key in ('inventory', 'total_sales') if key in data}
+    if legacy:  # Stray top-level keys from the pre-login version
+        data[Tenant_Storage.LEGACY_TENANT] = legacy
+    for user, user_data in data.items():
+        user_data.setdefault('rollups', Sales_Ledger.new_rollups())
+        Inventory_Item.from_json(user_data.setdefault('inventory', {}))
+        target.save_tenant(user, user_data)
+        imported.append(user)
+    return imported
+
+
+# Copy every user (and the columnar store) from one backend to another
+def migrate(source, target):
+    imported = []
+    for user in source.tenants():
+        target.save_tenant(user, source.load_tenant(user))
+        imported.append(user)
+    try:
+        columns = source.load_columns()
+    except ValueError:  # inventory.json still holds the old per-user layout
+        columns = empty_columns()
+    if columns['Name']:
+        target.save_columns(columns)
+        imported.append(COLUMNAR_STORE)
+    return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import JSON inventory data into the SQLite backend.")
+    parser.add_argument('command', choices=['import'], help="What to do")
+    parser.add_argument('--source', help="JSON file in either layout (default: the sharded JSON store)")
+    parser.add_argument('--database', default=DATABASE_FILE, help="SQLite database to import into")
+    args = parser.parse_args()
+    target = SqliteBackend(args.database)
+    if args.source:
+        imported = import_json_file(args.source, target)
+    else:
+        imported = migrate(JsonBackend(), target)
+    print(f"✅ Imported {len(imported)} store(s) into {args.database}: {', '.join(map(str, imported))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import hashlib  # Import hashlib to derive collision-free shard file names
+import os  # Import os for directory and path handling
+import re  # Import re to sanitize user names into file names
+import File_Lock  # Import cross-process locks and version counters
+import Inventory_Item  # Import the slotted item record
+import Sales_Ledger  # Import the sales ledger and rollups
+import Transaction_Log  # Import the append-only transaction log
+
+# Per-tenant sharded storage
+#
+# Each user gets a snapshot file, a transaction log and a sales ledger inside
+# DATA_DIR, so logging in or saving only touches that user's data. A small
+# index maps user names to shard names. The old single-file layout is
+# migrated into shards the first time the index is missing.
+#
+# A shard's snapshot and log share one File_Lock, and its counter is the
+# tenant's version. Loads take the lock shared. Log appends and snapshot
+# rewrites take it exclusive, and the caller can pass the version it loaded
+# to have the write rejected if another process wrote first. The counter
+# also numbers the log records: a snapshot stores the number it was written
+# at, so replay skips the records it already holds.
+
+DATA_DIR = 'inventory_data'  # Directory holding the index and all shards
+INDEX_FILE = 'index.json'  # Directory index: user name -> shard name
+LEGACY_FILE = 'inventory.json'  # Single-file store used before sharding
+LEGACY_LOG = 'inventory.log'  # Transaction log that belonged to the single-file store
+LEGACY_TENANT = '__legacy__'  # Owner of the stray top-level 'inventory'/'total_sales' keys
+
+_index = None  # Cached copy of the directory index
+
+
+# Build a file-system-safe shard name for a user
+def shard_name(user):
+    safe = re.sub(r'[^A-Za-z0-9_-]', '_', str(user))[:40]  # Keep names readable
+    digest = hashlib.sha1(str(user).encode('utf-8')).hexdigest()[:8]  # Disambiguate sanitized clashes
+    return f"{safe}-{digest}"
+
+
+# Paths of a user's snapshot and log files
+def shard_paths(user):
+    name = load_index().get(user) or shard_name(user)
+    base = os.path.join(DATA_DIR, name)
+    return base + '.json', base + '.log'
+
+
+# Path of a user's append-only sales ledger
+def ledger_path(user):
+    name = load_index().get(user) or shard_name(user)
+    return os.path.join(DATA_DIR, name + '.sales')
+
+
+# Load the directory index, migrating the legacy store on first use
+def load_index():
+    global _index
+    if _index is None:
+        path = os.path.join(DATA_DIR, INDEX_FILE)
+        if not os.path.exists(path):  # First run with sharding enabled
+            os.makedirs(DATA_DIR, exist_ok=True)  # The lock file lives next to the index
+            with File_Lock.locked(path):  # The same lock _register takes, so only one process migrates
+                if not os.path.exists(path):  # Another process may have migrated meanwhile
+                    migrate_legacy()
+        _index = Transaction_Log.read_snapshot(path)
+    return _index
+
+
+# Register a user in the directory index (only written when a user is new)
+def _register(user):
+    index = load_index()
+    if user not in index:
+        path = os.path.join(DATA_DIR, INDEX_FILE)
+        with File_Lock.locked(path):
+            index.update(Transaction_Log.read_snapshot(path))  # Keep users other processes registered meanwhile
+            if user not in index:
+                index[user] = shard_name(user)
+                Transaction_Log.write_snapshot(index, path)
+
+
+# Load one user's data (inventory, total sales, rollups, version): snapshot plus log tail
+def load_tenant(user):
+    snapshot_path, log_path = shard_paths(user)
+    with File_Lock.reading(snapshot_path) as version:  # No write lands between the snapshot and the log
+        data = {user: Transaction_Log.read_snapshot(snapshot_path)}  # Wrap so log records apply
+        Transaction_Log.replay(data, log_path)
+    user_data = data[user]
+    user_data.pop('log_seq', None)  # Only replay needs it
+    Inventory_Item.from_json(user_data.setdefault('inventory', {}))  # Items replayed from the log already are
+    user_data.setdefault('total_sales', 0)
+    user_data.setdefault('rollups', Sales_Ledger.new_rollups())
+    user_data['version'] = version
+    return user_data
+
+
+# Write one user's full snapshot and clear their log
+# (raises File_Lock.VersionConflict if the tenant moved past `expected_version`)
+def save_tenant(user, user_data, expected_version=None):
+    _register(user)
+    snapshot_path, log_path = shard_paths(user)
+    snapshot = {key: value for key, value in user_data.items() if key != 'version'}  # The lock file holds it
+    with File_Lock.writing(snapshot_path, expected_version) as version:
+        snapshot['log_seq'] = version  # Covers every record in the log, even if the truncate below never happens
+        Transaction_Log.write_snapshot(snapshot, snapshot_path)
+        Transaction_Log.truncate(log_path)
+
+
+# Append a change record to a user's log and return the log length
+# (raises File_Lock.VersionConflict if the tenant moved past `expected_version`)
+def append_change(user, record, expected_version=None):
+    _register(user)
+    snapshot_path, log_path = shard_paths(user)
+    with File_Lock.writing(snapshot_path, expected_version) as version:
+        return Transaction_Log.append_record(dict(record, seq=version), log_path)  # Replay skips it once a snapshot covers it
+
+
+# Append (name, quantity, amount, time) sales to a user's ledger
+def append_sales(user, sales):
+    path = ledger_path(user)
+    with File_Lock.locked(path):  # Batches from different processes never interleave
+        Sales_Ledger.append_sales(path, sales)
+
+
+# Split the single-file store into one shard per user
+def migrate_legacy():
+    os.makedirs(DATA_DIR, exist_ok=True)
+    data = Transaction_Log.replay(Transaction_Log.read_snapshot(LEGACY_FILE), LEGACY_LOG)
+    if 'Name' in data:  # inventory.json holds the columnar layout (MAIN.py), not per-user data
+        data = {}
+    tenants = {}
+    legacy = {}
+    for key, value in data.items():
+        if key in ('inventory', 'total_sales'):  # Top-level keys left over from the pre-login version
+            legacy[key] = value
+        else:
+            tenants[key] = value
+    if legacy:
+        tenants[LEGACY_TENANT] = {'inventory': legacy.get('inventory', {}), 'total_sales': legacy.get('total_sales', 0)}
+
+    index = {}
+    for user, user_data in tenants.items():
+        index[user] = shard_name(user)
+        path = os.path.join(DATA_DIR, index[user] + '.json')
+        Transaction_Log.write_snapshot(user_data, path)
+    # The index is written last so an interrupted migration simply runs again
+    Transaction_Log.write_snapshot(index, os.path.join(DATA_DIR, INDEX_FILE))
+    return index
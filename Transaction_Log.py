@@ -0,0 +1,139 @@
+import os  # Import os for atomic file replacement
+from datetime import datetime  # Import datetime to decode sale timestamps
+import Instrumentation  # Import the timed JSON helpers
+import Inventory_Item  # Import the slotted item record
+import Sales_Ledger  # Import the sales rollups updated by sale records
+
+# Append-only transaction log
+#
+# Every mutation appends one compact JSON line holding the full new state of
+# the touched item (or None for a deletion) plus the tenant's total sales.
+# Purchases also carry the sales themselves so period rollups can be replayed.
+# Bulk operations write a single record with a 'batch' of item entries, so a
+# torn write loses the whole batch rather than half of it. A renamed item's
+# entry names its old name in 'renamed_from', so its rollups follow it.
+# Item states simply overwrite, but sales add to the period rollups, so a
+# record must never be replayed onto a snapshot that already includes it.
+# Records therefore carry a sequence number ('seq') and a snapshot records the
+# sequence number it covers ('log_seq'). Replay skips every record at or
+# below it, so a crash between writing a compacted snapshot and truncating
+# the log doesn't count those records twice. Compaction writes a fresh
+# snapshot and then truncates the log.
+
+COMPACT_THRESHOLD = 500  # Fold a log into its snapshot once it holds this many records
+
+_record_counts = {}  # Number of records currently in each log file, keyed by path
+
+
+# Read a JSON snapshot, treating a missing or empty file as an empty store
+def read_snapshot(path):
+    try:
+        with open(path, 'r') as file:  # Open the snapshot file in read mode
+            data = file.read()  # Read the entire contents of the file
+    except FileNotFoundError:  # Handle the case where the snapshot doesn't exist yet
+        return {}
+    return Instrumentation.loads(data, 'snapshot') if data else {}  # Parse the JSON data or start empty
+
+
+# Write a JSON snapshot atomically via a temporary file and rename
+def write_snapshot(data, path):
+    text = Instrumentation.dumps(data, 'snapshot', indent=4, default=Inventory_Item.encode)  # Encode the snapshot
+    replace_file(path, text)
+
+
+# Replace a file's contents atomically: readers see the old file or the new one, never a mix
+def replace_file(path, text):
+    temp_path = f"{path}.{os.getpid()}.tmp"  # Temporary file next to the target, private to this process
+    with open(temp_path, 'w') as file:  # Write the new contents to the temporary file
+        file.write(text)
+        file.flush()
+        os.fsync(file.fileno())  # Make sure the bytes hit the disk before the swap
+    os.replace(temp_path, path)  # Atomically swap the new file into place
+
+
+# Count the records in a log file (only done once per path)
+def _count_records(path):
+    try:
+        with open(path, 'r') as file:
+            return sum(1 for line in file if line.strip())
+    except FileNotFoundError:
+        return 0
+
+
+# Append one record to the log and return the number of records now in it
+def append_record(record, path):
+    if path not in _record_counts:  # Lazily count what a previous session left behind
+        _record_counts[path] = _count_records(path)
+    line = Instrumentation.dumps(record, 'log', separators=(',', ':'))  # Compact encoding, one record per line
+    with open(path, 'a') as file:  # Open the log in append mode
+        file.write(line + '\n')
+        file.flush()
+        os.fsync(file.fileno())  # A record is durable once append_record returns
+    _record_counts[path] += 1
+    return _record_counts[path]
+
+
+# Yield the records stored in a log file, skipping a torn final line
+def iter_records(path):
+    try:
+        with open(path, 'r') as file:
+            for line in file:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield Instrumentation.loads(line, 'log')
+                except ValueError:  # A crash mid-append leaves a partial last line
+                    continue
+    except FileNotFoundError:  # No log yet means nothing to replay
+        return
+
+
+# [timestamp, quantity, amount] sales carried by an entry ('sale' for one, 'sales' for several)
+def entry_sales(entry):
+    if 'sales' in entry:
+        return entry['sales']
+    return [entry['sale']] if 'sale' in entry else []
+
+
+# Apply one item entry (a record or an element of a batch) to a user's data
+def _apply_entry(user_data, entry):
+    items = user_data.setdefault('inventory', {})
+    if 'renamed_from' in entry:  # A rename also moves the item's sales history
+        rollups = user_data.setdefault('rollups', Sales_Ledger.new_rollups())
+        Sales_Ledger.rename_item(rollups, entry['renamed_from'], entry['name'])
+    if entry['item'] is None:  # None marks a deleted item
+        items.pop(entry['name'], None)
+    else:
+        items[entry['name']] = Inventory_Item.Item.from_dict(entry['item'])
+    sales = entry_sales(entry)
+    if sales:  # Purchases also feed the period rollups
+        rollups = user_data.setdefault('rollups', Sales_Ledger.new_rollups())
+        for stamp, quantity, amount in sales:
+            Sales_Ledger.record_sale(rollups, entry['name'], quantity, amount, datetime.fromisoformat(stamp))
+
+
+# Apply a single record to the multi-tenant data dictionary (skipped if the
+# user's snapshot already covers its sequence number)
+def apply_record(data, record):
+    user_data = data.setdefault(record['user'], {'inventory': {}, 'total_sales': 0})
+    if record.get('seq', 0) and record['seq'] <= user_data.get('log_seq', 0):
+        return
+    for entry in record.get('batch', [record]):  # A plain record is a batch of one
+        _apply_entry(user_data, entry)
+    user_data['total_sales'] = record['total_sales']
+
+
+# Replay every record in the log on top of a snapshot
+def replay(data, path):
+    for record in iter_records(path):
+        apply_record(data, record)
+    return data
+
+
+# Empty the log once its records have been folded into a snapshot
+def truncate(path):
+    with open(path, 'w'):
+        pass
+    _record_counts[path] = 0
+
@@ -0,0 +1,78 @@
+import argparse  # Import argparse for command-line options
+import json  # Import the JSON module for machine-readable results
+import os  # Import os to find the repository modules
+import random  # Import random for reproducible synthetic data
+import sys  # Import sys to find the repository modules
+import time  # Import time to measure the reports
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Repository root
+
+import Inventory_Analytics
+import Inventory_Item
+
+# Inventory analytics benchmark
+#
+# Builds a synthetic store of --size items and times Inventory_Analytics on
+# it. The time is split between copying the items into columns and computing
+# the reports. It is measured with numpy when numpy is installed, and always
+# with the plain-Python fallback.
+
+SIZE = 1_000_000  # Default number of items
+
+
+# A reproducible synthetic store: skewed prices and sales, some items out of stock
+def synthetic_inventory(size, seed=42):
+    rng = random.Random(seed)
+    inventory = {}
+    for number in range(size):
+        price = round(rng.lognormvariate(3, 1.2), 2)
+        sales_count = int(rng.paretovariate(1.2)) - 1
+        inventory[f"item{number}"] = Inventory_Item.Item(price, rng.choice((0, rng.randint(1, 500))),
+                                                         sales_count, sales_count * price)
+    return inventory
+
+
+# Seconds to copy the items into columns and to compute every report
+def time_reports(inventory):
+    started = time.perf_counter()
+    columns = Inventory_Analytics.materialize(inventory)
+    materialized = time.perf_counter()
+    order = Inventory_Analytics.revenue_order(columns)
+    Inventory_Analytics.abc_report(columns, order)
+    Inventory_Analytics.sell_through_report(columns)
+    Inventory_Analytics.concentration_report(columns, order)
+    Inventory_Analytics.price_band_report(columns)
+    return materialized - started, time.perf_counter() - materialized
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the inventory analytics reports with and without numpy.")
+    parser.add_argument('--size', type=int, default=SIZE, help="Number of items")
+    parser.add_argument('--json', action='store_true', help="Print the results as JSON")
+    args = parser.parse_args()
+
+    inventory = synthetic_inventory(args.size)
+    results = {'size': args.size}
+    numpy = Inventory_Analytics.numpy
+    if numpy is not None:
+        results['numpy_materialize_s'], results['numpy_reports_s'] = time_reports(inventory)
+    Inventory_Analytics.numpy = None
+    try:
+        results['python_materialize_s'], results['python_reports_s'] = time_reports(inventory)
+    finally:
+        Inventory_Analytics.numpy = numpy
+    if args.json:
+        print(json.dumps(results))
+        return
+    print(f"Items:                {args.size}")
+    if numpy is not None:
+        print(f"numpy columns:        {results['numpy_materialize_s']:8.3f} s")
+        print(f"numpy reports:        {results['numpy_reports_s']:8.3f} s")
+    else:
+        print("numpy:                not installed")
+    print(f"Python columns:       {results['python_materialize_s']:8.3f} s")
+    print(f"Python reports:       {results['python_reports_s']:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
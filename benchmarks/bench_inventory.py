@@ -0,0 +1,251 @@
+import argparse  # Import argparse for command-line options
+import contextlib  # Import contextlib to silence the apps' prints
+import json  # Import the JSON module for machine-readable results
+import os  # Import os for working directories and file sizes
+import platform  # Import platform to tag results with the machine
+import random  # Import random for reproducible synthetic data
+import sys  # Import sys to find the repository modules
+import tempfile  # Import tempfile for isolated data directories
+import time  # Import time for timing
+import tracemalloc  # Import tracemalloc for memory measurements
+from datetime import datetime  # Import datetime to timestamp results
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Repository root
+
+import File_Operators  # Columnar load/save with plain lists
+import MAIN  # Columnar inventory with typed arrays and a name index
+import Inventory_Item
+import Main_Menu  # Per-user dict of slotted items with sharded storage
+import Sales_Ledger
+import Storage_Backend
+import Tenant_Storage
+
+# Inventory benchmark suite
+#
+# For each implementation and catalog size, a synthetic catalog is built in
+# memory. The script then times OPS operations of each kind (add, lookup,
+# buy, reprice) against it, plus one full display, save and load. Memory is
+# measured in a separate tracemalloc pass so it doesn't slow the timings:
+# bytes the implementation holds after building the catalog from freshly
+# allocated values, and peak usage during save and load. Every implementation
+# runs in its own temporary directory, because all of them use relative file
+# paths.
+#
+# MAIN.py's buy_item/change_price and File_Operators.py prompt for input, so
+# those adapters run the same bookkeeping through the module's lookup API
+# (find_item for MAIN.py, list.index for File_Operators.py).
+
+SIZES = [1_000, 100_000, 1_000_000]  # Default catalog sizes
+OPS = 1_000  # Operations timed per kind
+
+
+# Names and values of a reproducible synthetic catalog
+def synthetic_catalog(size, seed=42):
+    rng = random.Random(seed)
+    names = [f"item-{i:07d}" for i in range(size)]
+    prices = [round(rng.uniform(0.5, 500.0), 2) for _ in range(size)]
+    counts = [rng.randint(10_000, 100_000) for _ in range(size)]
+    return names, prices, counts
+
+
+# Adapter for MAIN.py
+class ColumnarArrays:
+    name = 'MAIN.py (typed columns)'
+
+    def build(self, names, prices, counts):
+        self.inventory = MAIN.new_inventory(names, prices, counts)
+
+    def add(self, name):
+        MAIN.add_item(self.inventory, name, 9.99, 100)
+
+    def lookup(self, name):
+        return MAIN.find_item(self.inventory, name)
+
+    def buy(self, name):
+        index = MAIN.find_item(self.inventory, name)
+        self.inventory['Count'][index] -= 1
+        self.inventory['Total Sales'] += self.inventory['Price'][index]
+
+    def reprice(self, name):
+        self.inventory['Price'][MAIN.find_item(self.inventory, name)] = 1.25
+
+    def display(self):
+        MAIN.display_inventory(self.inventory)
+
+    def save(self):
+        MAIN.save_inventory(self.inventory)
+
+    def load(self):
+        self.inventory = MAIN.load_inventory()
+
+    def files(self):
+        return columnar_files()
+
+
+# Files the columnar layout is stored in by the selected backend
+def columnar_files():
+    if Storage_Backend.BACKEND == 'sqlite':
+        return [Storage_Backend.COLUMNAR_FILE, Storage_Backend.DATABASE_FILE]
+    return [Storage_Backend.COLUMNAR_FILE]
+
+
+# Adapter for Main_Menu.py
+class PerUserItems:
+    name = 'Main_Menu.py (per-user items)'
+
+    def build(self, names, prices, counts):
+        Tenant_Storage._index = None  # Start from this directory's (empty) index
+        Main_Menu.current_user = 'bench'
+        Main_Menu.inventory = {name: Inventory_Item.Item(price, count) for name, price, count in zip(names, prices, counts)}
+        Main_Menu.total_sales = 0
+        Main_Menu.rollups = Sales_Ledger.new_rollups()
+        Main_Menu.save_inventory()  # Establish the shard so per-operation appends measure steady state
+
+    def add(self, name):
+        Main_Menu.add_item(name, 9.99, 100)
+
+    def lookup(self, name):
+        Main_Menu.detail_by_name(name, 'day')
+
+    def buy(self, name):
+        Main_Menu.buy_item(name, 1)
+
+    def reprice(self, name):
+        Main_Menu.change_price(name, 1.25)
+
+    def display(self):
+        Main_Menu.display_inventory()
+
+    def save(self):
+        Main_Menu.save_inventory()
+
+    def load(self):
+        Main_Menu.load_inventory()
+
+    def files(self):
+        return list(Tenant_Storage.shard_paths('bench')) + [Tenant_Storage.ledger_path('bench')]
+
+
+# Adapter for File_Operators.py
+class ColumnarLists:
+    name = 'File_Operators.py (list columns)'
+
+    def build(self, names, prices, counts):
+        self.inventory = {'Name': list(names), 'Price': list(prices), 'Count': list(counts)}
+
+    def add(self, name):
+        for column, value in (('Name', name), ('Price', 9.99), ('Count', 100)):
+            self.inventory[column].append(value)
+
+    def lookup(self, name):
+        return self.inventory['Name'].index(name)
+
+    def buy(self, name):
+        self.inventory['Count'][self.inventory['Name'].index(name)] -= 1
+
+    def reprice(self, name):
+        self.inventory['Price'][self.inventory['Name'].index(name)] = 1.25
+
+    def display(self):
+        for name, price, count in zip(self.inventory['Name'], self.inventory['Price'], self.inventory['Count']):
+            print(f"Name: {name}, Price: {price}, Count: {count}")
+
+    def save(self):
+        File_Operators.save_inventory(self.inventory)
+
+    def load(self):
+        self.inventory = File_Operators.load_inventory()
+
+    def files(self):
+        return columnar_files()
+
+
+IMPLEMENTATIONS = [ColumnarArrays, PerUserItems, ColumnarLists]
+
+
+# Seconds taken by a call
+def timed(call, *args):
+    start = time.perf_counter()
+    call(*args)
+    return time.perf_counter() - start
+
+
+# Benchmark one implementation at one size inside a fresh directory
+def run_case(implementation, size, ops):
+    names, prices, counts = synthetic_catalog(size)
+    rng = random.Random(size)
+    targets = [names[rng.randrange(size)] for _ in range(ops)]  # Existing items to look up, buy and reprice
+    new_names = [f"new-{i:07d}" for i in range(ops)]  # Items to add
+    result = {'implementation': implementation.name, 'size': size, 'ops': ops}
+
+    with tempfile.TemporaryDirectory() as directory:
+        previous = os.getcwd()
+        os.chdir(directory)
+        try:
+            with open(os.devnull, 'w') as sink, contextlib.redirect_stdout(sink):
+                # Memory pass: catalog footprint and peak usage while persisting
+                adapter = implementation()
+                tracemalloc.start()
+                catalog = synthetic_catalog(size)  # Fresh objects, so shared values are counted too
+                adapter.build(*catalog)
+                del catalog  # Keep only what the implementation itself holds on to
+                result['catalog_bytes'] = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                adapter.save()
+                result['save_peak_bytes'] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.reset_peak()
+                adapter.load()
+                result['load_peak_bytes'] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                del adapter
+
+                # Timing pass
+                adapter = implementation()
+                result['build_s'] = timed(adapter.build, names, prices, counts)
+                for op, arguments in (('add', new_names), ('lookup', targets), ('buy', targets), ('reprice', targets)):
+                    method = getattr(adapter, op)
+                    start = time.perf_counter()
+                    for name in arguments:
+                        method(name)
+                    result[f'{op}_us_per_op'] = (time.perf_counter() - start) / ops * 1e6
+                result['display_s'] = timed(adapter.display)
+                result['save_s'] = timed(adapter.save)
+                result['load_s'] = timed(adapter.load)
+                result['file_bytes'] = sum(os.path.getsize(path) for path in adapter.files() if os.path.exists(path))
+        finally:
+            os.chdir(previous)
+    result['bytes_per_item'] = result['catalog_bytes'] / size
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the three inventory implementations.")
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)), help="Comma-separated catalog sizes")
+    parser.add_argument('--ops', type=int, default=OPS, help="Operations timed per kind")
+    parser.add_argument('--json', help="Append results as one JSON line to this file")
+    args = parser.parse_args()
+
+    results = []
+    for size in (int(value) for value in args.sizes.split(',')):
+        for implementation in IMPLEMENTATIONS:
+            result = run_case(implementation, size, args.ops)
+            results.append(result)
+            print(f"{result['implementation']:<34}{size:>9}  "
+                  f"add {result['add_us_per_op']:9.1f}us  lookup {result['lookup_us_per_op']:9.1f}us  "
+                  f"buy {result['buy_us_per_op']:9.1f}us  reprice {result['reprice_us_per_op']:9.1f}us  "
+                  f"display {result['display_s']:7.3f}s  save {result['save_s']:7.3f}s  load {result['load_s']:7.3f}s  "
+                  f"{result['bytes_per_item']:7.1f} B/item  file {result['file_bytes'] / 1e6:8.2f} MB", flush=True)
+
+    if args.json:
+        run = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'machine': platform.platform(),
+            'results': results,
+        }
+        with open(args.json, 'a') as file:  # One run per line so runs can be compared over time
+            file.write(json.dumps(run) + '\n')
+
+
+if __name__ == "__main__":
+    main()
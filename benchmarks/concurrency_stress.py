@@ -0,0 +1,183 @@
+import argparse  # Import argparse for command-line options
+import asyncio  # Import asyncio to drive the in-process inventory server
+import contextlib  # Import contextlib to silence the menu functions' messages
+import json  # Import the JSON module for machine-readable results
+import multiprocessing  # Import multiprocessing for the competing worker processes
+import os  # Import os to find the repository modules
+import random  # Import random to pick the items each worker sells
+import sys  # Import sys to find the repository modules
+import tempfile  # Import tempfile for a scratch data directory
+import time  # Import time to measure throughput
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Repository root
+
+import Inventory_Item
+import Inventory_Server
+import MAIN
+import Main_Menu
+import Sales_Ledger
+import Storage_Backend
+import Tenant_Storage
+import Transaction_Log
+
+# Multi-process contention test
+#
+# Starts several worker processes that all sell from the same store at once.
+# Each worker sells one unit at a time of a random item, priced 1.00, and
+# saves after every --save-every sales. When they are done, the stored store
+# must account for every sale:
+#   - total sales equal the units the workers report selling
+#   - the stock that left the store equals the units sold
+#   - for a user (--layout user), the items' sales counts and the sales
+#     ledger also match
+# The columnar layout is saved by MAIN.save_inventory and the per-user one by
+# Main_Menu's transaction log; both merge and retry when another process
+# saved first. --layout server uses the per-user store too, but every other
+# worker sells through an in-process Inventory_Server (flushing at each save)
+# instead of Main_Menu, so the server's writes compete with Main_Menu's. --blind writes without version checks, the way saves worked
+# before, to show the lost updates it causes. Everything runs in a scratch
+# directory, and INVENTORY_BACKEND picks the backend as usual.
+#
+#   python benchmarks/concurrency_stress.py [--layout columnar|user|server] [--workers 4] [--sales 200] [--save-every 1]
+
+ITEMS = 20  # Items in the store (few, so workers often touch the same ones)
+STOCK = 1_000_000  # Starting count of every item
+USER = 'stress'  # Store name used for the per-user layout
+
+
+# Fresh store with ITEMS items priced 1.00
+def seed(layout):
+    names = [f"item{number}" for number in range(ITEMS)]
+    if layout == 'columnar':
+        MAIN.save_inventory(MAIN.new_inventory(names, [1.0] * ITEMS, [STOCK] * ITEMS))
+    else:
+        Storage_Backend.get_backend().save_tenant(USER, {
+            'inventory': {name: Inventory_Item.Item(1.0, STOCK) for name in names},
+            'total_sales': 0.0,
+            'rollups': Sales_Ledger.new_rollups(),
+        })
+
+
+# Sell `sales` single units from the columnar store; returns the units sold
+def columnar_worker(seed_value, sales, save_every, blind):
+    rng = random.Random(seed_value)
+    inventory = MAIN.load_inventory()
+    sold = 0
+    for number in range(1, sales + 1):
+        MAIN.sell_item(inventory, f"item{rng.randrange(ITEMS)}", 1)
+        sold += 1
+        if number % save_every == 0 or number == sales:
+            if blind:
+                inventory[MAIN.VERSION_KEY] = None  # Overwrite whatever is stored
+            MAIN.save_inventory(inventory)
+    return sold
+
+
+# Sell `sales` single units from the user's store; returns the units sold
+def user_worker(seed_value, sales, save_every, blind):
+    rng = random.Random(seed_value)
+    Main_Menu.current_user = USER
+    Main_Menu.WRITE_BEHIND_INTERVAL = None  # Write at the checkpoints below
+    Transaction_Log.COMPACT_THRESHOLD = 50  # Compact often, so snapshot rewrites compete too
+    Main_Menu.load_inventory()
+    sold = 0
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        for number in range(1, sales + 1):
+            if Main_Menu.buy_item(f"item{rng.randrange(ITEMS)}", 1):
+                sold += 1
+            if number % save_every == 0 or number == sales:
+                if blind:
+                    Main_Menu.tenant_version = None  # Overwrite whatever is stored
+                Main_Menu.sync_changes()
+    return sold
+
+
+# Sell `sales` single units from the user's store through an InventoryServer; returns the units sold
+def server_worker(seed_value, sales, save_every, blind):
+    rng = random.Random(seed_value)
+    Transaction_Log.COMPACT_THRESHOLD = 50  # Compact often, so snapshot rewrites compete too
+    server = Inventory_Server.InventoryServer()
+    tenant = server.tenant(USER)
+
+    async def sell():
+        sold = 0
+        for number in range(1, sales + 1):
+            try:
+                await server.op_buy_item(tenant, {'name': f"item{rng.randrange(ITEMS)}", 'quantity': 1})
+                sold += 1
+            except ValueError:  # Out of stock
+                pass
+            if number % save_every == 0 or number == sales:
+                if blind:
+                    tenant.version = None  # Overwrite whatever is stored
+                await server.flush()
+        return sold
+
+    return asyncio.run(sell())
+
+
+# Worker function for one process: --layout server alternates server and Main_Menu workers
+def worker_for(layout, number):
+    if layout == 'columnar':
+        return columnar_worker
+    if layout == 'server' and number % 2 == 0:
+        return server_worker
+    return user_worker
+
+
+# Run a worker function in a pool process
+def run_worker(worker, *args):
+    return worker(*args)
+
+
+# Units sold, revenue, stock gone and the other counters of the stored store
+def audit(layout):
+    backend = Storage_Backend.get_backend()
+    if layout == 'columnar':
+        columns = backend.load_columns()
+        return {'revenue': columns['Total Sales'], 'stock_gone': ITEMS * STOCK - sum(columns['Count'])}
+    user_data = backend.load_tenant(USER)
+    items = user_data['inventory'].values()
+    result = {
+        'revenue': user_data['total_sales'],
+        'stock_gone': ITEMS * STOCK - sum(item.count for item in items),
+        'sales_count': sum(item.sales_count for item in items),
+    }
+    if isinstance(backend, Storage_Backend.JsonBackend):
+        result['ledger'] = sum(quantity for _, _, quantity, _ in Sales_Ledger.iter_sales(Tenant_Storage.ledger_path(USER)))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that concurrent processes selling from one store lose no sales.")
+    parser.add_argument('--layout', choices=['columnar', 'user', 'server'], default='columnar',
+                        help="Store layout to test ('server' mixes Inventory_Server and Main_Menu workers on a user)")
+    parser.add_argument('--workers', type=int, default=4, help="Competing processes")
+    parser.add_argument('--sales', type=int, default=200, help="Units each process sells")
+    parser.add_argument('--save-every', type=int, default=1, help="Sales between saves")
+    parser.add_argument('--blind', action='store_true', help="Save without version checks (shows lost updates)")
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix='inventory-stress-'))  # Workers inherit the scratch directory
+    seed(args.layout)
+    context = multiprocessing.get_context('spawn')  # No backend connection is shared with the parent
+    start = time.perf_counter()
+    with context.Pool(args.workers) as pool:
+        sold = sum(pool.starmap(run_worker, [(worker_for(args.layout, number), number, args.sales, args.save_every,
+                                              args.blind) for number in range(args.workers)]))
+    seconds = time.perf_counter() - start
+
+    stored = audit(args.layout)
+    lost = {key: sold - value for key, value in stored.items() if value != sold}
+    report = {'layout': args.layout, 'backend': Storage_Backend.BACKEND, 'workers': args.workers,
+              'units_sold': sold, 'stored': stored, 'lost': lost, 'seconds': round(seconds, 3),
+              'sales_per_sec': round(sold / seconds, 1), 'directory': os.getcwd()}
+    print(json.dumps(report))
+    if lost:
+        print(f"❌ Lost updates: {lost}", file=sys.stderr)
+        sys.exit(1)
+    print(f"✅ {sold} sales by {args.workers} processes, none lost", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
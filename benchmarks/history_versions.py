@@ -0,0 +1,99 @@
+import argparse  # Import argparse for command-line options
+import json  # Import the JSON module for machine-readable results
+import os  # Import os to find the repository modules
+import random  # Import random for reproducible synthetic data
+import sys  # Import sys to find the repository modules
+import time  # Import time to measure the version costs
+import tracemalloc  # Import tracemalloc for memory measurements
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Repository root
+
+import MAIN
+
+# Inventory version cost benchmark
+#
+# Builds a columnar inventory and starts its history. It then makes
+# --changes single-item sales, recording a version after each one the way
+# the interactive program does. It reports:
+#   - the time to record a version and to undo or redo one
+#   - the memory each version adds, traced over --keep more changes
+# The same numbers are given for a full copy of the columns per version
+# (copy_columns), which is what a snapshot cost before.
+
+SIZE = 100_000  # Default number of items
+CHANGES = 1_000  # Default number of changes
+KEEP = 100  # Default number of versions kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the cost of recording, undoing and keeping inventory versions.")
+    parser.add_argument('--size', type=int, default=SIZE, help="Number of items")
+    parser.add_argument('--changes', type=int, default=CHANGES, help="Changes to record")
+    parser.add_argument('--keep', type=int, default=KEEP, help="Versions kept")
+    parser.add_argument('--json', action='store_true', help="Print the results as JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    names = [f"item{number}" for number in range(args.size)]
+    inventory = MAIN.new_inventory(names, (round(rng.uniform(0.5, 500.0), 2) for _ in names),
+                                   (rng.randint(10_000, 100_000) for _ in names))
+    MAIN.HISTORY_LIMIT = args.keep
+    started = time.perf_counter()
+    history = MAIN.inventory_history(inventory)
+    start_seconds = time.perf_counter() - started
+
+    record_seconds = 0.0
+    for _ in range(args.changes):
+        MAIN.sell_item(inventory, rng.choice(names), 1)
+        started = time.perf_counter()
+        MAIN.record_version(inventory)
+        record_seconds += time.perf_counter() - started
+
+    history.limit = len(history.versions) + args.keep  # Nothing is dropped while measuring
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for _ in range(args.keep):
+        MAIN.sell_item(inventory, rng.choice(names), 1)
+        MAIN.record_version(inventory)
+    versions_bytes = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    history.limit = args.keep
+    history.trim()
+
+    undone = min(args.changes, len(history.versions) - 1)
+    started = time.perf_counter()
+    for _ in range(undone):
+        MAIN.undo_change(inventory)
+    for _ in range(undone):
+        MAIN.redo_change(inventory)
+    step_seconds = time.perf_counter() - started
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    copies = [MAIN.copy_columns(inventory) for _ in range(min(args.keep, args.changes))]
+    copy_seconds = (time.perf_counter() - started) / len(copies)
+    copies_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del copies
+
+    kept = len(history.versions) - 1
+    results = {'size': args.size, 'changes': args.changes, 'versions_kept': kept,
+               'start_ms': start_seconds * 1e3,
+               'record_us': record_seconds / args.changes * 1e6,
+               'undo_redo_us': step_seconds / (2 * undone) * 1e6 if undone else None,
+               'bytes_per_version': versions_bytes / args.keep if args.keep else None,
+               'full_copy_us': copy_seconds * 1e6,
+               'full_copy_bytes': copies_bytes / min(args.keep, args.changes)}
+    if args.json:
+        print(json.dumps(results))
+        return
+    print(f"Items:               {args.size}")
+    print(f"Start history:       {results['start_ms']:10.1f} ms")
+    print(f"Record a version:    {results['record_us']:10.1f} us")
+    print(f"Undo or redo:        {results['undo_redo_us']:10.1f} us")
+    print(f"Memory per version:  {results['bytes_per_version']:10.0f} B")
+    print(f"Full copy:           {results['full_copy_us']:10.1f} us, {results['full_copy_bytes']:.0f} B")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import argparse  # Import argparse for command-line options
+import json  # Import the JSON module for machine-readable results
+import os  # Import os to find the repository modules
+import random  # Import random for reproducible synthetic data
+import sys  # Import sys to find the repository modules
+import tracemalloc  # Import tracemalloc for memory measurements
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Repository root
+
+import Inventory_Item
+
+# Per-item memory benchmark
+#
+# Builds the same per-user inventory twice: once with the old item dicts
+# {'price', 'count', 'sales_count', 'sales_price'}, and once with slotted
+# Inventory_Item.Item objects. It reports the bytes traced per item for each.
+# The numbers cover the items and their values, not the shared name strings
+# or the outer name -> item dict. Those two costs are the same for both
+# representations, so they are left out.
+
+SIZE = 1_000_000  # Default number of items
+
+
+# Prices, counts and sales of a reproducible synthetic catalog
+def synthetic_values(size, seed=42):
+    rng = random.Random(seed)
+    return [(round(rng.uniform(0.5, 500.0), 2), rng.randint(10_000, 100_000), rng.randint(0, 500), 0.0)
+            for _ in range(size)]
+
+
+# Bytes per item held by a list of items built from the values
+def bytes_per_item(make_item, size):
+    values = synthetic_values(size)
+    tracemalloc.start()
+    items = [make_item(price, count, sales_count, float(sales_count) * price)  # Fresh float per item
+             for price, count, sales_count, _ in values]
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    held -= sys.getsizeof(items)  # The list holding the items isn't part of either representation
+    del items
+    return held / size
+
+
+# Old representation: one dict per item
+def make_dict(price, count, sales_count, sales_price):
+    return {'price': price, 'count': count, 'sales_count': sales_count, 'sales_price': sales_price}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare memory per item of dict and slotted items.")
+    parser.add_argument('--size', type=int, default=SIZE, help="Number of items")
+    parser.add_argument('--json', action='store_true', help="Print the results as JSON")
+    args = parser.parse_args()
+
+    results = {'size': args.size,
+               'dict_bytes_per_item': bytes_per_item(make_dict, args.size),
+               'slots_bytes_per_item': bytes_per_item(Inventory_Item.Item, args.size)}
+    if args.json:
+        print(json.dumps(results))
+        return
+    print(f"Items:           {args.size}")
+    print(f"dict items:      {results['dict_bytes_per_item']:7.1f} B/item")
+    print(f"slotted items:   {results['slots_bytes_per_item']:7.1f} B/item")
+    print(f"Saved:           {1 - results['slots_bytes_per_item'] / results['dict_bytes_per_item']:7.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import argparse  # Import argparse for command-line options
+import json  # Import the JSON module for machine-readable results
+import multiprocessing  # Import multiprocessing for the competing registrations
+import os  # Import os to find the repository modules
+import sys  # Import sys to find the repository modules
+import tempfile  # Import tempfile for a scratch credential store
+import time  # Import time to widen the window between the name check and the append
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Repository root
+
+import Credential_Store
+
+# Concurrent registration test
+#
+# Starts several processes that all register the same user name at the same
+# moment, each with its own password. Exactly one registration must succeed,
+# and afterwards the stored password must be that winner's: a second append
+# for the same name would silently replace the first user's password.
+# Every round runs in a fresh scratch directory holding one other user.
+#
+#   python benchmarks/register_race.py [--workers 4] [--rounds 5]
+
+USER = 'race'  # Name every process tries to register
+APPEND_DELAY = 0.2  # Seconds each worker waits before appending, so the race shows even on one CPU
+
+
+# Try to register USER with this worker's password. The workers line up once their
+# password is hashed, so they all reach the name check together, and each one
+# pauses before appending: without a lock across check and append, several pass
+# the check before any of them has written
+def register_worker(barrier, number, results):
+    make_record, append = Credential_Store.make_record, Credential_Store._append
+
+    def make_record_then_wait(user, password):
+        record = make_record(user, password)
+        barrier.wait()
+        return record
+
+    def append_later(records):
+        time.sleep(APPEND_DELAY)
+        append(records)
+
+    Credential_Store.make_record, Credential_Store._append = make_record_then_wait, append_later
+    results.put((number, Credential_Store.register(USER, f"password{number}")))
+
+
+# Run one round in the current directory; returns (winners, whether the winner's password verifies)
+def run_round(context, workers):
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [context.Process(target=register_worker, args=(barrier, number, results)) for number in range(workers)]
+    for process in processes:
+        process.start()
+    outcomes = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    winners = [number for number, registered in outcomes if registered]
+    verified = len(winners) == 1 and Credential_Store.verify(USER, f"password{winners[0]}")
+    return winners, verified
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that concurrent registrations of one name admit exactly one user.")
+    parser.add_argument('--workers', type=int, default=4, help="Competing processes")
+    parser.add_argument('--rounds', type=int, default=5, help="Rounds to run")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context('spawn')  # Every process indexes the store itself
+    failures = []
+    for round_number in range(args.rounds):
+        os.chdir(tempfile.mkdtemp(prefix='inventory-register-'))  # Workers inherit the scratch directory
+        Credential_Store._index.clear()  # This process reads the new store from scratch
+        Credential_Store._offset, Credential_Store._stat = 0, None
+        Credential_Store.register('seed', 'seed')  # The store exists, so no worker waits on the first-use migration
+        winners, verified = run_round(context, args.workers)
+        if not verified:
+            failures.append({'round': round_number, 'winners': winners, 'directory': os.getcwd()})
+    print(json.dumps({'workers': args.workers, 'rounds': args.rounds, 'failures': failures}))
+    if failures:
+        print(f"❌ Registrations of one name that did not admit exactly one user: {failures}", file=sys.stderr)
+        sys.exit(1)
+    print(f"✅ {args.rounds} rounds of {args.workers} concurrent registrations, one winner each", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import argparse  # Import argparse for command-line options
+import json  # Import the JSON module for machine-readable results
+import os  # Import os for paths and environment handling
+import shutil  # Import shutil to clear bytecode caches for cold runs
+import statistics  # Import statistics for medians
+import subprocess  # Import subprocess to time fresh interpreters
+import sys  # Import sys for the interpreter path
+import time  # Import time for wall-clock timing
+
+# Startup-time benchmark
+#
+# Imports each entry module in a fresh interpreter with `python -X importtime`
+# and records the wall time plus the cumulative import time of the module.
+# The cold run deletes the repo's __pycache__ first so bytecode has to be
+# compiled again. Warm runs reuse the cache, and the median is reported.
+# With --max-ms, the script exits with status 1 if a warm median exceeds the
+# budget, so it can catch regressions in CI.
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # Repository root
+MODULES = ['Main_Menu', 'MAIN', 'Inventory_Server']  # Entry points to measure
+
+
+# Remove the repository's bytecode caches
+def clear_bytecode():
+    for root, dirs, _ in os.walk(REPO_DIR):
+        if '__pycache__' in dirs:
+            shutil.rmtree(os.path.join(root, '__pycache__'))
+            dirs.remove('__pycache__')
+
+
+# Import a module in a fresh interpreter; return (wall ms, import ms, slowest imports)
+def measure(module):
+    env = dict(os.environ, PYTHONPATH=REPO_DIR)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=REPO_DIR, env=env, capture_output=True, text=True, check=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+    imports = []  # (cumulative microseconds, module name)
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line.split('|', 2)  # "import time: self | cumulative | name"
+        imports.append((int(cumulative_us), name.strip()))
+    module_us = next((us for us, name in reversed(imports) if name == module), 0)
+    slowest = sorted(((us, name) for us, name in imports if name != module), reverse=True)[:5]
+    return wall_ms, module_us / 1000, [(name, us / 1000) for us, name in slowest]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold and warm import time of the entry modules.")
+    parser.add_argument('--runs', type=int, default=5, help="Warm runs per module")
+    parser.add_argument('--json', help="Write results to this JSON file")
+    parser.add_argument('--max-ms', type=float, help="Fail if a warm median import time exceeds this budget")
+    args = parser.parse_args()
+
+    results = {}
+    for module in MODULES:
+        clear_bytecode()
+        cold_wall, cold_import, slowest = measure(module)
+        warm = [measure(module) for _ in range(args.runs)]
+        results[module] = {
+            'cold_wall_ms': round(cold_wall, 2),
+            'cold_import_ms': round(cold_import, 2),
+            'warm_wall_ms': round(statistics.median(run[0] for run in warm), 2),
+            'warm_import_ms': round(statistics.median(run[1] for run in warm), 2),
+            'slowest_imports_ms': {name: round(ms, 2) for name, ms in slowest},
+        }
+
+    print(f"{'Module':<18}{'cold wall':>12}{'cold import':>14}{'warm wall':>12}{'warm import':>14}")
+    for module, row in results.items():
+        print(f"{module:<18}{row['cold_wall_ms']:>12.1f}{row['cold_import_ms']:>14.1f}"
+              f"{row['warm_wall_ms']:>12.1f}{row['warm_import_ms']:>14.1f}")
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump({'python': sys.version.split()[0], 'results': results}, file, indent=4)
+
+    if args.max_ms is not None:
+        over = [module for module, row in results.items() if row['warm_import_ms'] > args.max_ms]
+        if over:
+            print(f"❌ Over the {args.max_ms} ms budget: {', '.join(over)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()